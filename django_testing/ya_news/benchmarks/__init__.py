@@ -0,0 +1,60 @@
+"""
+Замеры производительности YaNews.
+
+Запуск из каталога ya_news: ``python -m benchmarks.<модуль>``.
+Каждый замер работает на временной тестовой базе данных. Как и тесты,
+замеры не требуют collectstatic: статика берётся из обычного хранилища.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Создаёт тестовую базу данных на время замера."""
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True
+    )
+    try:
+        with override_settings(
+            STATIC_ROOT=None,
+            STATICFILES_STORAGE=(
+                'django.contrib.staticfiles.storage.StaticFilesStorage'
+            ),
+        ):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat, rounds=3):
+    """Возвращает число вызовов func в секунду (лучший из rounds)."""
+    func()
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return repeat / best
+
+
+def report(title, rows):
+    print(f'\n{title}')
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f'  {name:<{width}}  {value}')
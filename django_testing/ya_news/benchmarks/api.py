@@ -0,0 +1,70 @@
+"""Пропускная способность JSON API по сравнению с HTML-страницами."""
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from news.api import api_cache  # noqa: E402
+from news.models import Comment, News  # noqa: E402
+
+REPEAT = 200
+
+
+def read(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def main():
+    user = get_user_model().objects.create(username='bench')
+    News.objects.bulk_create(
+        News(title=f'Новость {i}', text='Текст новости. ' * 200)
+        for i in range(100)
+    )
+    news = News.objects.first()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=user, text=f'Комментарий {i}')
+        for i in range(50)
+    )
+    client = Client()
+    pages = (
+        ('HTML news:home', reverse('news:home'), {}),
+        ('API news:api_list', reverse('news:api_list'), {}),
+        ('HTML news:detail', reverse('news:detail', args=(news.pk,)), {}),
+        (
+            'API news:api_detail',
+            reverse('news:api_detail', args=(news.pk,)),
+            {},
+        ),
+        (
+            'API news:api_comments',
+            reverse('news:api_comments', args=(news.pk,)),
+            {'limit': 50},
+        ),
+    )
+    rows = []
+    for name, url, params in pages:
+        cached = measure(lambda: read(client.get(url, params)), REPEAT)
+
+        def uncached():
+            cache.clear()
+            api_cache().clear()
+            read(client.get(url, params))
+
+        size = len(read(client.get(url, params)))
+        rows.append((
+            name,
+            f'{cached:6.0f} rps, без кеша {measure(uncached, REPEAT):6.0f} '
+            f'rps, {size} байт',
+        ))
+    report(f'{REPEAT} запросов', rows)
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
@@ -0,0 +1,162 @@
+"""
+Поиск почти одинаковых комментариев: точность, полнота и задержка.
+
+В индексе BACKGROUND обычных комментариев из случайных слов и SPAM
+образцов спама. Запросы — варианты спама, где доля слов RATE заменена,
+переставлена или написана заглавными, и новые обычные комментарии.
+Верный ответ — точный коэффициент Жаккара шинглов варианта и образца не
+ниже THRESHOLD. Задержка find_duplicates сравнивается с перебором всех
+комментариев окна по точному коэффициенту (шинглы уже в памяти).
+"""
+import random
+import statistics
+import sys
+import time
+
+from benchmarks import report, setup, test_database
+
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from news import duplicates  # noqa: E402
+from news.models import Comment  # noqa: E402
+from news.pytest_tests import factories  # noqa: E402
+
+BACKGROUND = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+SPAM = 200
+RATES = (0.05, 0.1, 0.2, 0.3, 0.5)
+QUERIES = 200
+BATCH = 1000
+WORDS = (
+    'новость город власти решение давно ждали отлично плохо согласен '
+    'спасибо автору интересно жаль дорога школа парк мост погода цены '
+    'кредит скидка личку пишите сейчас бесплатно выигрыш приз быстро '
+    'деньги работа дома звоните подробности ссылка акция только сегодня'
+).split()
+
+
+def sentence(rng, low=8, high=30):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def mutate(rng, text, rate):
+    words = text.split()
+    for index in range(len(words)):
+        if rng.random() < rate:
+            action = rng.randrange(3)
+            if action == 0:
+                words[index] = rng.choice(WORDS)
+            elif action == 1:
+                words[index] = words[index].upper() + '!'
+            else:
+                other = rng.randrange(len(words))
+                words[index], words[other] = words[other], words[index]
+    return ' '.join(words)
+
+
+def jaccard(first, second):
+    return len(first & second) / len(first | second)
+
+
+def write(news, author, texts):
+    """Записывает комментарии и строит их подписи, как ingest."""
+    now = timezone.now()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=text, created=now)
+        for text in texts
+    )
+    comments = Comment.objects.order_by('-pk')[:len(texts)]
+    started = time.perf_counter()
+    duplicates.index_comments(comments)
+    return time.perf_counter() - started
+
+
+def main():
+    rng = random.Random(1)
+    news = factories.make_news()
+    author = factories.make_user()
+    spam = [sentence(rng, 12, 30) for _ in range(SPAM)]
+    texts = [sentence(rng) for _ in range(BACKGROUND)] + spam
+    indexing = 0.0
+    for start in range(0, len(texts), BATCH):
+        indexing += write(news, author, texts[start:start + BATCH])
+    shingles = [duplicates.shingles(text) for text in texts]
+    threshold = settings.NEAR_DUPLICATES['THRESHOLD']
+
+    rows = [(
+        'запись подписей',
+        f'{len(texts) / indexing:8.0f} комментариев/с',
+    )]
+    totals = {'tp': 0, 'fp': 0, 'fn': 0}
+    for rate in RATES:
+        counts = {'tp': 0, 'fp': 0, 'fn': 0}
+        for _ in range(QUERIES):
+            base = rng.choice(spam)
+            variant = mutate(rng, base, rate)
+            expected = jaccard(
+                duplicates.shingles(variant), duplicates.shingles(base)
+            ) >= threshold
+            found = bool(duplicates.find_duplicates(variant))
+            if found and expected:
+                counts['tp'] += 1
+            elif found:
+                counts['fp'] += 1
+            elif expected:
+                counts['fn'] += 1
+        for name in totals:
+            totals[name] += counts[name]
+        rows.append((
+            f'варианты спама, замена {rate:.0%} слов',
+            f'верно найдено {counts["tp"]}, лишних {counts["fp"]}, '
+            f'пропущено {counts["fn"]} из {QUERIES}',
+        ))
+    legit = [sentence(rng) for _ in range(QUERIES)]
+    false_alarms = sum(
+        bool(duplicates.find_duplicates(text)) for text in legit
+    )
+    rows.append((
+        'новые обычные комментарии',
+        f'ложных срабатываний {false_alarms} из {QUERIES}',
+    ))
+    found = totals['tp'] + totals['fp']
+    relevant = totals['tp'] + totals['fn']
+    rows.append((
+        'точность / полнота',
+        f'{totals["tp"] / max(found, 1):.3f} / '
+        f'{totals["tp"] / max(relevant, 1):.3f}',
+    ))
+
+    queries = [mutate(rng, rng.choice(spam), 0.1) for _ in range(QUERIES)]
+    latencies = []
+    for text in queries:
+        started = time.perf_counter()
+        duplicates.find_duplicates(text)
+        latencies.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    for text in queries[:10]:
+        query = duplicates.shingles(text)
+        [jaccard(query, other) >= threshold for other in shingles]
+    linear = (time.perf_counter() - started) / 10
+    latencies.sort()
+    rows += [
+        ('find_duplicates, медиана',
+         f'{statistics.median(latencies) * 1000:8.2f} мс'),
+        ('find_duplicates, 99-й перцентиль',
+         f'{latencies[int(len(latencies) * 0.99)] * 1000:8.2f} мс'),
+        ('перебор всех комментариев окна', f'{linear * 1000:8.2f} мс'),
+    ]
+    report(
+        f'Почти одинаковые комментарии: в индексе {len(texts)}, '
+        f'порог {threshold}',
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    with test_database(), override_settings(NEAR_DUPLICATES={
+        **settings.NEAR_DUPLICATES, 'ENABLED': True,
+    }):
+        main()
@@ -0,0 +1,79 @@
+"""
+Скорость приёма комментариев: запись по одному и через буфер.
+
+Несколько потоков, как обработчики запросов, одновременно добавляют
+комментарии. База — файл SQLite, чтобы писатели конкурировали за
+блокировку так же, как на сервере.
+"""
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks import report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+
+from news.ingest import CommentBuffer  # noqa: E402
+from news.models import Comment, News  # noqa: E402
+
+THREADS = 8
+PER_THREAD = 250
+
+
+def run_producers(handle, news_id, author_id):
+    """Потоки-производители передают комментарии в handle."""
+    def produce(number):
+        for index in range(PER_THREAD):
+            handle(Comment(
+                news_id=news_id, author_id=author_id,
+                text=f'Комментарий {number}-{index}',
+            ))
+        connections.close_all()
+
+    threads = [
+        threading.Thread(target=produce, args=(number,))
+        for number in range(THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def direct(news_id, author_id):
+    run_producers(lambda comment: comment.save(), news_id, author_id)
+
+
+def buffered(news_id, author_id):
+    buffer = CommentBuffer(batch_size=100, flush_interval=0.05)
+    run_producers(buffer.submit, news_id, author_id)
+    buffer.drain()
+
+
+def main():
+    news_id = News.objects.create(title='Новость', text='Текст').pk
+    author_id = get_user_model().objects.create(username='bench').pk
+    total = THREADS * PER_THREAD
+    rows = []
+    for name, func in (('по одному (save)', direct),
+                       ('буфер (bulk_create)', buffered)):
+        Comment.objects.all().delete()
+        started = time.perf_counter()
+        func(news_id, author_id)
+        elapsed = time.perf_counter() - started
+        assert Comment.objects.count() == total
+        rows.append((name, f'{total / elapsed:8.0f} комментариев/с'))
+    report(f'Приём комментариев: {THREADS} потоков по {PER_THREAD}', rows)
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'bench.sqlite3'
+        )
+        with test_database():
+            main()
@@ -0,0 +1,57 @@
+"""
+Цена записи метрик на каждом запросе.
+
+Замеряется то, что MetricsMiddleware добавляет к запросу: обёртка вокруг
+пустого представления (подключение счётчика запросов к БД и запись
+метрик в файл) и обёртка вокруг одного запроса к БД. Сравнивать целые
+страницы с метриками и без них бесполезно: разница меньше разброса
+замеров.
+"""
+import tempfile
+
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+
+from yanews.metrics import MetricsMiddleware, QueryTimer  # noqa: E402
+
+REPEAT = 20000
+
+
+def microseconds(func):
+    return 1e6 / measure(func, REPEAT)
+
+
+def select(cursor):
+    cursor.execute('SELECT 1')
+    cursor.fetchone()
+
+
+def main(directory):
+    request = RequestFactory().get('/')
+    with override_settings(METRICS={
+        **settings.METRICS, 'ENABLED': True, 'DIRECTORY': directory,
+    }):
+        middleware = MetricsMiddleware(lambda request: HttpResponse())
+        view = microseconds(lambda: HttpResponse())
+        wrapped = microseconds(lambda: middleware(request))
+    with connection.cursor() as cursor:
+        query = microseconds(lambda: select(cursor))
+        with connection.execute_wrapper(QueryTimer()):
+            timed_query = microseconds(lambda: select(cursor))
+    report('Метрики: добавка к запросу', [
+        ('пустое представление', f'{view:7.2f} мкс'),
+        ('то же через MetricsMiddleware', f'{wrapped:7.2f} мкс'),
+        ('запрос к БД', f'{query:7.2f} мкс'),
+        ('запрос к БД со счётчиком', f'{timed_query:7.2f} мкс'),
+    ])
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory, test_database():
+        main(directory)
@@ -0,0 +1,56 @@
+"""Пропускная способность news:detail для авторизованного пользователя."""
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from news.models import Comment, News  # noqa: E402
+
+ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+BACKENDS = {
+    'ModelBackend': 'django.contrib.auth.backends.ModelBackend',
+    'CachedModelBackend': 'news.auth.CachedModelBackend',
+}
+REPEAT = 200
+
+
+def main():
+    user = get_user_model().objects.create(username='bench')
+    news = News.objects.create(title='Новость', text='Текст')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=user, text=f'Комментарий {i}')
+        for i in range(20)
+    )
+    url = reverse('news:detail', args=(news.pk,))
+    rows = []
+    for engine_name, engine in ENGINES.items():
+        for backend_name, backend in BACKENDS.items():
+            with override_settings(
+                SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]
+            ):
+                cache.clear()
+                client = Client()
+                client.force_login(user, backend=backend)
+                rps = measure(lambda: client.get(url), REPEAT)
+                with CaptureQueriesContext(connection) as queries:
+                    client.get(url)
+            rows.append((
+                f'{engine_name} + {backend_name}',
+                f'{rps:6.0f} rps, запросов к БД: {len(queries)}',
+            ))
+    report(f'GET {url}, {REPEAT} запросов', rows)
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
@@ -0,0 +1,120 @@
+"""
+Задержка первых запросов нового рабочего процесса.
+
+Каждый раунд запускает новый процесс Python, который загружает wsgi.py с
+прогревом или без него и выполняет по два GET-запроса к каждому адресу.
+Замеряются загрузка приложения, первый и второй запрос. База — временный
+файл SQLite с миграциями и данными, общий для всех процессов.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUNDS = 5
+
+
+def configure(path, warm):
+    """Настройки процесса замера, до загрузки Django."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = path
+    settings.STATIC_ROOT = None
+    settings.STATICFILES_STORAGE = (
+        'django.contrib.staticfiles.storage.StaticFilesStorage'
+    )
+    settings.SLOW_REQUESTS = {**settings.SLOW_REQUESTS, 'ENABLED': False}
+    settings.WARMUP = {**settings.WARMUP, 'ENABLED': warm}
+
+
+def child(path, warm, urls):
+    """Загружает приложение и печатает JSON с временем в секундах."""
+    configure(path, warm)
+    started = time.perf_counter()
+    from yanews.wsgi import application
+    result = {'boot': time.perf_counter() - started, 'urls': {}}
+    from yanews.startup import get
+    for url in urls:
+        times = []
+        for _ in range(2):
+            started = time.perf_counter()
+            status = get(application, url)
+            times.append(time.perf_counter() - started)
+        assert status == 200, (url, status)
+        result['urls'][url] = times
+    print(json.dumps(result))
+
+
+def prepare(path):
+    """Создаёт базу и возвращает адреса для замера."""
+    configure(path, False)
+    from benchmarks import setup
+    setup()
+    from django.core.management import call_command
+    from django.urls import reverse
+
+    from news.models import Comment, News
+    from news.pytest_tests import factories
+    call_command('migrate', verbosity=0)
+    factories.bulk_news(30)
+    author = factories.make_user()
+    news = News.objects.order_by('-date').first()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(20)
+    )
+    return [
+        reverse('news:home'),
+        reverse('news:detail', args=(news.pk,)),
+        reverse('news:trending'),
+        reverse('users:login'),
+    ]
+
+
+def run(path, warm, urls):
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child', path,
+         str(int(warm)), *urls],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(path, rounds):
+    from benchmarks import report
+    urls = prepare(path)
+    for warm in (False, True):
+        runs = [run(path, warm, urls) for _ in range(rounds)]
+        rows = [(
+            'загрузка wsgi.py',
+            f'{statistics.median(r["boot"] for r in runs) * 1000:8.1f} мс',
+        )]
+        for url in urls:
+            first, second = (
+                statistics.median(r['urls'][url][index] for r in runs)
+                for index in (0, 1)
+            )
+            rows.append((
+                url,
+                f'первый {first * 1000:8.1f} мс, '
+                f'второй {second * 1000:8.1f} мс',
+            ))
+        report(
+            f'Новый процесс {"с прогревом" if warm else "без прогрева"}, '
+            f'медиана {rounds} запусков',
+            rows,
+        )
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], sys.argv[3] == '1', sys.argv[4:])
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            main(
+                os.path.join(directory, 'db.sqlite3'),
+                int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS,
+            )
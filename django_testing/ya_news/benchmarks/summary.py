@@ -0,0 +1,61 @@
+"""Построение главной страницы на длинных статьях: text или summary."""
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.template.defaultfilters import truncatewords  # noqa: E402
+
+from news.feed import build_feed  # noqa: E402
+from news.models import News  # noqa: E402
+
+ARTICLES = 200
+WORDS = 5000
+REPEAT = 100
+
+
+def from_text():
+    """Как до summary: полный текст и truncatewords на каждый рендер."""
+    return [
+        (news.pk, news.title, news.date, truncatewords(news.text, 15),
+         len(news.comment_set.all()))
+        for news in News.objects.prefetch_related(
+            'comment_set'
+        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    ]
+
+
+def main():
+    News.objects.bulk_create(
+        News(
+            title=f'Новость {number}',
+            text=' '.join(f'слово{index}' for index in range(WORDS)),
+        )
+        for number in range(ARTICLES)
+    )
+    loaded = {
+        'text': sum(
+            len(text.encode()) for text in News.objects.values_list(
+                'text', flat=True
+            )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        ),
+        'summary': sum(
+            len(item.summary.encode()) for item in build_feed()
+        ),
+    }
+    report(
+        f'Лента главной: {ARTICLES} статей по {WORDS} слов',
+        [
+            ('text + truncatewords',
+             f'{measure(from_text, REPEAT):8.0f} оп/с, '
+             f'{loaded["text"]} байт текста'),
+            ('summary',
+             f'{measure(build_feed, REPEAT):8.0f} оп/с, '
+             f'{loaded["summary"]} байт текста'),
+        ],
+    )
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
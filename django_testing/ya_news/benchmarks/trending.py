@@ -0,0 +1,101 @@
+"""
+Обсуждаемые новости на миллионе комментариев.
+
+Сравнивается подсчёт по таблице комментариев (GROUP BY за окно), расчёт
+по почасовым корзинам и чтение готового списка из кеша, а также цена
+записи комментария в корзину. Комментарии вставляются напрямую через
+executemany, корзины потом пересчитываются rebuild().
+"""
+import random
+import sys
+from datetime import timedelta
+
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count, Q  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from news import trending  # noqa: E402
+from news.models import Comment, CommentBucket, News  # noqa: E402
+from news.pytest_tests import factories  # noqa: E402
+
+COMMENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+NEWS = 1000
+BATCH = 50_000
+
+
+def insert_comments(author):
+    """COMMENTS комментариев к NEWS новостям за RETENTION часов."""
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    now = timezone.now()
+    seconds = settings.TRENDING['RETENTION'] * 3600
+    adapt = connection.ops.adapt_datetimefield_value
+    sql = (
+        f'INSERT INTO {Comment._meta.db_table} '
+        '(news_id, author_id, text, created, is_hidden) '
+        'VALUES (%s, %s, %s, %s, %s)'
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, COMMENTS, BATCH):
+            cursor.executemany(sql, [
+                (
+                    random.choice(news_ids), author.pk, 'Комментарий',
+                    adapt(now - timedelta(seconds=random.randrange(seconds))),
+                    False,
+                )
+                for _ in range(min(BATCH, COMMENTS - start))
+            ])
+
+
+def from_comments():
+    """Как без корзин: группировка комментариев за окно."""
+    since = timezone.now() - timedelta(hours=settings.TRENDING['WINDOW'])
+    return list(
+        News.objects.annotate(comment_count=Count('comment', filter=Q(
+            comment__is_hidden=False, comment__created__gte=since,
+        ))).filter(comment_count__gt=0).order_by('-comment_count').values_list(
+            'pk', 'title', 'date', 'comment_count'
+        )[:settings.TRENDING['COUNT']]
+    )
+
+
+def main():
+    random.seed(1)
+    author = factories.make_user()
+    factories.bulk_news(NEWS)
+    insert_comments(author)
+    rebuilt = measure(trending.rebuild, 1, rounds=1)
+    news = News.objects.first()
+    created = timezone.now()
+
+    def write():
+        trending.record([(news.pk, created)])
+
+    with override_settings(TRENDING={**settings.TRENDING, 'REFRESH': 3600}):
+        trending.get_trending()
+        rows = [
+            ('GROUP BY по комментариям',
+             f'{measure(from_comments, 3):10.1f} оп/с'),
+            ('по корзинам',
+             f'{measure(trending.build_trending, 100):10.1f} оп/с'),
+            ('из кеша',
+             f'{measure(trending.get_trending, 10000):10.1f} оп/с'),
+            ('запись комментария в корзину',
+             f'{measure(write, 1000):10.1f} оп/с'),
+            ('rebuild() по всем комментариям', f'{rebuilt:10.3f} оп/с'),
+        ]
+    report(
+        f'Обсуждаемое: {COMMENTS} комментариев, {NEWS} новостей, '
+        f'корзин {CommentBucket.objects.count()}',
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
@@ -0,0 +1,49 @@
+"""
+Построение адресов в длинном списке комментариев: {% url %} и {% fast_url %}.
+
+Рендерится цикл из detail.html со ссылками на редактирование и удаление
+каждого комментария, отдельно от остальной страницы.
+"""
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.template import Context, Template  # noqa: E402
+
+from news.models import Comment, News  # noqa: E402
+
+COMMENTS = 1000
+REPEAT = 20
+LOOP = (
+    '{% load fast_urls %}{% for comment in comments %}'
+    '<a href="{% TAG \'news:edit\' comment.pk %}">Редактировать</a> |'
+    '<a href="{% TAG \'news:delete\' comment.pk %}">Удалить</a>'
+    '{% endfor %}'
+)
+
+
+def main():
+    news = News.objects.create(title='Новость', text='Текст')
+    author = get_user_model().objects.create(username='bench')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(COMMENTS)
+    )
+    context = Context({'comments': list(Comment.objects.all())})
+    rows = []
+    results = set()
+    for tag in ('url', 'fast_url'):
+        template = Template(LOOP.replace('TAG', tag))
+        results.add(template.render(context))
+        speed = measure(lambda: template.render(context), REPEAT)
+        rows.append(
+            (tag, f'{speed * COMMENTS * 2:10.0f} адресов/с')
+        )
+    assert len(results) == 1
+    report(f'Ссылки на {COMMENTS} комментариев', rows)
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
@@ -1,15 +1,94 @@
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.http import QueryDict
 
-from .models import Comment, News
+from .models import ArchivedNews, Comment, News
 
+COMMENTS_PER_PAGE = 20
+COMMENTS_PAGE_PARAM = 'comments_page'
 
-class CommentInline(admin.StackedInline):
+
+class CommentPageFormSet(BaseInlineFormSet):
+    """Загружает в форму новости только одну страницу комментариев."""
+    page = 1
+    per_page = COMMENTS_PER_PAGE
+    query = QueryDict()
+
+    def get_queryset(self):
+        if not hasattr(self, '_page_queryset'):
+            start = (self.page - 1) * self.per_page
+            self._page_queryset = super().get_queryset()[
+                start:start + self.per_page
+            ]
+        return self._page_queryset
+
+    def page_url(self, page):
+        """Адрес страницы с остальными параметрами текущего запроса."""
+        query = self.query.copy()
+        query[COMMENTS_PAGE_PARAM] = page
+        return f'?{query.urlencode()}'
+
+    def page_links(self):
+        """Ссылки навигации: первая, соседние и последняя страницы."""
+        total = self.instance.comment_set.count() if self.instance.pk else 0
+        last_page = max((total - 1) // self.per_page + 1, 1)
+        links = {'total': total, 'page': self.page, 'last_page': last_page}
+        if self.page > 1:
+            links['first'] = self.page_url(1)
+            links['previous'] = self.page_url(self.page - 1)
+        if self.page < last_page:
+            links['next'] = self.page_url(self.page + 1)
+            links['last'] = self.page_url(last_page)
+        return links
+
+
+def get_comments_page(request):
+    try:
+        return max(int(request.GET.get(COMMENTS_PAGE_PARAM, 1)), 1)
+    except ValueError:
+        return 1
+
+
+class CommentInline(admin.TabularInline):
     model = Comment
+    formset = CommentPageFormSet
+    template = 'admin/news/comment_inline.html'
     extra = 0
+    raw_id_fields = ('author',)
+    show_change_link = True
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page = get_comments_page(request)
+        # Ссылки страниц сохраняют _changelist_filters и другие параметры.
+        formset.query = request.GET.copy()
+        return formset
 
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
+    list_display = ('title', 'date')
+    search_fields = ('title',)
+    date_hierarchy = 'date'
+    show_full_result_count = False
     inlines = [
         CommentInline,
     ]
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created', 'is_hidden')
+    list_filter = ('is_hidden',)
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+    date_hierarchy = 'created'
+    show_full_result_count = False
+
+
+@admin.register(ArchivedNews)
+class ArchivedNewsAdmin(admin.ModelAdmin):
+    list_display = ('title', 'date')
+    search_fields = ('title',)
+    date_hierarchy = 'date'
+    show_full_result_count = False
@@ -0,0 +1,264 @@
+"""
+JSON API для чтения новостей и комментариев.
+
+Параметр fields задаёт список полей через запятую: из БД читаются только
+они. Страницы переключаются по курсору (keyset-пагинация по дате и id),
+поэтому глубина листания не влияет на стоимость запроса. Готовые ответы
+хранятся в кеше API_CACHE в виде байтов с ключом, включающим версию
+данных. Кеш и версии общие для всех процессов сервера: иначе остальные
+процессы отдавали бы изменённые и удалённые комментарии до истечения
+CACHE_TIMEOUT.
+"""
+import base64
+import json
+import re
+import time
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views import generic
+
+from .models import Comment, News, visible_comment_count
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+CACHE_TIMEOUT = 60 * 60
+
+NEWS_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'date': 'date',
+    'comments': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+}
+
+LIST_VERSION_KEY = 'news:api:version'
+CURSOR_RE = re.compile(r'^[A-Za-z0-9_-]{0,200}$')
+# Первичные ключи — BigAutoField.
+MAX_PK = 2 ** 63 - 1
+
+
+class ApiError(Exception):
+    pass
+
+
+def api_cache():
+    return caches[settings.API_CACHE]
+
+
+def _version_key(news_id):
+    return f'{LIST_VERSION_KEY}:{news_id}'
+
+
+def get_version(key):
+    cache = api_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    cache = api_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate_news(news_id):
+    """Сбрасывает закешированные ответы о новости и списки новостей."""
+    bump_version(_version_key(news_id))
+    bump_version(LIST_VERSION_KEY)
+
+
+def encode_cursor(value, pk):
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, value_type):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = raw.decode().split('|')
+        value, pk = value_type.fromisoformat(value), int(pk)
+    except ValueError:
+        raise ApiError('Некорректный курсор.')
+    if not 0 < pk <= MAX_PK:
+        raise ApiError('Некорректный курсор.')
+    return value, pk
+
+
+def dumps(data):
+    return json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode()
+
+
+class ApiView(generic.View):
+    """Общая логика: разбор параметров, кеширование и ошибки."""
+    allowed_fields = {}
+    default_fields = ()
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = self.get_fields()
+            key = self.get_cache_key(fields)
+            cache = api_cache()
+            body = cache.get(key)
+            if body is None:
+                body = dumps(self.get_data(fields))
+                cache.set(key, body, CACHE_TIMEOUT)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено.'}, status=404)
+        return HttpResponse(body, content_type='application/json')
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return self.default_fields
+        fields = tuple(sorted(set(requested.split(','))))
+        unknown = set(fields) - set(self.allowed_fields)
+        if unknown:
+            raise ApiError(f'Неизвестные поля: {", ".join(sorted(unknown))}.')
+        return fields
+
+    def get_cursor(self):
+        cursor = self.request.GET.get('cursor', '')
+        if not CURSOR_RE.match(cursor):
+            raise ApiError('Некорректный курсор.')
+        return cursor
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', PAGE_SIZE))
+        except ValueError:
+            raise ApiError('limit должен быть числом.')
+        return min(max(limit, 1), MAX_PAGE_SIZE)
+
+    def get_cache_key(self, fields):
+        raise NotImplementedError
+
+    def get_data(self, fields):
+        raise NotImplementedError
+
+    def paginate(self, queryset, fields, order_field, value_type, reverse):
+        """Страница записей после курсора и курсор следующей страницы."""
+        limit = self.get_limit()
+        cursor = self.get_cursor()
+        if cursor:
+            value, pk = decode_cursor(cursor, value_type)
+            after = '__lt' if reverse else '__gt'
+            queryset = queryset.filter(
+                Q(**{order_field + after: value})
+                | Q(**{order_field: value, 'id' + after: pk})
+            )
+        ordering = (order_field, 'id')
+        if reverse:
+            ordering = tuple('-' + name for name in ordering)
+        columns = {self.allowed_fields[name] for name in fields}
+        rows = list(
+            queryset.order_by(*ordering).values(
+                *columns | {order_field, 'id'}
+            )[:limit + 1]
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][order_field], rows[-1]['id'])
+        return {
+            'results': [
+                {name: row[self.allowed_fields[name]] for name in fields}
+                for row in rows
+            ],
+            'next': next_cursor,
+        }
+
+
+class NewsListApi(ApiView):
+    allowed_fields = NEWS_FIELDS
+    default_fields = ('date', 'id', 'title')
+
+    def get_cache_key(self, fields):
+        return ':'.join((
+            'news:api:list',
+            str(get_version(LIST_VERSION_KEY)),
+            ','.join(fields),
+            self.get_cursor(),
+            str(self.get_limit()),
+        ))
+
+    def get_data(self, fields):
+        queryset = News.objects.all()
+        if 'comments' in fields:
+            queryset = queryset.annotate(
+                comment_count=visible_comment_count()
+            )
+        return self.paginate(queryset, fields, 'date', date, reverse=True)
+
+
+class NewsDetailApi(ApiView):
+    allowed_fields = NEWS_FIELDS
+    default_fields = ('date', 'id', 'text', 'title')
+
+    def get_cache_key(self, fields):
+        news_id = self.kwargs['pk']
+        return ':'.join((
+            'news:api:detail',
+            str(news_id),
+            str(get_version(_version_key(news_id))),
+            ','.join(fields),
+        ))
+
+    def get_data(self, fields):
+        queryset = News.objects.filter(pk=self.kwargs['pk'])
+        if 'comments' in fields:
+            queryset = queryset.annotate(
+                comment_count=visible_comment_count()
+            )
+        row = queryset.values(
+            *(self.allowed_fields[name] for name in fields)
+        ).first()
+        if row is None:
+            raise Http404
+        return {name: row[self.allowed_fields[name]] for name in fields}
+
+
+class CommentListApi(ApiView):
+    allowed_fields = COMMENT_FIELDS
+    default_fields = ('author', 'created', 'id', 'text')
+
+    def get_cache_key(self, fields):
+        news_id = self.kwargs['pk']
+        return ':'.join((
+            'news:api:comments',
+            str(news_id),
+            str(get_version(_version_key(news_id))),
+            ','.join(fields),
+            self.get_cursor(),
+            str(self.get_limit()),
+        ))
+
+    def get_data(self, fields):
+        if not News.objects.filter(pk=self.kwargs['pk']).exists():
+            raise Http404
+        queryset = Comment.objects.visible().filter(
+            news_id=self.kwargs['pk']
+        )
+        return self.paginate(
+            queryset, fields, 'created', datetime, reverse=False
+        )
@@ -0,0 +1,129 @@
+"""
+Архив старых новостей.
+
+Новости старше KEEP_DAYS дней вместе с комментариями переносятся командой
+archive_news в таблицы ArchivedNews и ArchivedComment, поэтому рабочие
+таблицы News и Comment и их индексы не растут вместе с историей. Перенос
+идёт пачками по BATCH_SIZE новостей. Каждая пачка — одна транзакция из
+INSERT ... SELECT и DELETE, строки в Python не загружаются.
+
+Архив читается прозрачно: страница новости, которой нет в News, берётся
+из ArchivedNews, а страницы архива по годам и месяцам объединяют обе
+таблицы запросами по индексу date. Списки годов и месяцев кешируются
+в общем кеше API до изменения новостей или следующего переноса.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import api, feed
+from .models import (
+    ArchivedComment, ArchivedNews, Comment, CommentBucket, CommentSignature,
+    News,
+)
+
+DATES_KEY = 'news:archive:dates'
+DATES_VERSION_KEY = 'news:archive:dates:version'
+
+
+def _in(ids):
+    return ', '.join(['%s'] * len(ids))
+
+
+def copy_rows(source, target, field, ids):
+    """Копирует строки source с field из ids в таблицу target."""
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(field.column) for field in target._meta.concrete_fields
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target._meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM {quote(source._meta.db_table)} '
+            f'WHERE {quote(field)} IN ({_in(ids)})',
+            ids,
+        )
+
+
+def delete_rows(model, field, ids):
+    """Удаляет строки без сигналов и загрузки в Python, возвращает число."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(field)} IN ({_in(ids)})',
+            ids,
+        )
+        return cursor.rowcount
+
+
+def archive_batch(ids):
+    """Переносит новости ids с комментариями, возвращает число комментариев."""
+    with transaction.atomic():
+        copy_rows(News, ArchivedNews, 'id', ids)
+        copy_rows(Comment, ArchivedComment, 'news_id', ids)
+        CommentSignature.objects.filter(comment__news_id__in=ids).delete()
+        comments = delete_rows(Comment, 'news_id', ids)
+        delete_rows(CommentBucket, 'news_id', ids)
+        delete_rows(News, 'id', ids)
+    for news_id in ids:
+        api.invalidate_news(news_id)
+    feed.invalidate_feed()
+    invalidate_dates()
+    return comments
+
+
+def archive_before(cutoff, batch_size):
+    """
+    Переносит в архив новости с датой раньше cutoff.
+
+    Выдаёт пары (новостей, комментариев) для каждой перенесённой пачки.
+    """
+    queryset = News.objects.filter(date__lt=cutoff).order_by('pk')
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        yield len(ids), archive_batch(ids)
+
+
+def archive_dates(kind, **filters):
+    """Годы или месяцы (kind), за которые есть новости, новые первыми."""
+    key = ':'.join((
+        DATES_KEY,
+        str(api.get_version(DATES_VERSION_KEY)),
+        kind,
+        *(f'{name}={value}' for name, value in sorted(filters.items())),
+    ))
+    cache = api.api_cache()
+    dates = cache.get(key)
+    if dates is None:
+        dates = sorted(
+            {
+                *News.objects.filter(**filters).dates('date', kind),
+                *ArchivedNews.objects.filter(**filters).dates('date', kind),
+            },
+            reverse=True,
+        )
+        cache.set(key, dates, settings.NEWS_ARCHIVE['DATES_TIMEOUT'])
+    return dates
+
+
+def invalidate_dates():
+    api.bump_version(DATES_VERSION_KEY)
+
+
+def month_news(year, month):
+    """Новости месяца из рабочей и архивной таблиц, новые первыми."""
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    fields = ('id', 'title', 'date')
+    return News.objects.filter(
+        date__gte=start, date__lt=end
+    ).order_by().values(*fields).union(
+        ArchivedNews.objects.filter(
+            date__gte=start, date__lt=end
+        ).order_by().values(*fields),
+        all=True,
+    ).order_by('-date', '-id')
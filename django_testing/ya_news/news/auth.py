@@ -0,0 +1,59 @@
+"""
+Кеширование пользователя для AuthenticationMiddleware.
+
+Без кеша пользователь читается из auth_user на каждом запросе.
+Запись в кеше удаляется при выходе, сохранении (в том числе смене
+пароля и блокировке) и удалении пользователя. Изменения через
+QuerySet.update() кеш не сбрасывают.
+
+Кеш AUTH_USER_CACHE должен быть общим для всех процессов: иначе после
+смены пароля или блокировки другие процессы до истечения записи
+пускали бы пользователя по старым сессиям.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+User = get_user_model()
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def user_cache():
+    return caches[settings.AUTH_USER_CACHE]
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя из кеша."""
+
+    def get_user(self, user_id):
+        cache = user_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+
+def invalidate_user(user_id):
+    user_cache().delete(user_cache_key(user_id))
+
+
+@receiver(post_save, sender=User, dispatch_uid='auth_cache_user_saved')
+@receiver(post_delete, sender=User, dispatch_uid='auth_cache_user_deleted')
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out, dispatch_uid='auth_cache_user_logged_out')
+def user_logged_out_handler(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.checks import Error, Tags, register
+
+from .management.commands.vendor_assets import integrity
+
+
+@register(Tags.staticfiles, deploy=True)
+def check_vendor_assets(app_configs, **kwargs):
+    """Локальные копии VENDOR_ASSETS есть и совпадают с integrity."""
+    errors = []
+    for asset in settings.VENDOR_ASSETS:
+        found = finders.find(asset['path'])
+        if not found:
+            errors.append(Error(
+                f'{asset["path"]} не скачан.',
+                hint='Запустите manage.py vendor_assets.',
+                id='vendor.E001',
+            ))
+            continue
+        with open(found, 'rb') as file:
+            content = file.read()
+        algorithm = asset['integrity'].partition('-')[0]
+        if integrity(content, algorithm) != asset['integrity']:
+            errors.append(Error(
+                f'Хеш {asset["path"]} не совпадает с {asset["integrity"]}.',
+                hint='Запустите manage.py vendor_assets --force.',
+                id='vendor.E002',
+            ))
+    return errors
@@ -0,0 +1,235 @@
+"""
+Поиск почти одинаковых комментариев (MinHash и LSH).
+
+Текст приводится к нижнему регистру (casefold), из него остаются только
+слова, и он режется на шинглы — подстроки по SHINGLE символов. Подпись
+комментария — минимумы PERMUTATIONS хеш-функций по шинглам: доля
+совпавших минимумов у двух подписей оценивает долю общих шинглов
+(коэффициент Жаккара). Хеш-функции — multiply-add-shift: старшие 32 бита
+(a * x + b) mod 2 ** 64.
+
+Подпись делится на BANDS полос по ROWS значений, ключ каждой полосы
+хранится в CommentBand с индексом по (key, created). Кандидаты в
+дубликаты — комментарии последних WINDOW часов, у которых совпал ключ
+хотя бы одной полосы. Это один индексный запрос, сколько бы комментариев
+ни было в окне. У кандидатов сравниваются полные подписи, и дубликатом
+считается комментарий с оценкой сходства не ниже THRESHOLD. Подписи
+кандидатов кешируются в памяти процесса (CACHE_SIZE штук). Строки
+подписей не меняются, поэтому кеш не устаревает.
+
+Тексты короче MIN_LENGTH символов не проверяются: короткие «Согласен!»
+похожи друг на друга законно. Подписи старше WINDOW часов удаляются не
+чаще раза в PRUNE_INTERVAL секунд.
+"""
+import random
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import timedelta
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CommentBand, CommentSignature
+
+SHINGLE = 5
+PERMUTATIONS = 64
+BANDS = 16
+ROWS = PERMUTATIONS // BANDS
+MASK = (1 << 64) - 1
+PRUNED_KEY = 'news:duplicates:pruned'
+
+# Параметры хеш-функций не должны меняться: подписи хранятся в БД.
+_random = random.Random(20240601)
+HASHES = [
+    (_random.getrandbits(64) | 1, _random.getrandbits(64))
+    for _ in range(PERMUTATIONS)
+]
+_FORMAT = f'<{PERMUTATIONS}I'
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join(_WORD.findall(text.casefold()))
+
+
+def shingles(text):
+    """Хеши шинглов нормализованного текста."""
+    text = normalize(text)
+    return {
+        zlib.crc32(text[start:start + SHINGLE].encode())
+        for start in range(max(len(text) - SHINGLE + 1, 1))
+    }
+
+
+def signature(text):
+    values = list(shingles(text))
+    return tuple(
+        # Сдвиг монотонен: его достаточно применить к минимуму.
+        min([(a * value + b) & MASK for value in values]) >> 32
+        for a, b in HASHES
+    )
+
+
+def similarity(first, second):
+    """Оценка коэффициента Жаккара по двум подписям."""
+    return sum(a == b for a, b in zip(first, second)) / PERMUTATIONS
+
+
+def band_keys(values):
+    """Ключи полос подписи: знаковые 64-битные числа для BigIntegerField."""
+    return [
+        int.from_bytes(
+            blake2b(
+                struct.pack(f'<B{ROWS}I', band, *values[start:start + ROWS]),
+                digest_size=8,
+            ).digest(),
+            'little',
+            signed=True,
+        )
+        for band, start in enumerate(range(0, PERMUTATIONS, ROWS))
+    ]
+
+
+def pack(values):
+    return struct.pack(_FORMAT, *values)
+
+
+def unpack(data):
+    return struct.unpack(_FORMAT, bytes(data))
+
+
+def checked(text):
+    return len(normalize(text)) >= settings.NEAR_DUPLICATES['MIN_LENGTH']
+
+
+class SignatureCache:
+    """Подписи по pk CommentSignature, вытесняются давно не нужные."""
+
+    def __init__(self):
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, pks):
+        found = {}
+        with self._lock:
+            for pk in pks:
+                if pk in self._items:
+                    self._items.move_to_end(pk)
+                    found[pk] = self._items[pk]
+        return found
+
+    def set_many(self, items):
+        size = settings.NEAR_DUPLICATES['CACHE_SIZE']
+        with self._lock:
+            self._items.update(items)
+            while len(self._items) > size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+signatures = SignatureCache()
+
+
+def find_duplicates(text, exclude=None):
+    """
+    Похожие комментарии последних WINDOW часов.
+
+    Возвращает пары (pk комментария, сходство) по убыванию сходства.
+    exclude — pk комментария, который не сравнивается сам с собой.
+    """
+    options = settings.NEAR_DUPLICATES
+    if not checked(text):
+        return []
+    values = signature(text)
+    since = timezone.now() - timedelta(hours=options['WINDOW'])
+    candidates = set(
+        CommentBand.objects.filter(
+            key__in=band_keys(values), created__gte=since
+        ).values_list('signature_id', flat=True)
+    )
+    found = signatures.get_many(candidates)
+    missing = candidates - found.keys()
+    if missing:
+        loaded = {
+            pk: (comment_id, unpack(data))
+            for pk, comment_id, data in CommentSignature.objects.filter(
+                pk__in=missing
+            ).values_list('pk', 'comment_id', 'signature')
+        }
+        signatures.set_many(loaded)
+        found.update(loaded)
+    duplicates = [
+        (comment_id, similarity(values, other))
+        for comment_id, other in found.values()
+        if comment_id != exclude
+    ]
+    return sorted(
+        (
+            (comment_id, score) for comment_id, score in duplicates
+            if score >= options['THRESHOLD']
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+def index_comments(comments):
+    """Записывает подписи комментариев, заменяя прежние."""
+    comments = list(comments)
+    with transaction.atomic():
+        CommentSignature.objects.filter(
+            comment_id__in=[comment.pk for comment in comments]
+        ).delete()
+        comments = [comment for comment in comments if checked(comment.text)]
+        if not comments:
+            return 0
+        ids = [comment.pk for comment in comments]
+        values = {comment.pk: signature(comment.text) for comment in comments}
+        CommentSignature.objects.bulk_create(
+            CommentSignature(
+                comment_id=comment.pk,
+                signature=pack(values[comment.pk]),
+                created=comment.created,
+            )
+            for comment in comments
+        )
+        # bulk_create не во всех БД возвращает pk: перечитываем их.
+        rows = CommentSignature.objects.filter(
+            comment_id__in=ids
+        ).values_list('pk', 'comment_id', 'created')
+        CommentBand.objects.bulk_create(
+            CommentBand(signature_id=pk, key=key, created=created)
+            for pk, comment_id, created in rows
+            for key in band_keys(values[comment_id])
+        )
+    prune_if_due()
+    return len(comments)
+
+
+def prune():
+    """Удаляет подписи старше WINDOW часов, возвращает их число."""
+    since = timezone.now() - timedelta(
+        hours=settings.NEAR_DUPLICATES['WINDOW']
+    )
+    with transaction.atomic():
+        CommentBand.objects.filter(created__lt=since).delete()
+        removed, _ = CommentSignature.objects.filter(
+            created__lt=since
+        ).delete()
+    return removed
+
+
+def prune_if_due():
+    if cache.add(
+        PRUNED_KEY, 1, settings.NEAR_DUPLICATES['PRUNE_INTERVAL']
+    ):
+        prune()
@@ -0,0 +1,118 @@
+"""
+Материализованная лента главной страницы.
+
+Лента — кортеж FeedItem для NEWS_COUNT_ON_HOME_PAGE свежих новостей с
+кратким текстом (News.summary) и числом комментариев. Она хранится в кеше
+вместе с версией данных и временем построения.
+
+Изменение новости или комментария сдвигает версию. Устаревшую ленту
+(другая версия или старше FRESH секунд) запрос получает сразу, а
+перестраивается она в фоновом потоке (stale-while-revalidate). Если
+ленты в кеше нет совсем, её строит только запрос, взявший блокировку
+в кеше. Остальные до LOCK_WAIT секунд ждут готовую ленту и лишь потом
+строят её сами, поэтому одновременные промахи не нагружают БД.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from . import api
+from .models import News, visible_comment_count
+
+FEED_KEY = 'news:feed'
+LOCK_KEY = 'news:feed:lock'
+VERSION_KEY = 'news:feed:version'
+POLL_INTERVAL = 0.02
+
+FeedItem = namedtuple(
+    'FeedItem', ('pk', 'title', 'date', 'summary', 'comment_count')
+)
+
+_refreshing = threading.Lock()
+
+
+def build_feed():
+    # values() до annotate(): группировка только по выбранным полям,
+    # иначе БД группирует и по полному тексту новости.
+    fields = ('pk', 'title', 'date', 'summary')
+    rows = News.objects.values(*fields).annotate(
+        comment_count=visible_comment_count()
+    ).values_list(
+        *fields, 'comment_count'
+    )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    return tuple(FeedItem._make(row) for row in rows)
+
+
+def refresh_feed():
+    """Перестраивает ленту. None, если её уже строит кто-то другой."""
+    options = settings.NEWS_FEED
+    if not cache.add(LOCK_KEY, 1, options['LOCK_TIMEOUT']):
+        return None
+    try:
+        version = api.get_version(VERSION_KEY)
+        items = build_feed()
+        cache.set(FEED_KEY, (version, time.time(), items), None)
+        return items
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def _refresh_in_background():
+    try:
+        refresh_feed()
+    finally:
+        connections.close_all()
+        _refreshing.release()
+
+
+def schedule_refresh():
+    """Запускает фоновую перестройку, если она ещё не идёт."""
+    if not _refreshing.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(
+            target=_refresh_in_background, name='news-feed', daemon=True
+        ).start()
+    except RuntimeError:
+        _refreshing.release()
+        raise
+
+
+def load_feed():
+    """Лента при пустом кеше: строит один запрос, остальные ждут его."""
+    deadline = time.monotonic() + settings.NEWS_FEED['LOCK_WAIT']
+    while True:
+        items = refresh_feed()
+        if items is not None:
+            return items
+        time.sleep(POLL_INTERVAL)
+        cached = cache.get(FEED_KEY)
+        if cached is not None:
+            return cached[2]
+        if time.monotonic() >= deadline:
+            return build_feed()
+
+
+def get_feed():
+    cached = cache.get(FEED_KEY)
+    if cached is None:
+        return load_feed()
+    version, built_at, items = cached
+    options = settings.NEWS_FEED
+    if (
+        version == api.get_version(VERSION_KEY)
+        and time.time() - built_at < options['FRESH']
+    ):
+        return items
+    if options['BACKGROUND']:
+        schedule_refresh()
+        return items
+    return refresh_feed() or items
+
+
+def invalidate_feed():
+    api.bump_version(VERSION_KEY)
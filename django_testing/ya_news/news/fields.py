@@ -0,0 +1,85 @@
+"""
+Сжатое хранение длинных текстов.
+
+CompressedTextField в Python — обычная строка, а в БД — двоичное
+значение с байтом-заголовком: RAW для текста в UTF-8 как есть и ZLIB для
+сжатого zlib. Тексты короче THRESHOLD байт и тексты, которые не
+сжимаются, хранятся как есть: для коротких строк zlib только добавил бы
+работы и байтов. Заголовок оставляет место для других алгоритмов без
+перезаписи старых строк.
+
+Текст распаковывается при чтении строки из БД. Списки, которые текст не
+выводят, должны исключать его через defer('text').
+"""
+import zlib
+
+from django import forms
+from django.db import models
+
+RAW = b'\x00'
+ZLIB = b'\x01'
+THRESHOLD = 512
+LEVEL = 6
+
+
+def compress(text):
+    data = text.encode()
+    if len(data) >= THRESHOLD:
+        packed = zlib.compress(data, LEVEL)
+        if len(packed) < len(data):
+            return ZLIB + packed
+    return RAW + data
+
+
+def decompress(value):
+    value = bytes(value)
+    header, data = value[:1], value[1:]
+    if header == ZLIB:
+        data = zlib.decompress(data)
+    elif header not in (RAW, b''):
+        raise ValueError(f'Неизвестный заголовок сжатого текста: {header}')
+    return data.decode()
+
+
+class CompressedTextField(models.BinaryField):
+    """Текстовое поле, которое хранит длинные значения сжатыми."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if kwargs.get('editable'):
+            del kwargs['editable']
+        else:
+            kwargs['editable'] = False
+        return name, path, args, kwargs
+
+    def get_default(self):
+        return models.Field.get_default(self)
+
+    def from_db_value(self, value, expression, connection):
+        # Строка — значение, записанное в столбец до сжатия (SQLite).
+        if value is None or isinstance(value, str):
+            return value
+        return decompress(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress(value)
+        return value
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return compress(str(value))
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(
+            self, **{'widget': forms.Textarea, **kwargs}
+        )
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
+from . import duplicates
 from .models import Comment
 
 BAD_WORDS = (
@@ -9,6 +11,12 @@ BAD_WORDS = (
     # Дополните список на своё усмотрение.
 )
 WARNING = 'Не ругайтесь!'
+DUPLICATE_WARNING = 'Почти такой же комментарий уже есть.'
+
+
+def contains_bad_words(text):
+    lowered_text = text.lower()
+    return any(word in lowered_text for word in BAD_WORDS)
 
 
 class CommentForm(ModelForm):
@@ -18,10 +26,12 @@ class CommentForm(ModelForm):
         fields = ('text',)
 
     def clean_text(self):
-        """Не позволяем ругаться в комментариях."""
+        """Не позволяем ругаться и повторять чужие комментарии."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if contains_bad_words(text):
+            raise ValidationError(WARNING)
+        if settings.NEAR_DUPLICATES['ENABLED'] and duplicates.find_duplicates(
+            text, exclude=self.instance.pk
+        ):
+            raise ValidationError(DUPLICATE_WARNING)
         return text
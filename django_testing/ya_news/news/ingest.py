@@ -0,0 +1,197 @@
+"""
+Буферизованная запись комментариев.
+
+Если в настройке COMMENT_INGESTION включён BUFFERED, проверенные формой
+комментарии не сохраняются в обработчике запроса. Они попадают в очередь
+процесса. Фоновый поток забирает их пачками: не больше BATCH_SIZE штук
+и не дольше FLUSH_INTERVAL секунд ожидания следующего комментария. Каждая
+пачка записывается одним bulk_create в одной транзакции.
+
+Гарантии:
+
+* Долговечность. Очередь хранится в памяти процесса. При штатном
+  завершении процесса очередь дописывается в БД. При аварийном всё, что
+  ещё не записано, теряется: не больше MAX_QUEUE комментариев. Редирект
+  пользователь получает раньше, чем комментарий попадёт в БД, поэтому
+  комментарий может появиться на странице не сразу.
+* Порядок. Комментарии одного процесса записываются в порядке приёма,
+  а created получает время записи пачки. Между процессами порядок не
+  гарантируется.
+* Переполнение. Если очередь заполнена, комментарий сохраняется сразу,
+  как без буфера: данные не теряются, а запрос не ждёт.
+* Ошибки записи. Если пачка не записалась, её комментарии сохраняются
+  по одному. Те, что сохранить не удалось (например, новость уже
+  удалена), отбрасываются с записью в лог.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+
+from . import api, duplicates, feed, trending
+from .models import Comment
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_TIMEOUT = 5
+
+
+def fill_pks(comments):
+    """
+    Проставляет pk комментариям после bulk_create.
+
+    SQLite не возвращает pk из bulk_create: строки перечитываются по
+    (news_id, author_id, created).
+    """
+    missing = [comment for comment in comments if comment.pk is None]
+    if not missing:
+        return
+    found = defaultdict(list)
+    for pk, *key in Comment.objects.filter(
+        news_id__in={comment.news_id for comment in missing},
+        created__in={comment.created for comment in missing},
+    ).order_by('pk').values_list('pk', 'news_id', 'author_id', 'created'):
+        found[tuple(key)].append(pk)
+    for comment in missing:
+        comment.pk = found[
+            (comment.news_id, comment.author_id, comment.created)
+        ].pop(0)
+
+
+def write_comments(comments):
+    """Записывает пачку комментариев и сбрасывает кеши."""
+    try:
+        with transaction.atomic():
+            Comment.objects.bulk_create(comments)
+            # bulk_create не отправляет post_save: корзины обновляются здесь.
+            trending.record(
+                (comment.news_id, comment.created) for comment in comments
+                if not comment.is_hidden
+            )
+            if settings.NEAR_DUPLICATES['ENABLED']:
+                fill_pks(comments)
+                duplicates.index_comments(comments)
+    except DatabaseError:
+        logger.warning(
+            'Не удалось записать пачку из %s комментариев, пишем по одному',
+            len(comments), exc_info=True,
+        )
+        for comment in comments:
+            try:
+                with transaction.atomic():
+                    comment.save(force_insert=True)
+            except DatabaseError:
+                logger.exception(
+                    'Комментарий пользователя %s к новости %s отброшен',
+                    comment.author_id, comment.news_id,
+                )
+    for news_id in {comment.news_id for comment in comments}:
+        api.invalidate_news(news_id)
+    feed.invalidate_feed()
+
+
+class CommentBuffer:
+    """Очередь комментариев и фоновый поток, который записывает их."""
+
+    def __init__(self, batch_size=100, flush_interval=0.2, max_queue=10000,
+                 write=write_comments):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.write = write
+        self.queue = queue.Queue(max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, comment):
+        """Ставит комментарий в очередь. False, если очередь заполнена."""
+        self.start()
+        try:
+            self.queue.put_nowait(comment)
+        except queue.Full:
+            return False
+        return True
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='comment-writer', daemon=True
+                )
+                self._thread.start()
+
+    def drain(self, timeout=None):
+        """Ждёт записи всех принятых комментариев. False по таймауту."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = (
+                    None if deadline is None else deadline - time.monotonic()
+                )
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def next_batch(self):
+        """Ждёт первый комментарий и добирает к нему пачку."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self.next_batch()
+            try:
+                self.write(batch)
+            except Exception:
+                logger.exception(
+                    'Пачка из %s комментариев потеряна', len(batch)
+                )
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self.queue.task_done()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """Общий для процесса буфер с параметрами из настроек."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            options = settings.COMMENT_INGESTION
+            _buffer = CommentBuffer(
+                batch_size=options['BATCH_SIZE'],
+                flush_interval=options['FLUSH_INTERVAL'],
+                max_queue=options['MAX_QUEUE'],
+            )
+            atexit.register(_buffer.drain, SHUTDOWN_TIMEOUT)
+        return _buffer
+
+
+def submit(comment):
+    """
+    Отдаёт комментарий на буферизованную запись.
+
+    Возвращает False, если буфер выключен или заполнен: тогда комментарий
+    нужно сохранить обычным образом.
+    """
+    if not settings.COMMENT_INGESTION['BUFFERED']:
+        return False
+    return get_buffer().submit(comment)
@@ -0,0 +1,55 @@
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from news import archive
+from news.models import Comment, News
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит старые новости с комментариями в архивные таблицы.'
+    )
+
+    def add_arguments(self, parser):
+        options = settings.NEWS_ARCHIVE
+        parser.add_argument(
+            '--keep-days', type=int, default=options['KEEP_DAYS'],
+            help='Новости за сколько последних дней оставить.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=options['BATCH_SIZE'],
+        )
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help='После переноса вернуть место ОС (VACUUM).',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = date.today() - timedelta(days=options['keep_days'])
+        started = time.monotonic()
+        news = comments = 0
+        for batch_news, batch_comments in archive.archive_before(
+            cutoff, options['batch_size']
+        ):
+            news += batch_news
+            comments += batch_comments
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'Перенесено новостей: {news}, комментариев: {comments}.'
+                )
+        if options['vacuum']:
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+        self.stdout.write(
+            f'В архив до {cutoff} перенесено новостей: {news}, '
+            f'комментариев: {comments} за '
+            f'{time.monotonic() - started:.1f} с.'
+        )
+        self.stdout.write(
+            f'В рабочих таблицах новостей: {News.objects.count()}, '
+            f'комментариев: {Comment.objects.count()}.'
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News, fill_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает краткий текст новостей, например после массового '
+        'изменения через QuerySet.update() или смены длины summary.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--missing-only', action='store_true',
+            help='Только новости с пустым summary.',
+        )
+
+    def handle(self, *args, **options):
+        updated = fill_summaries(
+            News, options['batch_size'], options['missing_only']
+        )
+        self.stdout.write(f'Обновлено новостей: {updated}.')
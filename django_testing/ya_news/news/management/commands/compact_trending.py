@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from news import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Сжимает почасовые счётчики комментариев для обсуждаемых '
+        'новостей и удаляет устаревшие.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Сначала пересчитать счётчики по комментариям.',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            created = trending.rebuild()
+            self.stdout.write(f'Пересчитано корзин: {created}.')
+        merged, removed = trending.compact()
+        self.stdout.write(
+            f'Слито почасовых корзин: {merged}, удалено устаревших: '
+            f'{removed}.'
+        )
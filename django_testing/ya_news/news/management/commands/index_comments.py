@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from news import chunked, duplicates
+from news.models import Comment
+
+
+def recent_comments(hours):
+    return Comment.objects.filter(
+        created__gte=timezone.now() - timedelta(hours=hours)
+    )
+
+
+def index_range(after, last, hours):
+    """Записывает подписи комментариев диапазона pk."""
+    comments = recent_comments(hours).filter(
+        pk__gt=after, pk__lte=last
+    ).only('text', 'created')
+    return duplicates.index_comments(comments)
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит MinHash-подписи комментариев за последние часы для '
+        'поиска почти одинаковых.'
+    )
+
+    def add_arguments(self, parser):
+        chunked.add_arguments(parser)
+        parser.add_argument(
+            '--hours', type=int,
+            default=settings.NEAR_DUPLICATES['WINDOW'],
+            help='За сколько последних часов взять комментарии.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        checkpoint = chunked.Checkpoint(options['checkpoint'])
+        indexed = checkpoint.state.get('indexed', 0)
+        for _, last, count in chunked.run_ranges(
+            partial(index_range, hours=options['hours']),
+            recent_comments(options['hours']), options['chunk_size'],
+            options['workers'], checkpoint,
+        ):
+            indexed += count
+            checkpoint.state['indexed'] = indexed
+            if options['verbosity'] > 1:
+                self.stdout.write(f'До pk {last}: подписей {indexed}.')
+        removed = duplicates.prune()
+        self.stdout.write(
+            f'Подписей записано: {indexed}, устаревших удалено: {removed}, '
+            f'{time.monotonic() - started:.1f} с.'
+        )
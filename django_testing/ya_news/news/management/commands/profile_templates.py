@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from yanews.template_profiling import profile_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает страницы и выводит время рендеринга каждого шаблона '
+        'и число его подключений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*', default=['news:home'],
+            help='Имена маршрутов или пути, например news:detail:1 или /.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--user', help='Имя пользователя для авторизованных запросов.'
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        if options['user']:
+            user = get_user_model().objects.filter(
+                username=options['user']
+            ).first()
+            if user is None:
+                raise CommandError(f'Нет пользователя {options["user"]}.')
+            client.force_login(user)
+        for url in options['urls']:
+            path = url if url.startswith('/') else self._reverse(url)
+            with profile_templates() as stats:
+                for _ in range(options['repeat']):
+                    client.get(path)
+            self.stdout.write(f'\n{path} ({options["repeat"]} запросов)')
+            self.stdout.write(
+                f'{"шаблон":<40}{"рендеров":>10}{"всего, мс":>12}'
+                f'{"своё, мс":>12}'
+            )
+            for name, count, total, own in stats.rows():
+                self.stdout.write(
+                    f'{name:<40}{count:>10}{total * 1000:>12.2f}'
+                    f'{own * 1000:>12.2f}'
+                )
+
+    @staticmethod
+    def _reverse(url):
+        name, *args = url.rsplit(':', 1) if url.count(':') > 1 else (url,)
+        return reverse(name, args=args)
@@ -0,0 +1,57 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from news import chunked
+from news.models import Comment
+
+
+def count_range(after, last):
+    """Число комментариев к каждой новости в диапазоне pk."""
+    return dict(
+        Comment.objects.filter(pk__gt=after, pk__lte=last)
+        .order_by()
+        .values_list('news_id')
+        .annotate(total=Count('pk'))
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает комментарии по новостям, обходя таблицу '
+        'комментариев пачками.'
+    )
+
+    def add_arguments(self, parser):
+        chunked.add_arguments(parser)
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Сколько новостей с наибольшим числом комментариев вывести.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        checkpoint = chunked.Checkpoint(options['checkpoint'])
+        # Счётчики до контрольной точки восстанавливаются из неё.
+        totals = Counter({
+            int(news_id): count for news_id, count
+            in checkpoint.state.get('totals', {}).items()
+        })
+        for _, last, counts in chunked.run_ranges(
+            count_range, Comment.objects.all(), options['chunk_size'],
+            options['workers'], checkpoint,
+        ):
+            totals.update(counts)
+            checkpoint.state['totals'] = totals
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Обработано до pk {last}.')
+        total = sum(totals.values())
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Комментариев: {total}, новостей с комментариями: '
+            f'{len(totals)}, {total / max(elapsed, 1e-9):.0f} строк/с.'
+        )
+        for news_id, count in totals.most_common(options['top']):
+            self.stdout.write(f'  новость {news_id}: {count}')
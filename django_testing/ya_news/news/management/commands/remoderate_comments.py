@@ -0,0 +1,94 @@
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand
+
+from news import api, chunked, feed, trending
+from news.forms import contains_bad_words
+from news.models import Comment
+
+
+def moderate_range(after, last, dry_run=False):
+    """
+    Проверяет видимые комментарии диапазона по правилам CommentForm.
+
+    Нарушители скрываются одним UPDATE ... WHERE id IN (...) и
+    вычитаются из счётчиков обсуждаемых новостей.
+    """
+    started = time.perf_counter()
+    rows = Comment.objects.visible().filter(
+        pk__gt=after, pk__lte=last
+    ).values_list('pk', 'news_id', 'created', 'text')
+    scanned = 0
+    offenders = {}
+    for pk, news_id, created, text in rows:
+        scanned += 1
+        if contains_bad_words(text):
+            offenders[pk] = (news_id, created)
+    if offenders and not dry_run:
+        Comment.objects.filter(pk__in=offenders).update(is_hidden=True)
+        trending.record(offenders.values(), -1)
+    return {
+        'scanned': scanned,
+        'hidden': len(offenders),
+        'news': sorted({news_id for news_id, _ in offenders.values()}),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет существующие комментарии по текущему списку '
+        'запрещённых слов и скрывает нарушителей.'
+    )
+
+    def add_arguments(self, parser):
+        chunked.add_arguments(parser)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать нарушителей, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        # Пробный запуск ничего не меняет, и продолжать его незачем.
+        checkpoint = chunked.Checkpoint(
+            None if options['dry_run'] else options['checkpoint']
+        )
+        totals = {
+            'scanned': 0, 'hidden': 0, 'seconds': 0.0,
+            **checkpoint.state,
+        }
+        news_ids = set(totals.pop('news', ()))
+        started = time.monotonic()
+        for _, last, result in chunked.run_ranges(
+            partial(moderate_range, dry_run=options['dry_run']),
+            Comment.objects.all(), options['chunk_size'],
+            options['workers'], checkpoint,
+        ):
+            for name in ('scanned', 'hidden', 'seconds'):
+                totals[name] += result[name]
+            news_ids.update(result['news'])
+            checkpoint.state = {**totals, 'news': sorted(news_ids)}
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'До pk {last}: проверено {totals["scanned"]}, '
+                    f'скрыто {totals["hidden"]}.'
+                )
+        if not options['dry_run']:
+            # Воркеры меняли БД через update(): сигналов не было.
+            for news_id in news_ids:
+                api.invalidate_news(news_id)
+            if news_ids:
+                feed.invalidate_feed()
+        elapsed = time.monotonic() - started
+        verb = 'Найдено' if options['dry_run'] else 'Скрыто'
+        self.stdout.write(
+            f'Проверено комментариев: {totals["scanned"]}. '
+            f'{verb} нарушителей: {totals["hidden"]}.'
+        )
+        self.stdout.write(
+            f'{totals["scanned"] / max(elapsed, 1e-9):.0f} комментариев/с '
+            f'всего, '
+            f'{totals["scanned"] / max(totals["seconds"], 1e-9):.0f} '
+            f'комментариев/с на процесс.'
+        )
@@ -0,0 +1,108 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from yanews.slow_requests import load_captures
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит самые медленные сохранённые запросы и сводку по '
+        'маршрутам, функциям и SQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--view', help='Только записи маршрута, например news:detail.'
+        )
+
+    def handle(self, *args, **options):
+        captures = load_captures(str(settings.SLOW_REQUESTS['DIRECTORY']))
+        if options['view']:
+            captures = [
+                capture for capture in captures
+                if capture['view'] == options['view']
+            ]
+        if not captures:
+            self.stdout.write('Записей нет.')
+            return
+        limit = options['limit']
+        captures.sort(key=lambda capture: capture['duration'], reverse=True)
+        self.slowest(captures[:limit], len(captures))
+        self.by_view(captures)
+        self.by_function(captures, limit)
+        self.by_query(captures, limit)
+
+    def slowest(self, captures, count):
+        self.stdout.write(f'\nСамые медленные запросы (всего {count})')
+        self.stdout.write(
+            f'{"время, с":>10}  {"маршрут":<24}{"статус":>7}{"SQL":>6}'
+            f'  {"профиль":<9}файл'
+        )
+        for capture in captures:
+            self.stdout.write(
+                f'{capture["duration"]:>10.3f}  {capture["view"]:<24}'
+                f'{capture["status"]:>7}{capture["query_count"]:>6}'
+                f'  {capture["profiler"]:<9}{capture["file"]}'
+            )
+
+    def by_view(self, captures):
+        views = defaultdict(list)
+        for capture in captures:
+            views[capture['view']].append(capture)
+        self.stdout.write('\nПо маршрутам')
+        self.stdout.write(
+            f'{"маршрут":<24}{"записей":>9}{"среднее, с":>12}'
+            f'{"макс., с":>10}{"SQL, с":>9}'
+        )
+        for view, items in sorted(
+            views.items(), key=lambda item: -max(
+                capture['duration'] for capture in item[1]
+            )
+        ):
+            durations = [capture['duration'] for capture in items]
+            query_time = sum(capture['query_time'] for capture in items)
+            self.stdout.write(
+                f'{view:<24}{len(items):>9}'
+                f'{sum(durations) / len(items):>12.3f}{max(durations):>10.3f}'
+                f'{query_time / len(items):>9.3f}'
+            )
+
+    def by_function(self, captures, limit):
+        own = defaultdict(float)
+        total = defaultdict(float)
+        seen = defaultdict(int)
+        for capture in captures:
+            for name, own_time, total_time in capture['functions']:
+                own[name] += own_time
+                total[name] += total_time
+                seen[name] += 1
+        self.stdout.write('\nФункции по собственному времени')
+        self.stdout.write(
+            f'{"своё, с":>9}{"всего, с":>10}{"записей":>9}  функция'
+        )
+        for name in sorted(own, key=own.get, reverse=True)[:limit]:
+            self.stdout.write(
+                f'{own[name]:>9.3f}{total[name]:>10.3f}{seen[name]:>9}'
+                f'  {name}'
+            )
+
+    def by_query(self, captures, limit):
+        durations = defaultdict(float)
+        counts = defaultdict(int)
+        for capture in captures:
+            for sql, duration in capture['queries']:
+                durations[sql] += duration
+                counts[sql] += 1
+        if not durations:
+            return
+        self.stdout.write('\nSQL по суммарному времени')
+        self.stdout.write(f'{"всего, с":>10}{"раз":>7}  запрос')
+        for sql in sorted(durations, key=durations.get, reverse=True)[
+            :limit
+        ]:
+            self.stdout.write(
+                f'{durations[sql]:>10.3f}{counts[sql]:>7}  {sql[:200]}'
+            )
@@ -0,0 +1,51 @@
+import base64
+import hashlib
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TIMEOUT = 30
+
+
+def integrity(content, algorithm):
+    """Хеш содержимого в формате SRI для атрибута integrity."""
+    digest = hashlib.new(algorithm, content).digest()
+    return f'{algorithm}-{base64.b64encode(digest).decode()}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Скачивает сторонние статические файлы из VENDOR_ASSETS в первый '
+        'каталог STATICFILES_DIRS и сверяет их с хешем integrity. '
+        'Сохранённые файлы только проверяются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Скачать заново и уже сохранённые файлы.',
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATICFILES_DIRS[0])
+        for asset in settings.VENDOR_ASSETS:
+            target = root / asset['path']
+            downloaded = options['force'] or not target.exists()
+            if downloaded:
+                with urlopen(asset['url'], timeout=TIMEOUT) as response:
+                    content = response.read()
+            else:
+                content = target.read_bytes()
+            algorithm = asset['integrity'].partition('-')[0]
+            if integrity(content, algorithm) != asset['integrity']:
+                raise CommandError(
+                    f'Хеш {asset["path"]} не совпадает с {asset["integrity"]}.'
+                )
+            if downloaded:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(content)
+                self.stdout.write(f'Скачан {asset["path"]}.')
+            else:
+                self.stdout.write(f'Проверен {asset["path"]}.')
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.15 on 2026-10-19 08:02
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='news',
+            name='date',
+            field=models.DateField(db_index=True, default=datetime.datetime.today),
+        ),
+    ]
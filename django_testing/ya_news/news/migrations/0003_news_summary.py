@@ -0,0 +1,46 @@
+# Generated by Django 3.2.15 on 2026-10-19 08:16
+
+from django.db import migrations, models
+from django.template.defaultfilters import truncatewords
+
+# Константы и код заполнения скопированы сюда, чтобы миграция не менялась
+# вместе с news.models.
+SUMMARY_WORDS = 15
+BATCH_SIZE = 500
+
+
+def backfill(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    last_pk = 0
+    while True:
+        chunk = list(
+            News.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', 'text'
+            )[:BATCH_SIZE]
+        )
+        if not chunk:
+            return
+        News.objects.bulk_update(
+            [
+                News(pk=pk, summary=truncatewords(text, SUMMARY_WORDS))
+                for pk, text in chunk
+            ],
+            ['summary'],
+        )
+        last_pk = chunk[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='summary',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
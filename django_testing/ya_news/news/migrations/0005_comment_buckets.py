@@ -0,0 +1,72 @@
+# Generated by Django 3.2.15 on 2026-10-19 08:41
+
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Константы и код заполнения скопированы сюда, чтобы миграция не менялась
+# вместе с news.models и настройкой TRENDING.
+RETENTION_HOURS = 72
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    """Почасовые корзины по видимым комментариям последних RETENTION_HOURS."""
+    Comment = apps.get_model('news', 'Comment')
+    CommentBucket = apps.get_model('news', 'CommentBucket')
+    since_hour = int(time.time() // 3600) - RETENTION_HOURS
+    queryset = Comment.objects.filter(
+        is_hidden=False,
+        created__gte=datetime.fromtimestamp(since_hour * 3600, timezone.utc),
+    ).order_by('pk')
+    counts = Counter()
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk).values_list(
+            'pk', 'news_id', 'created'
+        )[:BATCH_SIZE])
+        if not chunk:
+            break
+        counts.update(
+            (news_id, int(created.timestamp() // 3600))
+            for _, news_id, created in chunk
+        )
+        last_pk = chunk[-1][0]
+    CommentBucket.objects.bulk_create(
+        (
+            CommentBucket(news_id=news_id, hour=hour, count=count)
+            for (news_id, hour), count in counts.items()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_comment_is_hidden'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='news.news')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='commentbucket',
+            index=models.Index(fields=['hour'], name='comment_bucket_hour_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='commentbucket',
+            constraint=models.UniqueConstraint(fields=('news', 'hour'), name='comment_bucket_news_hour'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.15 on 2026-10-19 08:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('news', '0005_comment_buckets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNews',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=50)),
+                ('text', models.TextField()),
+                ('summary', models.TextField(blank=True)),
+                ('date', models.DateField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Архивная новость',
+                'verbose_name_plural': 'Архивные новости',
+                'ordering': ('-date',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('created', models.DateTimeField()),
+                ('is_hidden', models.BooleanField(default=False)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment_set', to='news.archivednews')),
+            ],
+            options={
+                'ordering': ('created',),
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations, models
+
+import news.fields
+
+# Код переноса скопирован сюда, чтобы миграция не менялась вместе с
+# news.fields.
+BATCH_SIZE = 500
+
+
+def copy_column(model, source, target):
+    """Переписывает текст из поля source в поле target пачками."""
+    last_pk = 0
+    while True:
+        chunk = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', source
+            )[:BATCH_SIZE]
+        )
+        if not chunk:
+            return
+        model.objects.bulk_update(
+            [model(pk=pk, **{target: text}) for pk, text in chunk],
+            [target],
+        )
+        last_pk = chunk[-1][0]
+
+
+def pack_texts(apps, schema_editor):
+    for name in ('Comment', 'ArchivedComment'):
+        copy_column(apps.get_model('news', name), 'text', 'packed_text')
+
+
+def unpack_texts(apps, schema_editor):
+    for name in ('Comment', 'ArchivedComment'):
+        copy_column(apps.get_model('news', name), 'packed_text', 'text')
+
+
+def compress_text(model_name):
+    """Операции перед и после переноса текста для одной модели."""
+    before = [
+        migrations.AddField(
+            model_name=model_name,
+            name='packed_text',
+            field=news.fields.CompressedTextField(null=True),
+        ),
+        # При откате столбец text добавляется пустым и заполняется.
+        migrations.AlterField(
+            model_name=model_name,
+            name='text',
+            field=models.TextField(null=True),
+        ),
+    ]
+    after = [
+        migrations.RemoveField(
+            model_name=model_name,
+            name='text',
+        ),
+        migrations.RenameField(
+            model_name=model_name,
+            old_name='packed_text',
+            new_name='text',
+        ),
+        migrations.AlterField(
+            model_name=model_name,
+            name='text',
+            field=news.fields.CompressedTextField(),
+        ),
+    ]
+    return before, after
+
+
+COMMENT = compress_text('comment')
+ARCHIVED_COMMENT = compress_text('archivedcomment')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_archive'),
+    ]
+
+    operations = [
+        *COMMENT[0],
+        *ARCHIVED_COMMENT[0],
+        migrations.RunPython(pack_texts, unpack_texts),
+        *COMMENT[1],
+        *ARCHIVED_COMMENT[1],
+    ]
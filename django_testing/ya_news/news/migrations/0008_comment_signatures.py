@@ -0,0 +1,36 @@
+# Generated by Django 3.2.15 on 2026-10-19 08:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_comment_text_compressed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.BinaryField()),
+                ('created', models.DateTimeField(db_index=True)),
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='news.comment')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CommentBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('created', models.DateTimeField()),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='news.commentsignature')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='commentband',
+            index=models.Index(fields=['key', 'created'], name='comment_band_key_idx'),
+        ),
+    ]
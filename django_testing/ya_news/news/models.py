@@ -1,13 +1,95 @@
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
 
 from django.conf import settings
 from django.db import models
+from django.template.defaultfilters import truncatewords
+
+from .chunked import iter_chunks
+from .fields import CompressedTextField
+
+SUMMARY_WORDS = 15
+
+
+def make_summary(text):
+    """Краткий текст новости для списков, как truncatewords:15."""
+    return truncatewords(text, SUMMARY_WORDS)
+
+
+def fill_summaries(model, batch_size=500, missing_only=False):
+    """
+    Пересчитывает summary пачками по batch_size новостей.
+
+    Из БД читаются только pk и text. Возвращает число обновлённых
+    новостей.
+    """
+    queryset = model._base_manager.all()
+    if missing_only:
+        queryset = queryset.filter(summary='')
+    updated = 0
+    for chunk in iter_chunks(queryset, ['text'], batch_size):
+        model._base_manager.bulk_update(
+            [model(pk=pk, summary=make_summary(text)) for pk, text in chunk],
+            ['summary'],
+        )
+        updated += len(chunk)
+    return updated
+
+
+def hour_number(moment):
+    """Номер часа от начала эпохи Unix, в который попадает moment."""
+    return int(moment.timestamp() // 3600)
+
+
+def fill_buckets(comment_model, bucket_model, since_hour, batch_size=1000):
+    """
+    Пересчитывает CommentBucket по видимым комментариям с часа since_hour.
+
+    Корзины с этого часа удаляются и создаются заново. Из БД читаются
+    только pk, news_id и created. Возвращает число созданных корзин.
+    """
+    since = datetime.fromtimestamp(since_hour * 3600, timezone.utc)
+    queryset = comment_model._base_manager.filter(
+        is_hidden=False, created__gte=since
+    )
+    counts = Counter()
+    for chunk in iter_chunks(queryset, ['news_id', 'created'], batch_size):
+        counts.update(
+            (news_id, hour_number(created)) for _, news_id, created in chunk
+        )
+    bucket_model._base_manager.filter(hour__gte=since_hour).delete()
+    bucket_model._base_manager.bulk_create(
+        (
+            bucket_model(news_id=news_id, hour=hour, count=count)
+            for (news_id, hour), count in counts.items()
+        ),
+        batch_size=batch_size,
+    )
+    return len(counts)
+
+
+class NewsQuerySet(models.QuerySet):
+    """Массовые операции, которые поддерживают summary в актуальном виде."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.summary = make_summary(obj.text)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if isinstance(kwargs.get('text'), str):
+            kwargs['summary'] = make_summary(kwargs['text'])
+        return super().update(**kwargs)
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
-    date = models.DateField(default=datetime.today)
+    summary = models.TextField(blank=True, editable=False)
+    date = models.DateField(default=datetime.today, db_index=True)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
@@ -17,6 +99,25 @@ class News(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.summary = make_summary(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'summary'}
+        super().save(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def visible(self):
+        """Комментарии, не скрытые модерацией."""
+        return self.filter(is_hidden=False)
+
+
+def visible_comment_count():
+    """Выражение для annotate: число видимых комментариев новости."""
+    return models.Count('comment', filter=models.Q(comment__is_hidden=False))
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -27,11 +128,112 @@ class Comment(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    text = CompressedTextField()
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    is_hidden = models.BooleanField(default=False)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('created',)
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class CommentBucket(models.Model):
+    """
+    Число видимых комментариев новости за час.
+
+    hour — номер часа от начала эпохи. Корзины старше суток сливаются в
+    суточные, см. news/trending.py.
+    """
+    news = models.ForeignKey(News, on_delete=models.CASCADE)
+    hour = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('news', 'hour'), name='comment_bucket_news_hour'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=('hour',), name='comment_bucket_hour_idx'),
+        ]
+
+
+class ArchivedNews(models.Model):
+    """
+    Новость, перенесённая из News командой archive_news.
+
+    pk сохраняется, поэтому старые адреса новостей продолжают работать.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=50)
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    summary = models.TextField(blank=True)
+    date = models.DateField(db_index=True)
+
+    class Meta:
+        ordering = ('-date',)
+        verbose_name_plural = 'Архивные новости'
+        verbose_name = 'Архивная новость'
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    # related_name как у Comment: шаблоны новостей работают без изменений.
+    news = models.ForeignKey(
+        ArchivedNews,
+        on_delete=models.CASCADE,
+        related_name='comment_set',
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    text = CompressedTextField()
+    created = models.DateTimeField()
+    is_hidden = models.BooleanField(default=False)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
 
     def __str__(self):
         return self.text[:50]
+
+
+class CommentSignature(models.Model):
+    """
+    MinHash-подпись текста комментария, см. news/duplicates.py.
+
+    Строка не меняется: при правке комментария она заменяется новой.
+    """
+    comment = models.OneToOneField(Comment, on_delete=models.CASCADE)
+    signature = models.BinaryField()
+    created = models.DateTimeField(db_index=True)
+
+
+class CommentBand(models.Model):
+    """Ключ одной полосы LSH: общий ключ — кандидат в дубликаты."""
+    signature = models.ForeignKey(
+        CommentSignature,
+        on_delete=models.CASCADE,
+        related_name='bands',
+    )
+    key = models.BigIntegerField()
+    created = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('key', 'created'), name='comment_band_key_idx'
+            ),
+        ]
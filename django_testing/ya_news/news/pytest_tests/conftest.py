@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+
+import pytest
+from django.conf import settings
+from django.db import transaction
+
+from news.pytest_tests import factories
+
+SETUP_REPORT_SIZE = 10
+
+_setup_durations = []
+
+
+@contextmanager
+def shared_data(django_db_blocker):
+    """
+    Данные, общие для группы тестов.
+
+    Создаются один раз в транзакции, внутри которой каждый тест
+    работает в своей точке сохранения. После группы всё откатывается.
+    """
+    with django_db_blocker.unblock(), transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+@pytest.fixture
+def author(db):
+    return factories.make_user('Автор')
+
+
+@pytest.fixture
+def reader(db):
+    return factories.make_user('Читатель')
+
+
+@pytest.fixture
+def news(db):
+    return factories.make_news()
+
+
+@pytest.fixture(scope='class')
+def home_page_news(django_db_setup, django_db_blocker):
+    """Новостей на одну больше, чем помещается на главной."""
+    with shared_data(django_db_blocker):
+        yield factories.bulk_news(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
+
+
+def pytest_runtest_logreport(report):
+    if report.when == 'setup' and report.passed:
+        _setup_durations.append((report.duration, report.nodeid))
+
+
+def pytest_terminal_summary(terminalreporter):
+    total = sum(duration for duration, _ in _setup_durations)
+    if not total:
+        return
+    terminalreporter.section('подготовка данных')
+    terminalreporter.write_line(
+        f'всего {total:.2f}s на {len(_setup_durations)} тестов'
+    )
+    for duration, nodeid in sorted(_setup_durations, reverse=True)[
+        :SETUP_REPORT_SIZE
+    ]:
+        terminalreporter.write_line(
+            f'{duration:6.3f}s {duration / total:6.1%}  {nodeid}'
+        )
@@ -0,0 +1,50 @@
+"""Фабрики тестовых данных для YaNews."""
+from datetime import date, timedelta
+from itertools import count
+
+from django.contrib.auth import get_user_model
+
+from news.models import Comment, News
+
+User = get_user_model()
+
+_sequence = count(1)
+
+
+def make_user(username=None, **kwargs):
+    return User.objects.create(
+        username=username or f'user{next(_sequence)}', **kwargs
+    )
+
+
+def make_news(**kwargs):
+    number = next(_sequence)
+    kwargs.setdefault('title', f'Новость {number}')
+    kwargs.setdefault('text', f'Текст новости {number}')
+    return News.objects.create(**kwargs)
+
+
+def make_comment(news, author, **kwargs):
+    kwargs.setdefault('text', f'Комментарий {next(_sequence)}')
+    return Comment.objects.create(news=news, author=author, **kwargs)
+
+
+def bulk_news(amount, newest=None):
+    """Создаёт amount новостей одним запросом, по одной на день."""
+    newest = newest or date.today()
+    return News.objects.bulk_create(
+        News(
+            title=f'Новость {index}',
+            text=f'Текст новости {index}',
+            date=newest - timedelta(days=index),
+        )
+        for index in range(amount)
+    )
+
+
+def bulk_comments(news, author, amount):
+    """Создаёт amount комментариев к новости одним запросом."""
+    return Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(amount)
+    )
@@ -0,0 +1,41 @@
+import pytest
+from django.urls import reverse
+
+from news.admin import COMMENTS_PAGE_PARAM, COMMENTS_PER_PAGE
+from news.pytest_tests import factories
+
+
+@pytest.fixture
+def commented_news(author, news):
+    factories.bulk_comments(news, author, COMMENTS_PER_PAGE + 5)
+    return news
+
+
+@pytest.mark.parametrize('page, forms', ((1, COMMENTS_PER_PAGE), (2, 5)))
+def test_news_change_page_shows_one_page_of_comments(
+    admin_client, commented_news, page, forms
+):
+    """В форме новости выводится только одна страница комментариев."""
+    url = reverse('admin:news_news_change', args=(commented_news.pk,))
+    response = admin_client.get(url, {COMMENTS_PAGE_PARAM: page})
+    assert response.status_code == 200
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == forms
+
+
+@pytest.mark.parametrize('name', ('news_news', 'news_comment'))
+def test_changelists_open(admin_client, commented_news, name):
+    """Списки новостей и комментариев открываются без полного подсчёта."""
+    response = admin_client.get(reverse(f'admin:{name}_changelist'))
+    assert response.status_code == 200
+    assert response.context['cl'].show_full_result_count is False
+
+
+def test_page_links_keep_query(admin_client, commented_news):
+    """Ссылки страниц комментариев сохраняют остальные параметры."""
+    url = reverse('admin:news_news_change', args=(commented_news.pk,))
+    filters = '_changelist_filters=q%3D%D0%BC%D0%B8%D1%80'
+    response = admin_client.get(f'{url}?{filters}&{COMMENTS_PAGE_PARAM}=2')
+    content = response.content.decode()
+    assert f'href="?{filters}&amp;{COMMENTS_PAGE_PARAM}=1"' in content
+    assert f'{COMMENTS_PAGE_PARAM}=2&amp;' not in content
@@ -0,0 +1,82 @@
+import base64
+
+import pytest
+from django.urls import reverse
+
+from news.api import MAX_PK, api_cache
+from news.pytest_tests import factories
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    api_cache().clear()
+
+
+@pytest.fixture
+def many_news(db):
+    return factories.bulk_news(25)
+
+
+def test_news_list_pages_by_cursor(client, many_news):
+    """Курсор следующей страницы продолжает список без повторов."""
+    url = reverse('news:api_list')
+    first = client.get(url, {'limit': 20}).json()
+    second = client.get(url, {'limit': 20, 'cursor': first['next']}).json()
+    titles = [item['title'] for item in first['results'] + second['results']]
+    assert titles == [news.title for news in many_news]
+    assert second['next'] is None
+
+
+def test_news_list_returns_only_requested_fields(client, many_news):
+    response = client.get(reverse('news:api_list'), {'fields': 'id,title'})
+    assert set(response.json()['results'][0]) == {'id', 'title'}
+
+
+@pytest.mark.parametrize('params', (
+    {'fields': 'id,password'},
+    {'cursor': 'не-курсор'},
+    {'cursor': 'AAAA'},
+    {'limit': 'много'},
+    {'cursor': base64.urlsafe_b64encode(
+        f'2020-01-01|{MAX_PK + 1}'.encode()
+    ).decode()},
+))
+def test_bad_parameters(client, many_news, params):
+    response = client.get(reverse('news:api_list'), params)
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+
+def test_news_detail_is_cached_until_changed(
+    client, news, django_assert_num_queries
+):
+    """Ответ берётся из кеша, пока новость не изменится."""
+    url = reverse('news:api_detail', args=(news.pk,))
+    client.get(url)
+    with django_assert_num_queries(0):
+        assert client.get(url).json()['title'] == news.title
+    news.title = 'Новый заголовок'
+    news.save()
+    assert client.get(url).json()['title'] == 'Новый заголовок'
+
+
+def test_missing_news(client, db):
+    url = reverse('news:api_detail', args=(1,))
+    assert client.get(url).status_code == 404
+
+
+def test_comments_in_creation_order(client, news, author):
+    comments = factories.bulk_comments(news, author, 3)
+    url = reverse('news:api_comments', args=(news.pk,))
+    first = client.get(url, {'limit': 2}).json()
+    second = client.get(url, {'limit': 2, 'cursor': first['next']}).json()
+    texts = [item['text'] for item in first['results'] + second['results']]
+    assert texts == [comment.text for comment in comments]
+    assert second['results'][0]['author'] == author.username
+
+
+def test_new_comment_invalidates_comment_pages(client, news, author):
+    url = reverse('news:api_comments', args=(news.pk,))
+    assert client.get(url).json()['results'] == []
+    factories.make_comment(news, author)
+    assert len(client.get(url).json()['results']) == 1
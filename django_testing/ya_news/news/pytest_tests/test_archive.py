@@ -0,0 +1,105 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from news import archive
+from news.models import (
+    ArchivedComment, ArchivedNews, Comment, CommentBucket, News,
+)
+from news.pytest_tests import factories
+
+OLD = date(2020, 3, 15)
+
+
+@pytest.fixture
+def old_news(author):
+    news = factories.make_news(date=OLD)
+    factories.make_comment(news, author)
+    factories.make_comment(news, author, is_hidden=True)
+    return news
+
+
+def test_command_moves_old_news(old_news, author):
+    fresh = factories.make_news()
+    factories.make_comment(fresh, author)
+    call_command('archive_news', stdout=None)
+    assert list(News.objects.values_list('pk', flat=True)) == [fresh.pk]
+    assert Comment.objects.get().news_id == fresh.pk
+    archived = ArchivedNews.objects.get()
+    assert (archived.pk, archived.title, archived.summary) == (
+        old_news.pk, old_news.title, old_news.summary
+    )
+    assert ArchivedComment.objects.filter(news=archived).count() == 2
+    assert not CommentBucket.objects.filter(news_id=old_news.pk).exists()
+
+
+def test_archive_in_batches(author):
+    factories.bulk_news(5, newest=OLD)
+    batches = list(archive.archive_before(OLD + timedelta(days=1), 2))
+    assert [news for news, _ in batches] == [2, 2, 1]
+    assert not News.objects.exists()
+
+
+def test_archived_detail_is_read_only(client, author, old_news):
+    archive.archive_batch([old_news.pk])
+    client.force_login(author)
+    response = client.get(reverse('news:detail', args=(old_news.pk,)))
+    assert response.status_code == 200
+    comment, = response.context['news'].comment_set.all()
+    assert not comment.is_hidden
+    assert 'form' not in response.context
+    assert reverse('news:edit', args=(comment.pk,)) not in (
+        response.content.decode()
+    )
+
+
+def test_month_page_joins_hot_and_archived(client, old_news):
+    archive.archive_batch([old_news.pk])
+    hot = factories.make_news(date=OLD - timedelta(days=1))
+    factories.make_news(date=OLD.replace(month=4))
+    response = client.get(
+        reverse('news:archive_month', args=(OLD.year, OLD.month))
+    )
+    assert [news['id'] for news in response.context['news_list']] == [
+        old_news.pk, hot.pk
+    ]
+
+
+def test_year_page_lists_months(client, old_news):
+    archive.archive_batch([old_news.pk])
+    factories.make_news(date=OLD.replace(month=4))
+    response = client.get(reverse('news:archive_year', args=(OLD.year,)))
+    assert [month.month for month in response.context['dates']] == [4, 3]
+
+
+@pytest.mark.parametrize('args', ((2020, 13), (2019, 1)))
+def test_bad_or_empty_month_not_found(client, old_news, args):
+    response = client.get(reverse('news:archive_month', args=args))
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('year', (0, 99999, 2019))
+def test_bad_or_empty_year_not_found(client, old_news, year):
+    response = client.get(reverse('news:archive_year', args=(year,)))
+    assert response.status_code == 404
+
+
+def test_archive_dates_are_cached_until_archiving(
+    django_assert_num_queries, old_news
+):
+    archive.invalidate_dates()
+    assert archive.archive_dates('year') == [OLD.replace(month=1, day=1)]
+    with django_assert_num_queries(0):
+        archive.archive_dates('year')
+    archive.archive_batch([old_news.pk])
+    news = factories.make_news(date=OLD.replace(year=OLD.year - 1))
+    assert [year.year for year in archive.archive_dates('year')] == [
+        OLD.year, news.date.year
+    ]
+
+
+def test_archived_ids_are_big_integers():
+    for model in (ArchivedNews, ArchivedComment):
+        assert model._meta.pk.get_internal_type() == 'BigIntegerField'
@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache.backends.filebased import FileBasedCache
+from django.urls import reverse
+
+from news.auth import CachedModelBackend, user_cache, user_cache_key
+
+
+@pytest.fixture(autouse=True)
+def file_cache(settings, tmp_path):
+    """Общий для процессов кеш в файлах, как в settings.py."""
+    settings.CACHES = {**settings.CACHES, 'auth': {
+        'BACKEND': 'yanews.metrics.FileBasedCache',
+        'LOCATION': tmp_path / 'auth',
+    }}
+    return tmp_path / 'auth'
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='password')
+
+
+@pytest.mark.django_db
+def test_cached_user_is_not_refetched(user, django_assert_num_queries):
+    """Повторное получение пользователя не обращается к auth_user."""
+    backend = CachedModelBackend()
+    backend.get_user(user.pk)
+    with django_assert_num_queries(0):
+        assert backend.get_user(user.pk) == user
+
+
+@pytest.mark.django_db
+def test_password_change_invalidates_cache(user):
+    """Смена пароля сбрасывает кеш пользователя."""
+    CachedModelBackend().get_user(user.pk)
+    user.set_password('new-password')
+    user.save()
+    assert user_cache().get(user_cache_key(user.pk)) is None
+
+
+@pytest.mark.django_db
+def test_invalidation_is_seen_by_other_processes(user, file_cache):
+    """Кеш другого процесса видит ту же запись и её сброс."""
+    other = FileBasedCache(file_cache, {})
+    CachedModelBackend().get_user(user.pk)
+    assert other.get(user_cache_key(user.pk)) == user
+    user.is_active = False
+    user.save()
+    assert other.get(user_cache_key(user.pk)) is None
+
+
+@pytest.mark.django_db
+def test_password_change_logs_out_other_sessions(client, user):
+    client.login(username='testuser', password='password')
+    assert client.get(reverse('news:home')).context['user'] == user
+    user.set_password('new-password')
+    user.save()
+    assert client.get(reverse('news:home')).context['user'].is_anonymous
+
+
+@pytest.mark.django_db
+def test_logout_invalidates_cache(client, user):
+    """Выход сбрасывает кеш пользователя."""
+    client.login(username='testuser', password='password')
+    client.get(reverse('news:home'))
+    assert user_cache().get(user_cache_key(user.pk)) is not None
+    client.get(reverse('users:logout'))
+    assert user_cache().get(user_cache_key(user.pk)) is None
@@ -0,0 +1,67 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from news import chunked
+from news.models import Comment
+from news.pytest_tests import factories
+
+
+def span(after, last):
+    return last - after
+
+
+@pytest.fixture
+def comments(news, author):
+    return factories.bulk_comments(news, author, 7)
+
+
+def test_iter_chunks_reads_only_requested_fields(comments):
+    chunks = list(chunked.iter_chunks(Comment.objects.all(), ['text'], 3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert all(len(row) == 2 for chunk in chunks for row in chunk)
+
+
+def test_iter_ranges_cover_table(comments):
+    pks = list(Comment.objects.order_by('pk').values_list('pk', flat=True))
+    ranges = list(chunked.iter_ranges(Comment.objects.all(), 3))
+    assert ranges == [(0, pks[2]), (pks[2], pks[5]), (pks[5], pks[6])]
+
+
+def test_run_resumes_from_checkpoint(comments, tmp_path):
+    path = str(tmp_path / 'checkpoint.json')
+    first = chunked.Checkpoint(path)
+    run = chunked.run_ranges(span, Comment.objects.all(), 3, 1, first)
+    _, done, _ = next(run)
+    next(run)
+    run.close()
+    resumed = chunked.Checkpoint(path)
+    assert resumed.after == done
+    rest = list(
+        chunked.run_ranges(span, Comment.objects.all(), 3, 1, resumed)
+    )
+    assert [after for after, _, _ in rest][0] == done
+    assert not (tmp_path / 'checkpoint.json').exists()
+
+
+@pytest.mark.django_db
+def test_process_pool_keeps_order(comments):
+    results = list(
+        chunked.run_ranges(span, Comment.objects.all(), 2, workers=2)
+    )
+    assert [last for _, last, _ in results] == sorted(
+        last for _, last, _ in results
+    )
+    assert sum(result for _, _, result in results) == (
+        Comment.objects.order_by('pk').last().pk
+    )
+
+
+def test_recount_comments(comments, author):
+    other = factories.make_news()
+    factories.make_comment(other, author)
+    out = StringIO()
+    call_command('recount_comments', chunk_size=3, stdout=out)
+    assert 'Комментариев: 8, новостей с комментариями: 2' in out.getvalue()
+    assert f'новость {comments[0].news_id}: 7' in out.getvalue()
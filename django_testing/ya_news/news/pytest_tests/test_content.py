@@ -1,24 +1,22 @@
 import pytest
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from news.models import News, Comment
 
-from yanews.settings import NEWS_PER_PAGE
-
 User = get_user_model()
 
 
 @pytest.mark.django_db
-def test_home_page_has_no_more_than_10_news(client):
-    """Количество новостей на главной странице не более 10."""
-    for i in range(15):
-        News.objects.create(title=f"Новость номер {i}", text="Несоклько букв")
+class TestHomePage:
 
-    url = reverse('news:home')
-    response = client.get(url)
+    def test_home_page_has_no_more_than_10_news(self, client, home_page_news):
+        """Количество новостей на главной странице не более 10."""
+        url = reverse('news:home')
+        response = client.get(url)
 
-    news = response.context['news_list']
-    assert len(news) <= NEWS_PER_PAGE
+        news = response.context['news_list']
+        assert len(news) <= settings.NEWS_COUNT_ON_HOME_PAGE
 
 
 @pytest.mark.django_db
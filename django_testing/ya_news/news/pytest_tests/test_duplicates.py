@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from news import duplicates
+from news.forms import DUPLICATE_WARNING
+from news.models import Comment, CommentBand, CommentSignature
+from news.pytest_tests import factories
+
+SPAM = 'Лучшие кредиты без проверки, пишите в личку прямо сейчас, скидка 50%!'
+VARIANT = (
+    'ЛУЧШИЕ кредиты без проверки!!! Пишите в личку прямо сейчас, скидка 60%'
+)
+OTHER = 'Отличная новость, давно ждали этого решения от городских властей.'
+
+
+@pytest.fixture(autouse=True)
+def enabled(settings):
+    settings.NEAR_DUPLICATES = {**settings.NEAR_DUPLICATES, 'ENABLED': True}
+    duplicates.signatures.clear()
+
+
+def test_similarity_of_variants():
+    spam = duplicates.signature(SPAM)
+    assert duplicates.similarity(spam, duplicates.signature(VARIANT)) > 0.8
+    assert duplicates.similarity(spam, duplicates.signature(OTHER)) < 0.2
+
+
+def test_saved_comment_is_indexed(news, author):
+    comment = factories.make_comment(news, author, text=SPAM)
+    signature = CommentSignature.objects.get(comment=comment)
+    assert CommentBand.objects.filter(signature=signature).count() == (
+        duplicates.BANDS
+    )
+    match, = duplicates.find_duplicates(VARIANT)
+    assert match[0] == comment.pk
+    assert duplicates.find_duplicates(OTHER) == []
+
+
+def test_short_comments_are_not_checked(news, author):
+    factories.make_comment(news, author, text='Согласен!')
+    assert not CommentSignature.objects.exists()
+    assert duplicates.find_duplicates('Согласен!') == []
+
+
+def test_old_comments_are_not_matched(news, author):
+    comment = factories.make_comment(news, author, text=SPAM)
+    old = timezone.now() - timedelta(hours=100)
+    Comment.objects.filter(pk=comment.pk).update(created=old)
+    duplicates.index_comments([Comment.objects.get(pk=comment.pk)])
+    assert duplicates.find_duplicates(VARIANT) == []
+    assert duplicates.prune() == 1
+    assert not CommentBand.objects.exists()
+
+
+def test_form_rejects_near_duplicate(client, news, author, reader):
+    factories.make_comment(news, author, text=SPAM)
+    client.force_login(reader)
+    response = client.post(
+        reverse('news:detail', args=(news.pk,)), data={'text': VARIANT}
+    )
+    assert response.context['form'].errors['text'] == [DUPLICATE_WARNING]
+    assert Comment.objects.count() == 1
+
+
+def test_edit_does_not_match_itself(client, news, author):
+    comment = factories.make_comment(news, author, text=SPAM)
+    client.force_login(author)
+    client.post(reverse('news:edit', args=(comment.pk,)), data={
+        'text': VARIANT
+    })
+    comment.refresh_from_db()
+    assert comment.text == VARIANT
+    assert CommentSignature.objects.get().comment_id == comment.pk
+
+
+def test_backfill_command(news, author):
+    factories.make_comment(news, author, text=SPAM)
+    CommentSignature.objects.all().delete()
+    call_command('index_comments', stdout=None)
+    assert duplicates.find_duplicates(VARIANT)
@@ -0,0 +1,53 @@
+import pytest
+from django.template import Context, Template
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+
+from news.templatetags.fast_urls import fast_reverse
+
+
+@pytest.fixture
+def script_prefix():
+    set_script_prefix('/мой сайт/')
+    yield
+    set_script_prefix('/')
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', ()),
+        ('news:detail', (1,)),
+        ('news:detail', ('15',)),
+        ('news:edit', (7,)),
+        ('news:delete', (7,)),
+        ('news:api_detail', (3,)),
+    ),
+)
+def test_same_as_reverse(name, args):
+    assert fast_reverse(name, *args) == reverse(name, args=args)
+
+
+def test_script_prefix(script_prefix):
+    url = fast_reverse('news:detail', 5)
+    assert url == reverse('news:detail', args=(5,))
+    assert url.startswith('/%D0%BC%D0%BE%D0%B9%20')
+
+
+def test_keyword_arguments():
+    assert fast_reverse('news:detail', pk=4) == '/news/4/'
+
+
+@pytest.mark.parametrize('args', (('abc',), (None,), (1, 2)))
+def test_bad_arguments(args):
+    with pytest.raises(NoReverseMatch):
+        fast_reverse('news:detail', *args)
+
+
+def test_template_tag():
+    template = Template(
+        '{% load fast_urls %}'
+        '{% fast_url "news:delete" pk %}|'
+        '{% fast_url "news:detail" pk as link %}{{ link }}'
+    )
+    rendered = template.render(Context({'pk': 2}))
+    assert rendered == '/delete_comment/2/|/news/2/'
@@ -0,0 +1,83 @@
+import pytest
+from django.core.cache import cache
+from django.template.defaultfilters import truncatewords
+from django.urls import reverse
+
+from news import feed
+from news.pytest_tests import factories
+
+
+@pytest.fixture
+def cached_feed(settings):
+    settings.NEWS_FEED = {**settings.NEWS_FEED, 'FRESH': 60}
+    cache.clear()
+    yield
+    # Блокировку и ленту не должны увидеть следующие тесты.
+    cache.clear()
+
+
+def titles(items):
+    return [item.title for item in items]
+
+
+def test_feed_items(news, author):
+    factories.make_comment(news, author)
+    item, = feed.get_feed()
+    assert item.pk == news.pk
+    assert item.comment_count == 1
+    assert item.summary == news.text
+
+
+def test_summary_matches_truncatewords(db):
+    news = factories.make_news(text=' '.join(['слово'] * 20))
+    item, = feed.get_feed()
+    assert item.summary == truncatewords(news.text, 15)
+
+
+def test_home_page_reads_feed_from_cache(
+    client, cached_feed, home_page_news, django_assert_num_queries
+):
+    url = reverse('news:home')
+    client.get(url)
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert len(response.context['news_list']) == len(home_page_news) - 1
+
+
+def test_news_change_rebuilds_feed(cached_feed, news):
+    assert titles(feed.get_feed()) == [news.title]
+    news.title = 'Новый заголовок'
+    news.save()
+    assert titles(feed.get_feed()) == ['Новый заголовок']
+
+
+def test_stale_feed_is_refreshed_in_background(
+    settings, cached_feed, news, monkeypatch
+):
+    settings.NEWS_FEED = {**settings.NEWS_FEED, 'BACKGROUND': True}
+    scheduled = []
+    monkeypatch.setattr(feed, 'schedule_refresh', lambda: scheduled.append(1))
+    feed.get_feed()
+    factories.make_news(title='Свежая')
+    assert titles(feed.get_feed()) == [news.title]
+    assert scheduled
+
+
+def test_concurrent_miss_waits_for_builder(
+    cached_feed, news, monkeypatch, django_assert_num_queries
+):
+    """Пока ленту строит другой запрос, её ждут, а не строят заново."""
+    built = feed.build_feed()
+    cache.add(feed.LOCK_KEY, 1)
+    monkeypatch.setattr(
+        feed.time, 'sleep',
+        lambda seconds: cache.set(feed.FEED_KEY, (0, 0, built)),
+    )
+    with django_assert_num_queries(0):
+        assert feed.get_feed() == built
+
+
+def test_miss_falls_back_after_wait(settings, cached_feed, news):
+    settings.NEWS_FEED = {**settings.NEWS_FEED, 'LOCK_WAIT': 0}
+    cache.add(feed.LOCK_KEY, 1)
+    assert titles(feed.get_feed()) == [news.title]
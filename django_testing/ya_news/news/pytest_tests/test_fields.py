@@ -0,0 +1,47 @@
+from django.db import connection
+from django.urls import reverse
+
+from news import archive, fields
+from news.models import ArchivedComment, Comment
+from news.pytest_tests import factories
+
+LONG_TEXT = 'Очень подробный комментарий к новости. ' * 100
+
+
+def stored(model, pk):
+    """Значение столбца text как оно лежит в БД."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT text FROM {model._meta.db_table} WHERE id = %s', [pk]
+        )
+        return bytes(cursor.fetchone()[0])
+
+
+def test_long_comment_is_compressed(news, author):
+    comment = factories.make_comment(news, author, text=LONG_TEXT)
+    value = stored(Comment, comment.pk)
+    assert value[:1] == fields.ZLIB
+    assert len(value) < len(LONG_TEXT.encode()) // 10
+    assert Comment.objects.get().text == LONG_TEXT
+
+
+def test_short_comment_is_stored_raw(news, author):
+    comment = factories.make_comment(news, author, text='Коротко')
+    assert stored(Comment, comment.pk) == fields.RAW + 'Коротко'.encode()
+
+
+def test_comment_form_saves_text(client, news, author):
+    client.force_login(author)
+    client.post(
+        reverse('news:detail', args=(news.pk,)), data={'text': LONG_TEXT}
+    )
+    # Как у TextField, форма отбрасывает пробелы по краям.
+    assert Comment.objects.get().text == LONG_TEXT.strip()
+
+
+def test_archive_keeps_compressed_text(news, author):
+    comment = factories.make_comment(news, author, text=LONG_TEXT)
+    value = stored(Comment, comment.pk)
+    archive.archive_batch([news.pk])
+    assert stored(ArchivedComment, comment.pk) == value
+    assert ArchivedComment.objects.get().text == LONG_TEXT
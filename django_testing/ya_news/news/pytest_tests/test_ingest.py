@@ -0,0 +1,120 @@
+import pytest
+from django.urls import reverse
+
+from news import duplicates, ingest
+from news.models import Comment, CommentSignature
+
+
+def test_batches_are_bounded_by_size():
+    batches = []
+    buffer = ingest.CommentBuffer(
+        batch_size=3, flush_interval=1, write=batches.append
+    )
+    for number in range(7):
+        buffer.queue.put(number)
+    buffer.start()
+    assert buffer.drain(timeout=5)
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_batch_is_flushed_after_interval():
+    batches = []
+    buffer = ingest.CommentBuffer(
+        batch_size=100, flush_interval=0.01, write=batches.append
+    )
+    buffer.submit('первый')
+    assert buffer.drain(timeout=5)
+    assert batches == [['первый']]
+
+
+def test_full_queue_rejects_comment():
+    buffer = ingest.CommentBuffer(max_queue=1, write=lambda batch: None)
+    buffer.start = lambda: None
+    assert buffer.submit('первый')
+    assert not buffer.submit('второй')
+
+
+def test_write_failure_does_not_stop_writer():
+    batches = []
+
+    def write(batch):
+        batches.append(batch)
+        if len(batches) == 1:
+            raise RuntimeError
+
+    buffer = ingest.CommentBuffer(
+        batch_size=1, flush_interval=0, write=write
+    )
+    buffer.submit('первый')
+    buffer.submit('второй')
+    assert buffer.drain(timeout=5)
+    assert batches == [['первый'], ['второй']]
+
+
+def test_write_comments(news, author, reader):
+    comments = [
+        Comment(news=news, author=user, text=f'Комментарий {user}')
+        for user in (author, reader)
+    ]
+    ingest.write_comments(comments)
+    assert list(
+        Comment.objects.values_list('text', flat=True)
+    ) == [comment.text for comment in comments]
+
+
+def test_write_comments_indexes_near_duplicates(
+    settings, caplog, news, author, reader
+):
+    """Пачка пишется целиком и с подписями, без записи по одному."""
+    settings.NEAR_DUPLICATES = {**settings.NEAR_DUPLICATES, 'ENABLED': True}
+    duplicates.signatures.clear()
+    comments = [
+        Comment(
+            news=news, author=user,
+            text=f'Длинный комментарий пользователя {user} к новости дня',
+        )
+        for user in (author, reader)
+    ]
+    ingest.write_comments(comments)
+    assert not caplog.records
+    assert sorted(
+        CommentSignature.objects.values_list('comment_id', flat=True)
+    ) == sorted(Comment.objects.values_list('pk', flat=True))
+    assert [comment.pk for comment in comments] == list(
+        Comment.objects.values_list('pk', flat=True)
+    )
+
+
+def test_write_comments_skips_broken_rows(news, author):
+    comments = [
+        Comment(news=news, author=author, text='Сохранится'),
+        Comment(news=news, author=author, text=None),
+    ]
+    ingest.write_comments(comments)
+    assert list(
+        Comment.objects.values_list('text', flat=True)
+    ) == ['Сохранится']
+
+
+@pytest.fixture
+def buffered(settings, monkeypatch):
+    """Буферизованный режим с записью пачек в список."""
+    settings.COMMENT_INGESTION = {**settings.COMMENT_INGESTION,
+                                  'BUFFERED': True}
+    written = []
+    buffer = ingest.CommentBuffer(flush_interval=0, write=written.extend)
+    monkeypatch.setattr(ingest, '_buffer', buffer)
+    return buffer, written
+
+
+def test_view_submits_comment_to_buffer(client, news, author, buffered):
+    buffer, written = buffered
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+    response = client.post(url, {'text': 'Текст комментария'})
+    assert response.status_code == 302
+    assert buffer.drain(timeout=5)
+    assert [
+        (comment.news, comment.author, comment.text) for comment in written
+    ] == [(news, author, 'Текст комментария')]
+    assert Comment.objects.count() == 0
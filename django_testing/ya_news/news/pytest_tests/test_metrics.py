@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.pytest_tests import factories
+from yanews.metrics import (
+    MmapValues, Registry, get_registry, read_file, render
+)
+
+
+@pytest.fixture
+def metrics(settings, tmp_path):
+    settings.METRICS = {
+        **settings.METRICS,
+        'ENABLED': True,
+        'DIRECTORY': str(tmp_path),
+        'TOKEN': 'secret',
+    }
+    return tmp_path
+
+
+def test_values_survive_reopening_and_growth(tmp_path):
+    path = tmp_path / 'metrics-1.db'
+    values = MmapValues(str(path))
+    for index in range(3000):
+        values.add(('counter', (('index', str(index)),), None), index)
+    values.add(('counter', (('index', '7'),), None), 0.5)
+    reopened = MmapValues(str(path))
+    reopened.add(('counter', (('index', '7'),), None), 1)
+    totals = dict(read_file(path))
+    assert len(totals) == 3000
+    assert totals['counter', (('index', '7'),), None] == 8.5
+
+
+def test_registry_sums_process_files(tmp_path):
+    other = MmapValues(str(tmp_path / 'metrics-999999.db'))
+    other.add(('db_queries_total', (('view', 'a'),), None), 2)
+    registry = Registry(str(tmp_path))
+    registry.inc('db_queries_total', (('view', 'a'),), 3)
+    assert registry.collect()['db_queries_total', (('view', 'a'),), None] == 5
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry(buckets=(0.1, 1))
+    labels = (('view', 'news:home'),)
+    for value in (0.05, 0.1, 0.5, 3):
+        registry.observe('http_request_duration_seconds', labels, value)
+    text = render(registry.collect())
+    name = 'http_request_duration_seconds'
+    assert f'{name}_bucket{{view="news:home",le="0.1"}} 2' in text
+    assert f'{name}_bucket{{view="news:home",le="1.0"}} 3' in text
+    assert f'{name}_bucket{{view="news:home",le="+Inf"}} 4' in text
+    assert f'{name}_sum{{view="news:home"}} 3.65' in text
+    assert f'{name}_count{{view="news:home"}} 4' in text
+
+
+@pytest.mark.usefixtures('metrics')
+def test_requests_are_recorded(client, admin_client, news):
+    client.get(reverse('news:home'))
+    client.get(reverse('news:detail', args=(news.pk,)))
+    client.get('/нет-такой-страницы/')
+    text = admin_client.get(reverse('metrics')).content.decode()
+    assert (
+        'http_request_duration_seconds_count'
+        '{view="news:home",method="GET",status="200"} 1'
+    ) in text
+    assert 'status="404"' in text and 'view="unmatched"' in text
+    assert 'db_queries_total{view="news:detail"}' in text
+    assert 'template_render_duration_seconds_total{view="news:home"}' in text
+    assert 'cache_requests_total{result="miss"}' in text
+    assert 'cache_hit_ratio ' in text
+
+
+@pytest.mark.usefixtures('metrics')
+def test_streamed_response_is_observed_when_sent(
+    settings, client, author, news
+):
+    """Запросы к БД потокового ответа входят в его метрики."""
+    settings.STREAMING_RENDER = {'ENABLED': True, 'CHUNK_SIZE': 2}
+    factories.bulk_comments(news, author, 5)
+    view = (('view', 'news:detail'),)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse('news:detail', args=(news.pk,)))
+        assert ('db_queries_total', view, None) not in get_registry().collect()
+        b''.join(response.streaming_content)
+    totals = get_registry().collect()
+    assert totals['db_queries_total', view, None] == len(context)
+    assert not connection.execute_wrappers
+
+
+@pytest.mark.usefixtures('metrics')
+@pytest.mark.parametrize(
+    'authorization, status',
+    (('', 403), ('Bearer other', 403), ('Bearer secret', 200)),
+)
+def test_endpoint_is_protected(client, authorization, status):
+    response = client.get(
+        reverse('metrics'), HTTP_AUTHORIZATION=authorization
+    )
+    assert response.status_code == status
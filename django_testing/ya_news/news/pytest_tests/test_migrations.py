@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+from news import fields
+
+
+@pytest.fixture
+def migrate(transactional_db, settings):
+    """
+    Переводит БД в состояние после указанной миграции news.
+
+    Тестовая БД создаётся без миграций, поэтому все они сначала
+    отмечаются применёнными. После теста БД возвращается к последним
+    миграциям.
+    """
+    settings.MIGRATION_MODULES = {}
+    executor = MigrationExecutor(connection)
+    for key in executor.loader.graph.nodes:
+        executor.recorder.record_applied(*key)
+
+    def migrate(name):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('news', name)])
+        return executor.loader.project_state(('news', name)).apps
+
+    yield migrate
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+    executor.recorder.flush()
+
+
+def test_summary_backfill(migrate):
+    apps = migrate('0002_date_indexes')
+    News = apps.get_model('news', 'News')
+    news = News.objects.create(title='Новость', text='слово ' * 20)
+    apps = migrate('0003_news_summary')
+    summary = apps.get_model('news', 'News').objects.get(pk=news.pk).summary
+    assert summary == 'слово ' * 15 + '…'
+
+
+def test_comment_buckets_backfill(migrate):
+    apps = migrate('0004_comment_is_hidden')
+    News = apps.get_model('news', 'News')
+    Comment = apps.get_model('news', 'Comment')
+    author = apps.get_model('auth', 'User').objects.create(username='Автор')
+    news = News.objects.create(title='Новость', text='Текст')
+    now = timezone.now()
+    for created, is_hidden in (
+        (now, False), (now, False), (now, True),
+        (now - timedelta(hours=100), False),
+    ):
+        comment = Comment.objects.create(
+            news=news, author=author, text='Текст', is_hidden=is_hidden
+        )
+        Comment.objects.filter(pk=comment.pk).update(created=created)
+    apps = migrate('0005_comment_buckets')
+    assert list(
+        apps.get_model('news', 'CommentBucket').objects.values_list(
+            'news_id', 'hour', 'count'
+        )
+    ) == [(news.pk, int(now.timestamp() // 3600), 2)]
+
+
+def test_comment_text_compression_round_trip(migrate):
+    text = 'Подробный комментарий к новости. ' * 50
+    apps = migrate('0006_archive')
+    author = apps.get_model('auth', 'User').objects.create(username='Автор')
+    news = apps.get_model('news', 'News').objects.create(
+        title='Новость', text='Текст'
+    )
+    comment = apps.get_model('news', 'Comment').objects.create(
+        news=news, author=author, text=text
+    )
+    apps = migrate('0007_comment_text_compressed')
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT text FROM news_comment')
+        stored, = cursor.fetchone()
+    assert bytes(stored)[:1] == fields.ZLIB
+    apps = migrate('0006_archive')
+    assert apps.get_model('news', 'Comment').objects.get(
+        pk=comment.pk
+    ).text == text
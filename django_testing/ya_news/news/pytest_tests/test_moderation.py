@@ -0,0 +1,88 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news import feed
+from news.forms import BAD_WORDS
+from news.models import Comment
+from news.pytest_tests import factories
+
+
+@pytest.fixture
+def rude(news, author):
+    return factories.make_comment(news, author, text=f'Ты {BAD_WORDS[0]}!')
+
+
+@pytest.fixture
+def polite(news, author):
+    return factories.make_comment(news, author, text='Спасибо за новость')
+
+
+def remoderate(*args):
+    out = StringIO()
+    call_command('remoderate_comments', *args, chunk_size=1, stdout=out)
+    return out.getvalue()
+
+
+def test_offenders_are_hidden(rude, polite):
+    output = remoderate()
+    assert 'Проверено комментариев: 2. Скрыто нарушителей: 1.' in output
+    assert list(
+        Comment.objects.filter(is_hidden=True).values_list('pk', flat=True)
+    ) == [rude.pk]
+
+
+def test_dry_run_changes_nothing(rude, polite):
+    assert 'Найдено нарушителей: 1.' in remoderate('--dry-run')
+    assert not Comment.objects.filter(is_hidden=True).exists()
+
+
+def test_dry_run_keeps_checkpoint(rude, polite, tmp_path):
+    path = tmp_path / 'checkpoint.json'
+    data = {'after': rude.pk, 'state': {'scanned': 1, 'hidden': 0}}
+    path.write_text(json.dumps(data))
+    output = remoderate('--dry-run', '--checkpoint', str(path))
+    assert 'Проверено комментариев: 2. Найдено нарушителей: 1.' in output
+    assert json.loads(path.read_text()) == data
+
+
+def test_hidden_comments_are_not_shown(client, news, rude, polite):
+    remoderate()
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert list(response.context['news'].comment_set.all()) == [polite]
+    comments = client.get(reverse('news:api_comments', args=(news.pk,)))
+    assert [item['id'] for item in comments.json()['results']] == [polite.pk]
+    item, = feed.build_feed()
+    assert item.comment_count == 1
+
+
+def test_edited_comment_is_shown_again(client, author, rude):
+    remoderate()
+    client.force_login(author)
+    client.post(reverse('news:edit', args=(rude.pk,)), {'text': 'Извините'})
+    rude.refresh_from_db()
+    assert not rude.is_hidden
+
+
+def test_comment_post_does_not_load_comments(client, author, news, polite):
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+    with CaptureQueriesContext(connection) as context:
+        client.post(url, {'text': 'Новый комментарий'})
+    assert not any(
+        query['sql'].startswith('SELECT') and 'news_comment' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+def test_rejected_comment_page_shows_comments(client, author, news, polite):
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+    response = client.post(url, {'text': f'Ты {BAD_WORDS[0]}!'})
+    assert response.status_code == 200
+    assert polite.text in response.content.decode()
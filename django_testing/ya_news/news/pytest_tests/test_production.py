@@ -0,0 +1,122 @@
+"""
+Проверки с настройками из settings.py.
+
+test_settings.py ради скорости выключает миграции, ограничение частоты,
+поиск дубликатов, потоковый рендеринг, метрики, запись медленных
+запросов и прогрев. Здесь они включены со значениями из settings.py,
+а миграции применяются к пустой БД.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import reverse
+
+from news import duplicates
+from news.forms import DUPLICATE_WARNING
+from news.models import Comment, CommentSignature
+from news.pytest_tests import factories
+from yanews import settings as production
+from yanews import startup
+
+FEATURES = (
+    'RATE_LIMIT', 'NEWS_FEED', 'TRENDING', 'NEAR_DUPLICATES',
+    'STREAMING_RENDER', 'METRICS', 'SLOW_REQUESTS', 'WARMUP',
+)
+SPAM = 'Лучшие кредиты без проверки, пишите в личку прямо сейчас, скидка 50%!'
+VARIANT = (
+    'ЛУЧШИЕ кредиты без проверки!!! Пишите в личку прямо сейчас, скидка 60%'
+)
+MIGRATE = '''
+import sys
+
+import django
+from django.conf import settings
+
+settings.DATABASES['default']['NAME'] = sys.argv[1]
+django.setup()
+from django.core.management import call_command
+
+call_command('migrate', verbosity=0)
+call_command('makemigrations', check=True, dry_run=True, verbosity=0)
+'''
+
+
+@pytest.fixture(autouse=True)
+def production_settings(settings, tmp_path):
+    for name in FEATURES:
+        setattr(settings, name, getattr(production, name))
+    settings.SLOW_REQUESTS = {
+        **production.SLOW_REQUESTS, 'DIRECTORY': tmp_path / 'slow_requests'
+    }
+    settings.WARMUP = {**production.WARMUP, 'STRICT': True}
+    settings.CACHES = {
+        **production.CACHES,
+        **{
+            alias: {**production.CACHES[alias], 'LOCATION': tmp_path / alias}
+            for alias in ('auth', 'api')
+        },
+    }
+    cache.clear()
+    duplicates.signatures.clear()
+
+
+def test_migrate_from_scratch(tmp_path):
+    """Миграции применяются к пустой БД и совпадают с моделями."""
+    result = subprocess.run(
+        [sys.executable, '-c', MIGRATE, str(tmp_path / 'db.sqlite3')],
+        cwd=settings.BASE_DIR, capture_output=True, text=True,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'yanews.settings'},
+    )
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.django_db
+def test_pages(client, news, author):
+    factories.make_comment(news, author)
+    client.force_login(author)
+    for url in (
+        reverse('news:home'),
+        reverse('news:trending'),
+        reverse('news:archive'),
+        reverse('users:login'),
+    ):
+        assert client.get(url).status_code == 200, url
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert response.status_code == 200
+    assert response.streaming
+
+
+def test_comments_are_checked(client, news, author):
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+    assert client.post(url, {'text': SPAM}).status_code == 302
+    assert CommentSignature.objects.count() == 1
+    response = client.post(url, {'text': VARIANT})
+    assert response.context['form'].errors['text'] == [DUPLICATE_WARNING]
+    statuses = [
+        client.post(url, {'text': f'Комментарий {number}'}).status_code
+        for number in range(settings.RATE_LIMIT['RATE'])
+    ]
+    assert statuses[-1] == 429
+    assert Comment.objects.count() == settings.RATE_LIMIT['RATE'] - 1
+
+
+@pytest.mark.django_db
+def test_metrics(admin_client):
+    admin_client.get(reverse('news:home'))
+    response = admin_client.get(reverse('metrics'))
+    assert 'view="news:home"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_warm_up():
+    timings = startup.warm_up(WSGIHandler())
+    assert list(timings) == [
+        'urls', 'templates', 'locale', 'callbacks', 'requests',
+        'connections',
+    ]
@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from news.models import Comment
+from news.ratelimit import RecentKeys, TokenBuckets
+
+
+def test_token_bucket_refills():
+    buckets = TokenBuckets(rate=2, period=10, max_keys=10)
+    assert buckets.consume('user', now=0) == 0
+    assert buckets.consume('user', now=0) == 0
+    assert buckets.consume('user', now=0) == pytest.approx(5)
+    assert buckets.consume('user', now=5) == 0
+
+
+def test_token_buckets_evict_oldest_key():
+    buckets = TokenBuckets(rate=1, period=60, max_keys=2)
+    for key in ('first', 'second', 'third'):
+        buckets.consume(key, now=0)
+    assert buckets.consume('second', now=0) > 0
+    assert buckets.consume('first', now=0) == 0
+
+
+def test_recent_keys_expire():
+    recent = RecentKeys(window=10, max_keys=10)
+    assert recent.add('digest', now=0)
+    assert not recent.add('digest', now=5)
+    assert recent.add('digest', now=10)
+
+
+@pytest.fixture
+def limited(settings, client, author):
+    settings.RATE_LIMIT = {
+        **settings.RATE_LIMIT, 'ENABLED': True, 'RATE': 2
+    }
+    cache.clear()
+    client.force_login(author)
+    return client
+
+
+def test_rejected_request_does_not_touch_db(
+    limited, news, django_assert_num_queries
+):
+    url = reverse('news:detail', args=(news.pk,))
+    for number in range(2):
+        limited.post(url, {'text': f'Комментарий {number}'})
+    # Читается только сессия.
+    with django_assert_num_queries(1):
+        response = limited.post(url, {'text': 'Лишний комментарий'})
+    assert response.status_code == 429
+    assert 'Retry-After' in response
+    assert Comment.objects.count() == 2
+
+
+def test_duplicate_comment_is_ignored(limited, news):
+    url = reverse('news:detail', args=(news.pk,))
+    for _ in range(2):
+        response = limited.post(url, {'text': 'Двойной клик'})
+        assert response.status_code == 302
+    assert Comment.objects.count() == 1
+
+
+@pytest.mark.parametrize('backend', ('local', 'cache'))
+def test_backends(settings, backend, limited, news):
+    settings.RATE_LIMIT = {**settings.RATE_LIMIT, 'BACKEND': backend}
+    url = reverse('news:detail', args=(news.pk,))
+    statuses = [
+        limited.post(url, {'text': f'Комментарий {number}'}).status_code
+        for number in range(3)
+    ]
+    assert statuses == [302, 302, 429]
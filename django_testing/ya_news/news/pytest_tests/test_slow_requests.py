@@ -0,0 +1,115 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from news.pytest_tests import factories
+from yanews.slow_requests import Capture, StackSampler, load_captures
+
+
+@pytest.fixture
+def slow_requests(settings, tmp_path):
+    settings.SLOW_REQUESTS = {
+        **settings.SLOW_REQUESTS,
+        'ENABLED': True,
+        'THRESHOLD': 0,
+        'DIRECTORY': tmp_path,
+    }
+    return settings
+
+
+def captures(settings):
+    return load_captures(str(settings.SLOW_REQUESTS['DIRECTORY']))
+
+
+def test_sampler_records_stacks_of_registered_threads():
+    sampler = StackSampler(interval=60)
+    capture = Capture(max_queries=10)
+    sampler.register(capture)
+    sampler.sample()
+    sampler.unregister()
+    sampler.sample()
+    assert sum(capture.stacks.values()) == 1
+    functions = [name for name, _, _ in capture.stack_functions(0.01)]
+    assert any(
+        'test_sampler_records_stacks_of_registered_threads' in name
+        for name in functions
+    )
+
+
+def test_slow_request_is_captured_with_sql(slow_requests, client, news):
+    client.get(reverse('news:detail', args=(news.pk,)))
+    capture, = captures(slow_requests)
+    assert capture['view'] == 'news:detail'
+    assert capture['reason'] == 'slow'
+    assert capture['profiler'] == 'stack'
+    assert capture['query_count'] == len(capture['queries']) > 0
+    assert any('news_news' in sql for sql, _ in capture['queries'])
+
+
+def test_streamed_response_is_captured_until_sent(
+    slow_requests, client, author, news
+):
+    """Запросы и рендеринг потокового ответа входят в запись."""
+    slow_requests.STREAMING_RENDER = {'ENABLED': True, 'CHUNK_SIZE': 2}
+    factories.make_comment(news, author)
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert captures(slow_requests) == []
+    b''.join(response.streaming_content)
+    capture, = captures(slow_requests)
+    assert any('news_comment' in sql for sql, _ in capture['queries'])
+    assert not connection.execute_wrappers
+
+
+def test_unread_streamed_response_is_captured_on_close(
+    slow_requests, client, news
+):
+    slow_requests.STREAMING_RENDER = {'ENABLED': True, 'CHUNK_SIZE': 2}
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    response.close()
+    assert len(captures(slow_requests)) == 1
+    assert not connection.execute_wrappers
+
+
+def test_fast_request_is_not_captured(slow_requests, client, db):
+    slow_requests.SLOW_REQUESTS = {
+        **slow_requests.SLOW_REQUESTS, 'THRESHOLD': 60
+    }
+    client.get(reverse('news:home'))
+    assert captures(slow_requests) == []
+
+
+def test_sampled_request_is_profiled(slow_requests, client, news):
+    slow_requests.SLOW_REQUESTS = {
+        **slow_requests.SLOW_REQUESTS, 'THRESHOLD': 60, 'SAMPLE_RATE': 1
+    }
+    client.get(reverse('news:detail', args=(news.pk,)))
+    capture, = captures(slow_requests)
+    assert capture['reason'] == 'sampled'
+    assert capture['profiler'] == 'cprofile'
+    assert any('news/views.py' in name for name, _, _ in capture['functions'])
+
+
+def test_old_captures_are_rotated(slow_requests, client, db):
+    slow_requests.SLOW_REQUESTS = {
+        **slow_requests.SLOW_REQUESTS, 'MAX_CAPTURES': 2
+    }
+    for _ in range(3):
+        client.get(reverse('news:home'))
+    assert len(captures(slow_requests)) == 2
+
+
+def test_command_aggregates_captures(slow_requests, client, news):
+    client.get(reverse('news:home'))
+    client.get(reverse('news:detail', args=(news.pk,)))
+    out = StringIO()
+    call_command('slow_requests', stdout=out)
+    output = out.getvalue()
+    assert 'Самые медленные запросы (всего 2)' in output
+    assert 'news:detail' in output and 'news:home' in output
+    assert 'SQL по суммарному времени' in output
+    out = StringIO()
+    call_command('slow_requests', view='news:home', stdout=out)
+    assert 'news:detail' not in out.getvalue()
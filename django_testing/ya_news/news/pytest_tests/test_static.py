@@ -0,0 +1,124 @@
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.template import Context, Template
+from django.urls import reverse
+
+from news.checks import check_vendor_assets
+from news.management.commands.vendor_assets import integrity
+
+ASSET = 'vendor/bootstrap/5.0.1/bootstrap.min.css'
+CSS = b'.container { margin: 0 auto; }\n' * 100
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'cdn.css'
+    path.write_bytes(CSS)
+    return path
+
+
+@pytest.fixture
+def vendor_settings(settings, tmp_path, source):
+    settings.STATICFILES_DIRS = [tmp_path / 'assets']
+    settings.VENDOR_ASSETS = [{
+        'path': ASSET,
+        'url': source.as_uri(),
+        'integrity': integrity(CSS, 'sha384'),
+    }]
+    return settings
+
+
+@pytest.fixture
+def manifest_storage(settings, tmp_path):
+    """Хранилище с манифестом, как в settings.py."""
+    settings.STATIC_ROOT = tmp_path / 'static'
+    settings.STATICFILES_STORAGE = (
+        'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    )
+    return settings
+
+
+@pytest.fixture
+def collected(vendor_settings, manifest_storage):
+    call_command('vendor_assets', verbosity=0)
+    call_command(
+        'collectstatic', interactive=False, verbosity=0,
+        ignore_patterns=['admin'],
+    )
+
+
+def test_vendor_assets_downloads_and_checks(vendor_settings, tmp_path):
+    target = tmp_path / 'assets' / ASSET
+    call_command('vendor_assets', verbosity=0)
+    assert target.read_bytes() == CSS
+    target.write_bytes(b'body {}')
+    with pytest.raises(CommandError):
+        call_command('vendor_assets', verbosity=0)
+    call_command('vendor_assets', force=True, verbosity=0)
+    assert target.read_bytes() == CSS
+
+
+def test_vendor_assets_rejects_wrong_hash(vendor_settings, tmp_path):
+    vendor_settings.VENDOR_ASSETS[0]['integrity'] = integrity(b'', 'sha384')
+    with pytest.raises(CommandError):
+        call_command('vendor_assets', verbosity=0)
+    assert not (tmp_path / 'assets' / ASSET).exists()
+
+
+@pytest.mark.usefixtures('collected')
+def test_pages_use_fingerprinted_local_assets(client, db):
+    url = staticfiles_storage.url(ASSET)
+    assert url != f'/static/{ASSET}'
+    content = client.get(reverse('news:home')).content.decode()
+    assert url in content
+    assert 'cdn.jsdelivr.net' not in content
+
+
+@pytest.mark.usefixtures('collected')
+def test_assets_are_compressed_and_cached_forever(client):
+    response = client.get(
+        staticfiles_storage.url(ASSET), HTTP_ACCEPT_ENCODING='gzip'
+    )
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response['Cache-Control']
+    assert 'max-age=315360000' in response['Cache-Control']
+
+
+def test_pages_link_only_local_copies(client, db):
+    content = client.get(reverse('news:home')).content.decode()
+    assert f'href="/static/{ASSET}"' in content
+    assert 'cdn.jsdelivr.net' not in content
+
+
+def test_unknown_asset_is_reported():
+    template = Template("{% load vendor %}{% vendor_stylesheet 'x.css' %}")
+    with pytest.raises(ImproperlyConfigured, match='x.css'):
+        template.render(Context())
+
+
+def test_deploy_check_requires_vendored_copies(vendor_settings, tmp_path):
+    (tmp_path / 'assets').mkdir()
+    error, = check_vendor_assets(None)
+    assert error.id == 'vendor.E001'
+    call_command('vendor_assets', verbosity=0)
+    assert check_vendor_assets(None) == []
+    (tmp_path / 'assets' / ASSET).write_bytes(b'body {}')
+    error, = check_vendor_assets(None)
+    assert error.id == 'vendor.E002'
+
+
+def test_pages_render_with_project_assets(client, db, vendor_settings,
+                                          manifest_storage, tmp_path):
+    """Страницы открываются с настоящими assets/ после collectstatic."""
+    vendor_settings.STATICFILES_DIRS = [
+        tmp_path / 'assets', vendor_settings.BASE_DIR / 'assets',
+    ]
+    call_command('vendor_assets', verbosity=0)
+    call_command(
+        'collectstatic', interactive=False, verbosity=0,
+        ignore_patterns=['admin'],
+    )
+    assert client.get(reverse('news:home')).status_code == 200
@@ -0,0 +1,75 @@
+import gzip
+import zlib
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from news.pytest_tests import factories
+
+
+@pytest.fixture
+def streaming(settings):
+    settings.STREAMING_RENDER = {'ENABLED': True, 'CHUNK_SIZE': 2}
+
+
+@pytest.fixture
+def detail_url(news):
+    return reverse('news:detail', args=(news.pk,))
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.usefixtures('streaming')
+def test_comments_are_streamed_in_chunks(client, author, news, detail_url):
+    factories.bulk_comments(news, author, 5)
+    factories.make_comment(news, author, text='Скрытый', is_hidden=True)
+    comments = news.comment_set.filter(is_hidden=False)
+    client.force_login(author)
+    response = client.get(detail_url)
+    assert isinstance(response, StreamingHttpResponse)
+    chunks = [chunk.decode() for chunk in response.streaming_content]
+    # Начало страницы, три пачки строк и конец.
+    assert len(chunks) == 5
+    assert news.title in chunks[0]
+    assert 'Оставить комментарий' in chunks[-1]
+    content = ''.join(chunks)
+    for comment in comments:
+        assert comment.text in content
+        assert reverse('news:delete', args=(comment.pk,)) in content
+    assert 'Скрытый' not in content
+
+
+@pytest.mark.usefixtures('streaming')
+def test_streamed_page_without_comments(client, detail_url):
+    content = read(client.get(detail_url))
+    assert 'Здесь никто ничего не написал' in content
+
+
+@pytest.mark.usefixtures('streaming')
+def test_streamed_page_is_compressed(client, author, news, detail_url):
+    factories.bulk_comments(news, author, 5)
+    response = client.get(detail_url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    content = gzip.decompress(b''.join(response.streaming_content))
+    assert 'Комментарий 4' in content.decode()
+
+
+@pytest.mark.usefixtures('streaming')
+def test_compressed_chunks_are_not_held_back(client, author, news, detail_url):
+    """Каждая сжатая часть распаковывается сразу, без остальных."""
+    factories.bulk_comments(news, author, 5)
+    response = client.get(detail_url, HTTP_ACCEPT_ENCODING='gzip')
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = iter(response.streaming_content)
+    assert news.title in decompressor.decompress(next(chunks)).decode()
+    assert 'Комментарий' in decompressor.decompress(next(chunks)).decode()
+
+
+def test_buffered_page_is_compressed(client, author, news, detail_url):
+    factories.bulk_comments(news, author, 50)
+    response = client.get(detail_url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Комментарий 49' in gzip.decompress(response.content).decode()
@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+from news import feed
+from news.models import News
+from news.pytest_tests import factories
+
+LONG_TEXT = ' '.join(f'слово{number}' for number in range(100))
+
+
+def test_summary_is_maintained_on_save(db):
+    news = factories.make_news(text=LONG_TEXT)
+    assert news.summary == truncatewords(LONG_TEXT, 15)
+    news.text = 'Короткий текст'
+    news.save(update_fields=['text'])
+    news.refresh_from_db()
+    assert news.summary == 'Короткий текст'
+
+
+def test_summary_is_maintained_in_bulk(db):
+    factories.bulk_news(3)
+    News.objects.update(text='Новый текст')
+    assert set(
+        News.objects.values_list('summary', flat=True)
+    ) == {'Новый текст'}
+
+
+def test_backfill_command(db):
+    factories.bulk_news(5)
+    News.objects.update(summary='')
+    out = StringIO()
+    call_command('backfill_summaries', batch_size=2, stdout=out)
+    assert 'Обновлено новостей: 5.' in out.getvalue()
+    assert '' not in News.objects.values_list('summary', flat=True)
+
+
+def test_feed_does_not_read_text(db):
+    factories.make_news(text=LONG_TEXT)
+    with CaptureQueriesContext(connection) as context:
+        item, = feed.build_feed()
+    assert item.summary == truncatewords(LONG_TEXT, 15)
+    assert '"news_news"."text"' not in context.captured_queries[0]['sql']
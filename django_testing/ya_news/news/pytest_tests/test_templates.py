@@ -0,0 +1,23 @@
+import pytest
+from django.conf import settings
+from django.urls import reverse
+
+from yanews.template_profiling import profile_templates
+
+
+def test_templates_use_cached_loader():
+    """Шаблоны кешируются независимо от DEBUG."""
+    loaders = settings.TEMPLATES[0]['OPTIONS']['loaders']
+    assert loaders[0][0] == 'django.template.loaders.cached.Loader'
+
+
+@pytest.mark.django_db
+def test_template_profiling_counts_renders(client):
+    """Профилировщик учитывает родительские и подключаемые шаблоны."""
+    with profile_templates() as stats:
+        client.get(reverse('news:home'))
+    for name in ('news/home.html', 'base.html', 'includes/header.html'):
+        assert stats.templates[name][0] == 1
+    count, total, own = stats.templates['news/home.html']
+    assert total >= stats.templates['base.html'][1]
+    assert own <= total
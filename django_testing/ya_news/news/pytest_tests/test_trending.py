@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from news import ingest, trending
+from news.models import Comment, CommentBucket
+from news.pytest_tests import factories
+
+
+@pytest.fixture
+def cached_trending(settings):
+    settings.TRENDING = {**settings.TRENDING, 'REFRESH': 60}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def buckets(news):
+    return dict(
+        CommentBucket.objects.filter(news=news).values_list('hour', 'count')
+    )
+
+
+def age(comments, hours):
+    """Переносит комментарии на hours часов назад."""
+    Comment.objects.filter(pk__in=[c.pk for c in comments]).update(
+        created=timezone.now() - timedelta(hours=hours)
+    )
+
+
+def test_comment_updates_bucket(news, author):
+    comment = factories.make_comment(news, author)
+    factories.make_comment(news, author)
+    assert buckets(news) == {trending.current_hour(): 2}
+    comment.delete()
+    assert buckets(news) == {trending.current_hour(): 1}
+
+
+def test_bulk_written_comments_are_counted(news, author):
+    ingest.write_comments([
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(3)
+    ])
+    assert buckets(news) == {trending.current_hour(): 3}
+
+
+def test_recent_comments_rank_higher(author):
+    old, fresh = factories.make_news(), factories.make_news()
+    age([factories.make_comment(old, author) for _ in range(3)], 30)
+    factories.make_comment(fresh, author)
+    trending.rebuild()
+    items = trending.build_trending()
+    assert [item.pk for item in items] == [fresh.pk, old.pk]
+    assert [item.comment_count for item in items] == [1, 3]
+
+
+def test_hidden_comments_are_not_counted(news, author):
+    factories.make_comment(news, author, is_hidden=True)
+    assert trending.build_trending() == ()
+
+
+def test_compact_merges_old_hours(news, author):
+    comments = [factories.make_comment(news, author) for _ in range(2)]
+    age(comments[:1], 30)
+    age(comments[1:], 31)
+    trending.rebuild()
+    # Повторный пересчёт не дублирует суточные корзины.
+    trending.rebuild()
+    now = trending.current_hour()
+    assert buckets(news) == {trending.bucket_hour(now - 30, now): 2}
+    # Удаление старого комментария попадает в суточную корзину.
+    Comment.objects.get(pk=comments[0].pk).delete()
+    assert sum(buckets(news).values()) == 1
+
+
+def test_removal_reaches_uncompacted_hour(news, author):
+    comment = factories.make_comment(news, author)
+    age([comment], 30)
+    trending.rebuild()
+    now = trending.current_hour()
+    # Часовая корзина, до которой сжатие ещё не дошло.
+    CommentBucket.objects.update(hour=now - 30)
+    Comment.objects.get(pk=comment.pk).delete()
+    assert buckets(news) == {now - 30: 0}
+
+
+def test_removal_creates_missing_bucket(
+    news, author, django_capture_on_commit_callbacks
+):
+    comment = factories.make_comment(news, author)
+    factories.make_comment(news, author)
+    CommentBucket.objects.all().delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.delete()
+    assert buckets(news) == {trending.current_hour(): -1}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_news_with_uncounted_comments_can_be_deleted(author):
+    news = factories.make_news()
+    factories.make_comment(news, author)
+    CommentBucket.objects.all().delete()
+    news.delete()
+    assert not CommentBucket.objects.exists()
+
+
+def test_compact_removes_expired_buckets(settings, news):
+    now = trending.current_hour()
+    CommentBucket.objects.create(
+        news=news, hour=now - settings.TRENDING['RETENTION'], count=5
+    )
+    assert trending.compact(now) == (0, 1)
+    assert not CommentBucket.objects.exists()
+
+
+def test_trending_page_reads_cache(
+    client, cached_trending, news, author, django_assert_num_queries
+):
+    factories.make_comment(news, author)
+    url = reverse('news:trending')
+    client.get(url)
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    item, = response.context['trending']
+    assert item.title == news.title
+
+
+def test_rebuild_command_restores_counts(news, author):
+    factories.make_comment(news, author)
+    CommentBucket.objects.all().delete()
+    call_command('compact_trending', '--rebuild', stdout=None)
+    assert buckets(news) == {trending.current_hour(): 1}
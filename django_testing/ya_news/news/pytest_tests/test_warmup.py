@@ -0,0 +1,124 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.template import engines
+
+from news.models import CommentBucket
+from news.pytest_tests import factories
+from news.trending import TRENDING_KEY, current_hour
+from yanews import startup
+from yanews.metrics import get_registry
+
+IMPORT_TIME = [
+    'import time: self [us] | cumulative | imported package',
+    'import time:       120 |        120 |     news.models',
+    'import time:       300 |        420 |   news.views',
+    'import time:        80 |        500 | yanews.urls',
+]
+
+
+@pytest.fixture
+def enabled(settings):
+    settings.WARMUP = {
+        'ENABLED': True,
+        'URLS': ['news:home', '/auth/login/'],
+        'CALLBACKS': ['news.trending.prime_trending'],
+        'CONNECT': False,
+        'STRICT': True,
+    }
+
+
+def test_disabled_warm_up_does_nothing():
+    assert startup.warm_up(WSGIHandler()) == {}
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enabled')
+def test_warm_up_runs_every_step():
+    cache.clear()
+    timings = startup.warm_up(WSGIHandler())
+    assert list(timings) == [
+        'urls', 'templates', 'locale', 'callbacks', 'requests'
+    ]
+    assert timings['requests'][0] == 2
+    assert cache.get(TRENDING_KEY) is not None
+    loader = engines['django'].engine.template_loaders[0]
+    assert 'news/detail.html' in loader.get_template_cache
+
+
+@pytest.mark.usefixtures('enabled')
+def test_warm_up_does_not_compact_buckets(news, author):
+    """Прогрев только читает БД: корзины сжимает перестройка."""
+    cache.clear()
+    factories.make_comment(news, author)
+    old_hour = current_hour() - 30
+    CommentBucket.objects.create(news=news, hour=old_hour, count=1)
+    startup.warm_up(WSGIHandler())
+    assert cache.get(TRENDING_KEY) is not None
+    assert CommentBucket.objects.filter(hour=old_hour).exists()
+
+
+@pytest.mark.django_db
+def test_get_returns_status():
+    application = WSGIHandler()
+    assert startup.get(application, 'news:home') == 200
+    assert startup.get(application, '/missing/') == 404
+
+
+def test_warm_up_survives_errors(settings):
+    """Ошибка шага пишется в лог, остальные шаги выполняются."""
+    settings.WARMUP = {
+        'ENABLED': True, 'URLS': ['/missing/'],
+        'CALLBACKS': ['news.missing'], 'CONNECT': False, 'STRICT': False,
+    }
+    timings = startup.warm_up(WSGIHandler())
+    assert 'callbacks' not in timings
+    assert 'requests' not in timings
+    assert 'templates' in timings
+
+
+@pytest.mark.django_db
+def test_strict_warm_up_fails_on_error_status(settings):
+    settings.WARMUP = {
+        'ENABLED': True, 'URLS': ['news:home', '/missing/'],
+        'CALLBACKS': [], 'CONNECT': False, 'STRICT': True,
+    }
+    with pytest.raises(startup.WarmUpError, match='/missing/ ответил 404'):
+        startup.warm_up(WSGIHandler())
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enabled')
+def test_warm_up_requests_skip_metrics_and_slow_requests(settings, tmp_path):
+    settings.METRICS = {
+        **settings.METRICS, 'ENABLED': True, 'DIRECTORY': str(tmp_path),
+    }
+    settings.SLOW_REQUESTS = {
+        **settings.SLOW_REQUESTS, 'ENABLED': True, 'THRESHOLD': 0,
+        'SAMPLE_RATE': 1.0, 'DIRECTORY': tmp_path / 'slow_requests',
+    }
+    startup.warm_up(WSGIHandler())
+    assert not any(
+        name == 'http_request_duration_seconds'
+        for name, _, _ in get_registry().collect()
+    )
+    assert not (tmp_path / 'slow_requests').exists()
+
+
+def test_parse_import_times():
+    assert startup.parse_import_times(IMPORT_TIME) == [
+        ('news.models', 0.00012, 0.00012, 2),
+        ('news.views', 0.0003, 0.00042, 1),
+        ('yanews.urls', 0.00008, 0.0005, 0),
+    ]
+
+
+def test_importtime_command():
+    out = StringIO()
+    call_command('importtime', '--limit', '5', stdout=out)
+    output = out.getvalue()
+    assert 'Импортировано' in output
+    assert 'django' in output
@@ -0,0 +1,208 @@
+"""
+Ограничение частоты и защита от повторной отправки форм.
+
+Для каждого пользователя (анонима — по IP) и формы ведётся корзина
+токенов: RATE отправок за PERIOD секунд с накоплением. Одинаковое
+содержимое формы, отправленное повторно в течение DEDUP_WINDOW секунд
+(двойной клик), не обрабатывается: пользователь получает редирект, как
+после успешной отправки.
+
+Проверки выполняются до обработки формы, поэтому отклонённые запросы
+не обращаются к БД. Счётчики по умолчанию хранятся в памяти процесса
+(BACKEND = 'local'): давно неактивные ключи вытесняются, когда их
+становится больше MAX_KEYS. Для нескольких процессов подойдёт
+BACKEND = 'cache': счётчики по окнам PERIOD секунд в общем кеше Django.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import redirect
+
+IGNORED_FIELDS = {'csrfmiddlewaretoken'}
+
+
+class TokenBuckets:
+    """Корзины токенов для множества ключей в ограниченной памяти."""
+
+    def __init__(self, rate, period, max_keys):
+        self.capacity = rate
+        self.refill = rate / period
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, now=None):
+        """Забирает токен. Возвращает 0 или сколько секунд ждать."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, stamp = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - stamp) * self.refill)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.refill
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RecentKeys:
+    """Ключи, увиденные за последние window секунд."""
+
+    def __init__(self, window, max_keys):
+        self.window = window
+        self.max_keys = max_keys
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key, now=None):
+        """Запоминает ключ. False, если он уже встречался в окне."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._evict(now)
+            if key in self._expires:
+                return False
+            self._expires[key] = now + self.window
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._expires.pop(key, None)
+
+    def _evict(self, now):
+        # Окно одинаковое для всех ключей, поэтому в начале словаря
+        # всегда лежат ключи, которые истекают раньше остальных.
+        expires = self._expires
+        while expires and (
+            next(iter(expires.values())) <= now
+            or len(expires) >= self.max_keys
+        ):
+            expires.popitem(last=False)
+
+
+class LocalLimiter:
+    """Счётчики в памяти процесса."""
+
+    def __init__(self, options):
+        self.buckets = TokenBuckets(
+            options['RATE'], options['PERIOD'], options['MAX_KEYS']
+        )
+        self.recent = RecentKeys(options['DEDUP_WINDOW'], options['MAX_KEYS'])
+
+    def consume(self, key):
+        return self.buckets.consume(key)
+
+    def remember(self, digest):
+        return self.recent.add(digest)
+
+    def forget(self, digest):
+        self.recent.discard(digest)
+
+
+class CacheLimiter:
+    """Счётчики в кеше Django, общие для всех процессов."""
+
+    def __init__(self, options):
+        self.rate = options['RATE']
+        self.period = options['PERIOD']
+        self.window = options['DEDUP_WINDOW']
+
+    def consume(self, key):
+        now = time.time()
+        window = int(now // self.period)
+        counter = f'ratelimit:{key}:{window}'
+        cache.add(counter, 0, self.period)
+        try:
+            count = cache.incr(counter)
+        except ValueError:
+            return 0
+        if count <= self.rate:
+            return 0
+        return (window + 1) * self.period - now
+
+    def remember(self, digest):
+        return cache.add(f'ratelimit:dedup:{digest}', 1, self.window)
+
+    def forget(self, digest):
+        cache.delete(f'ratelimit:dedup:{digest}')
+
+
+LIMITERS = {'local': LocalLimiter, 'cache': CacheLimiter}
+
+_limiter = None
+_limiter_options = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Ограничитель процесса; пересоздаётся при смене настроек."""
+    global _limiter, _limiter_options
+    options = settings.RATE_LIMIT
+    with _limiter_lock:
+        if options is not _limiter_options:
+            _limiter = LIMITERS[options['BACKEND']](options)
+            _limiter_options = options
+        return _limiter
+
+
+def client_key(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def content_digest(key, request):
+    """Хеш отправленной формы вместе с адресом и отправителем."""
+    content = hashlib.blake2b(digest_size=16)
+    for part in (key, request.path):
+        content.update(part.encode())
+        content.update(b'\0')
+    for name in sorted(set(request.POST) - IGNORED_FIELDS):
+        for value in request.POST.getlist(name):
+            content.update(f'{name}={value}'.encode())
+            content.update(b'\0')
+    return content.hexdigest()
+
+
+class RateLimitMixin:
+    """
+    Ограничивает частоту POST-запросов к представлению.
+
+    Ставится в начало списка родителей, чтобы проверка выполнялась до
+    остальной обработки запроса.
+    """
+    rate_limit_scope = None
+    duplicate_url = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'POST' or not settings.RATE_LIMIT['ENABLED']:
+            return super().dispatch(request, *args, **kwargs)
+        limiter = get_limiter()
+        key = (
+            f'{self.rate_limit_scope or type(self).__name__}:'
+            f'{client_key(request)}'
+        )
+        wait = limiter.consume(key)
+        if wait:
+            response = HttpResponse(
+                'Слишком много запросов, попробуйте позже.', status=429
+            )
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+        digest = content_digest(key, request)
+        if not limiter.remember(digest):
+            return redirect(self.duplicate_url or request.get_full_path())
+        response = super().dispatch(request, *args, **kwargs)
+        if not 300 <= response.status_code < 400:
+            # Форма не принята: повторная отправка должна обработаться.
+            limiter.forget(digest)
+        return response
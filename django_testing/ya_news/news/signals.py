@@ -0,0 +1,39 @@
+"""Сброс кешей при изменении новостей и комментариев."""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import api, archive, duplicates, feed, trending
+from .models import Comment, News
+
+
+@receiver(post_save, sender=News, dispatch_uid='news_saved')
+@receiver(post_delete, sender=News, dispatch_uid='news_deleted')
+def news_changed(sender, instance, **kwargs):
+    api.invalidate_news(instance.pk)
+    feed.invalidate_feed()
+    archive.invalidate_dates()
+    if settings.NEWS_FEED['BACKGROUND']:
+        transaction.on_commit(feed.schedule_refresh)
+
+
+@receiver(post_save, sender=Comment, dispatch_uid='comment_saved')
+@receiver(post_delete, sender=Comment, dispatch_uid='comment_deleted')
+def comment_changed(sender, instance, **kwargs):
+    api.invalidate_news(instance.news_id)
+    feed.invalidate_feed()
+
+
+@receiver(post_save, sender=Comment, dispatch_uid='comment_counted')
+def comment_saved(sender, instance, created, **kwargs):
+    if created and not instance.is_hidden:
+        trending.record([(instance.news_id, instance.created)])
+    if settings.NEAR_DUPLICATES['ENABLED']:
+        duplicates.index_comments([instance])
+
+
+@receiver(post_delete, sender=Comment, dispatch_uid='comment_uncounted')
+def comment_deleted(sender, instance, **kwargs):
+    if not instance.is_hidden:
+        trending.record([(instance.news_id, instance.created)], -1)
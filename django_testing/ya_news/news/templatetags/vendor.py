@@ -0,0 +1,29 @@
+"""
+Подключение сторонних статических файлов.
+
+Тег ``{% vendor_stylesheet 'vendor/bootstrap/5.0.1/bootstrap.min.css' %}``
+подключает локальную копию файла из VENDOR_ASSETS. Копии скачивает
+команда vendor_assets, и они хранятся в репозитории: страницы не
+обращаются к сторонним серверам. Наличие и хеш копий проверяет
+``manage.py check --deploy``, см. checks.py.
+"""
+from django import template
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+def get_asset(path):
+    for asset in settings.VENDOR_ASSETS:
+        if asset['path'] == path:
+            return asset
+    raise ImproperlyConfigured(f'{path} нет в VENDOR_ASSETS.')
+
+
+@register.simple_tag
+def vendor_stylesheet(path):
+    get_asset(path)
+    return format_html('<link rel="stylesheet" href="{}">', static(path))
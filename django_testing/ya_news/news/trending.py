@@ -0,0 +1,259 @@
+"""
+Самые обсуждаемые новости.
+
+Комментарии считаются по часам в CommentBucket: новый видимый комментарий
+увеличивает счётчик своей новости за свой час, удалённый или скрытый —
+уменьшает. Рейтинг новости — сумма счётчиков за последние WINDOW часов,
+где вклад каждого часа убывает вдвое за HALF_LIFE часов. Он считается в
+БД по корзинам, а не по комментариям, и хранится в кеше: страница читает
+готовый список из COUNT новостей. Список старше REFRESH секунд
+перестраивается в фоновом потоке, как лента главной (news/feed.py).
+
+При перестройке, не чаще раза в COMPACT_INTERVAL секунд, корзины
+сжимаются: часовые старше суток сливаются в суточные, которые хранятся
+под номером первого часа этих суток, а корзины старше RETENTION часов
+удаляются. Возраст суточной корзины отсчитывается от полудня её суток.
+Если счётчики разошлись с комментариями, их пересчитывает команда
+compact_trending --rebuild.
+"""
+import threading
+import time
+from collections import Counter, namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.db.models import (
+    Case, ExpressionWrapper, F, FloatField, Sum, Value, When,
+)
+from django.db.models.functions import Power
+
+from .models import Comment, CommentBucket, News, fill_buckets, hour_number
+
+TRENDING_KEY = 'news:trending'
+LOCK_KEY = 'news:trending:lock'
+COMPACTED_KEY = 'news:trending:compacted'
+HOURS_IN_DAY = 24
+
+TrendingItem = namedtuple(
+    'TrendingItem', ('pk', 'title', 'date', 'comment_count', 'score')
+)
+
+_refreshing = threading.Lock()
+
+
+def current_hour():
+    return int(time.time() // 3600)
+
+
+def bucket_hour(hour, now):
+    """Корзина для часа hour: сам час или начало его суток, если сжат."""
+    if hour > now - HOURS_IN_DAY:
+        return hour
+    return hour - hour % HOURS_IN_DAY
+
+
+def _create(news_id, hour, amount):
+    try:
+        with transaction.atomic():
+            CommentBucket.objects.create(
+                news_id=news_id, hour=hour, count=amount
+            )
+    except IntegrityError:
+        # Корзину только что создал другой запрос.
+        CommentBucket.objects.filter(news_id=news_id, hour=hour).update(
+            count=F('count') + amount
+        )
+
+
+def _create_if_news_exists(news_id, hour, amount):
+    if News.objects.filter(pk=news_id).exists():
+        _create(news_id, hour, amount)
+
+
+def add(news_id, hour, amount, now=None):
+    """
+    Прибавляет amount к корзине часа hour, создавая её при необходимости.
+
+    Пока корзины не сжаты, час старше суток ещё лежит в часовой корзине,
+    а после сжатия — в суточной: amount попадает в ту, что есть. Новая
+    корзина создаётся под bucket_hour(), сжатие сложит её с остальными.
+    """
+    now = current_hour() if now is None else now
+    target = bucket_hour(hour, now)
+    for candidate in dict.fromkeys((hour, target)):
+        if CommentBucket.objects.filter(
+            news_id=news_id, hour=candidate
+        ).update(count=F('count') + amount):
+            return
+    if target <= now - settings.TRENDING['RETENTION']:
+        # Корзина уже удалена сжатием и в рейтинг не входит.
+        return
+    if amount > 0:
+        _create(news_id, target, amount)
+    else:
+        # Комментарий мог удаляться каскадом вместе с новостью: корзина
+        # создаётся после фиксации транзакции и только для живой новости.
+        transaction.on_commit(
+            partial(_create_if_news_exists, news_id, target, amount)
+        )
+
+
+def record(rows, delta=1):
+    """
+    Учитывает комментарии в корзинах.
+
+    rows — пары (news_id, created); delta — 1 для новых комментариев и
+    -1 для удалённых или скрытых.
+    """
+    now = current_hour()
+    counts = Counter(
+        (news_id, hour_number(created)) for news_id, created in rows
+    )
+    for (news_id, hour), count in counts.items():
+        add(news_id, hour, count * delta, now)
+
+
+def build_trending():
+    options = settings.TRENDING
+    now = current_hour()
+    middle = Case(
+        When(
+            hour__lte=now - HOURS_IN_DAY,
+            then=F('hour') + HOURS_IN_DAY // 2,
+        ),
+        default=F('hour'),
+    )
+    age = ExpressionWrapper(
+        (Value(now) - middle) / Value(float(options['HALF_LIFE'])),
+        output_field=FloatField(),
+    )
+    weight = ExpressionWrapper(
+        F('count') * Power(Value(0.5), age), output_field=FloatField()
+    )
+    rows = list(
+        CommentBucket.objects.filter(hour__gt=now - options['WINDOW'])
+        .values('news_id')
+        .annotate(score=Sum(weight), comment_count=Sum('count'))
+        .filter(comment_count__gt=0)
+        .order_by('-score', 'news_id')
+        .values_list('news_id', 'comment_count', 'score')[:options['COUNT']]
+    )
+    news = News.objects.only('title', 'date').in_bulk(
+        [news_id for news_id, _, _ in rows]
+    )
+    return tuple(
+        TrendingItem(
+            news_id, news[news_id].title, news[news_id].date, count, score
+        )
+        for news_id, count, score in rows
+        if news_id in news
+    )
+
+
+def compact(now=None):
+    """
+    Сливает часовые корзины старше суток в суточные и удаляет старые.
+
+    Возвращает пару: сколько корзин слито и сколько удалено.
+    """
+    now = current_hour() if now is None else now
+    removed, _ = CommentBucket.objects.filter(
+        hour__lte=now - settings.TRENDING['RETENTION']
+    ).delete()
+    merged = 0
+    with transaction.atomic():
+        rows = list(
+            CommentBucket.objects.select_for_update()
+            .filter(hour__lte=now - HOURS_IN_DAY)
+            .values_list('pk', 'news_id', 'hour', 'count')
+        )
+        hourly = [row for row in rows if bucket_hour(row[2], now) != row[2]]
+        if hourly:
+            totals = Counter()
+            for _, news_id, hour, count in rows:
+                totals[news_id, bucket_hour(hour, now)] += count
+            CommentBucket.objects.filter(
+                pk__in=[row[0] for row in rows]
+            ).delete()
+            CommentBucket.objects.bulk_create(
+                CommentBucket(news_id=news_id, hour=hour, count=count)
+                for (news_id, hour), count in totals.items()
+            )
+            merged = len(hourly)
+    return merged, removed
+
+
+def rebuild():
+    """Пересчитывает корзины по комментариям за RETENTION часов."""
+    now = current_hour()
+    # С начала суток: суточная корзина пересчитывается целиком.
+    since = bucket_hour(now - settings.TRENDING['RETENTION'], now)
+    with transaction.atomic():
+        created = fill_buckets(Comment, CommentBucket, since)
+        compact(now)
+    cache.delete(TRENDING_KEY)
+    return created
+
+
+def refresh_trending():
+    """Перестраивает список. None, если его уже строит кто-то другой."""
+    options = settings.TRENDING
+    if not cache.add(LOCK_KEY, 1, options['LOCK_TIMEOUT']):
+        return None
+    try:
+        if cache.add(COMPACTED_KEY, 1, options['COMPACT_INTERVAL']):
+            compact()
+        items = build_trending()
+        cache.set(TRENDING_KEY, (time.time(), items), None)
+        return items
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def prime_trending():
+    """
+    Кладёт список в кеш, не сжимая корзины.
+
+    Для прогрева процесса: он только читает БД, а сжатие остаётся
+    перестройке и команде compact_trending.
+    """
+    items = build_trending()
+    cache.add(TRENDING_KEY, (time.time(), items), None)
+    return items
+
+
+def _refresh_in_background():
+    try:
+        refresh_trending()
+    finally:
+        connections.close_all()
+        _refreshing.release()
+
+
+def schedule_refresh():
+    """Запускает фоновую перестройку, если она ещё не идёт."""
+    if not _refreshing.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(
+            target=_refresh_in_background, name='news-trending', daemon=True
+        ).start()
+    except RuntimeError:
+        _refreshing.release()
+        raise
+
+
+def get_trending():
+    cached = cache.get(TRENDING_KEY)
+    if cached is None:
+        return refresh_trending() or build_trending()
+    built_at, items = cached
+    options = settings.TRENDING
+    if time.time() - built_at < options['REFRESH']:
+        return items
+    if options['BACKGROUND']:
+        schedule_refresh()
+        return items
+    return refresh_trending() or items
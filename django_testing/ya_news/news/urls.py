@@ -1,11 +1,23 @@
 from django.urls import path
 
-from news import views
+from news import api, views
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
+    path('trending/', views.TrendingList.as_view(), name='trending'),
+    path('archive/', views.NewsArchive.as_view(), name='archive'),
+    path(
+        'archive/<int:year>/',
+        views.NewsArchive.as_view(),
+        name='archive_year'
+    ),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.NewsArchiveMonth.as_view(),
+        name='archive_month'
+    ),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
     path(
         'delete_comment/<int:pk>/',
@@ -13,4 +25,15 @@ urlpatterns = [
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('api/news/', api.NewsListApi.as_view(), name='api_list'),
+    path(
+        'api/news/<int:pk>/',
+        api.NewsDetailApi.as_view(),
+        name='api_detail'
+    ),
+    path(
+        'api/news/<int:pk>/comments/',
+        api.CommentListApi.as_view(),
+        name='api_comments'
+    ),
 ]
@@ -1,40 +1,125 @@
+from datetime import MAXYEAR, MINYEAR, date
+
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views import generic
 
+from . import archive, feed, ingest, trending
 from .forms import CommentForm
-from .models import Comment, News
+from .models import ArchivedComment, ArchivedNews, Comment, News
+from .ratelimit import RateLimitMixin
+from .streaming import StreamingListMixin
 
 
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    context_object_name = 'news_list'
 
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Лента берётся
+        готовой из кеша, см. news/feed.py.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return feed.get_feed()
+
+
+class TrendingList(generic.ListView):
+    """Самые обсуждаемые новости."""
+    template_name = 'news/trending.html'
+    context_object_name = 'trending'
+
+    def get_queryset(self):
+        """Готовый список из кеша, см. news/trending.py."""
+        return trending.get_trending()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['window'] = settings.TRENDING['WINDOW']
+        return context
+
+
+class NewsArchive(generic.TemplateView):
+    """Годы архива или месяцы выбранного года."""
+    template_name = 'news/archive.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        year = self.kwargs.get('year')
+        if year is None:
+            context['dates'] = archive.archive_dates('year')
+        else:
+            if not MINYEAR <= year <= MAXYEAR:
+                raise Http404
+            context['dates'] = archive.archive_dates('month', date__year=year)
+            if not context['dates']:
+                raise Http404
+        context['year'] = year
+        return context
+
+
+class NewsArchiveMonth(generic.ListView):
+    """Новости месяца из рабочей и архивной таблиц."""
+    template_name = 'news/archive_month.html'
+    context_object_name = 'news_list'
+    allow_empty = False
+
+    def get_paginate_by(self, queryset):
+        return settings.NEWS_ARCHIVE['PAGE_SIZE']
+
+    def get_queryset(self):
+        if not (
+            1 <= self.kwargs['month'] <= 12
+            and MINYEAR <= self.kwargs['year'] < MAXYEAR
+        ):
+            raise Http404
+        return archive.month_news(self.kwargs['year'], self.kwargs['month'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['month'] = date(self.kwargs['year'], self.kwargs['month'], 1)
+        return context
 
 
-class NewsDetail(generic.DetailView):
+def visible_comments():
+    """Видимые комментарии новости вместе с авторами."""
+    return Prefetch(
+        'comment_set',
+        queryset=Comment.objects.visible().select_related('author'),
+    )
+
+
+def news_with_comments():
+    """Новости с видимыми комментариями и их авторами."""
+    return News.objects.prefetch_related(visible_comments())
+
+
+class NewsDetail(StreamingListMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
+    stream_row_template = 'includes/comment.html'
+    stream_row_name = 'comment'
+    stream_empty_template = 'includes/no_comments.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
+        if self.streaming_enabled():
+            # Комментарии читаются потоком, см. stream_rows().
+            return get_object_or_404(News, pk=self.kwargs['pk'])
+        obj = get_object_or_404(news_with_comments(), pk=self.kwargs['pk'])
         return obj
 
+    def stream_rows(self):
+        return Comment.objects.visible().filter(
+            news=self.object
+        ).select_related('author')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.request.user.is_authenticated:
@@ -42,7 +127,19 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class ArchivedNewsDetail(generic.DetailView):
+    """Новость из архива: только чтение, без формы комментария."""
+    template_name = 'news/detail.html'
+    context_object_name = 'news'
+    extra_context = {'archived': True}
+    queryset = ArchivedNews.objects.prefetch_related(Prefetch(
+        'comment_set',
+        queryset=ArchivedComment.objects.visible().select_related('author'),
+    ))
+
+
 class NewsComment(
+        RateLimitMixin,
         LoginRequiredMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
@@ -59,19 +156,30 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        if not ingest.submit(comment):
+            comment.save()
         return super().form_valid(form)
 
+    def form_invalid(self, form):
+        # Комментарии нужны, только когда страница новости выводится снова.
+        prefetch_related_objects([self.object], visible_comments())
+        return super().form_invalid(form)
+
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        try:
+            return NewsDetail.as_view()(request, *args, **kwargs)
+        except Http404:
+            # Старые новости читаются из архива, см. news/archive.py.
+            view = ArchivedNewsDetail.as_view()
+            return view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         view = NewsComment.as_view()
@@ -98,6 +206,16 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        """Исправленный комментарий прошёл проверку и снова виден."""
+        comment = form.instance
+        was_hidden = comment.is_hidden
+        comment.is_hidden = False
+        response = super().form_valid(form)
+        if was_hidden:
+            trending.record([(comment.news_id, comment.created)])
+        return response
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
@@ -16,12 +16,19 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'news.apps.NewsConfig',
 ]
 
 MIDDLEWARE = [
+    'yanews.metrics.MetricsMiddleware',
+    'yanews.slow_requests.SlowRequestMiddleware',
+    'yanews.template_profiling.TemplateProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Ниже WhiteNoise: статика уже сжата заранее.
+    'yanews.compression.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -36,8 +43,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Скомпилированные шаблоны кешируются независимо от DEBUG.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -48,6 +61,10 @@ TEMPLATES = [
     },
 ]
 
+# Время рендеринга каждого шаблона пишется в лог
+# yanews.template_profiling на уровне DEBUG.
+TEMPLATE_PROFILING = False
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
@@ -55,9 +72,51 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт между запросами, его открывает прогрев.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'yanews.metrics.LocMemCache',
+    },
+    # Пользователи для AuthenticationMiddleware, см. news/auth.py. Кеш
+    # общий для процессов сервера: сброс записи виден каждому процессу.
+    # На нескольких серверах нужен общий кеш, например memcached.
+    'auth': {
+        'BACKEND': 'yanews.metrics.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'auth',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Готовые ответы JSON API и версии данных, см. news/api.py. Общий для
+    # процессов, как и 'auth': изменение в одном процессе сбрасывает
+    # ответы всех остальных.
+    'api': {
+        'BACKEND': 'yanews.metrics.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'api',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Хранилище сессий: 'db', 'cached_db' (кеш с откатом на БД)
+# или 'signed_cookies' (без обращений к БД). 'cached_db' — только вместе с
+# SESSION_CACHE_ALIAS на общем для процессов кеше (memcached, Redis):
+# в локальном кеше процесса сессия после выхода остаётся действительной
+# в остальных процессах, пока не истечёт запись.
+SESSION_PROFILE = 'db'
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_PROFILE]
+
+AUTHENTICATION_BACKENDS = ['news.auth.CachedModelBackend']
+AUTH_USER_CACHE = 'auth'
+AUTH_USER_CACHE_TIMEOUT = 300
+
+API_CACHE = 'api'
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -73,6 +132,32 @@ USE_L10N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'static'
+STATICFILES_DIRS = [BASE_DIR / 'assets']
+# collectstatic добавляет к именам файлов хеш содержимого и сохраняет
+# рядом сжатые копии (gzip и brotli). WhiteNoise отдаёт файлы с хешем
+# в имени с заголовком Cache-Control: immutable на десять лет.
+STATICFILES_STORAGE = (
+    'whitenoise.storage.CompressedManifestStaticFilesStorage'
+)
+
+# Сторонние файлы в assets/, их скачивает и проверяет команда
+# vendor_assets. Скачанные файлы хранятся в репозитории, страницы
+# подключают только их; url нужен лишь для скачивания. Проверка
+# manage.py check --deploy не пропустит отсутствующий или изменённый файл.
+VENDOR_ASSETS = [
+    {
+        'path': 'vendor/bootstrap/5.0.1/bootstrap.min.css',
+        'url': (
+            'https://cdn.jsdelivr.net/npm/bootstrap@5.0.1/'
+            'dist/css/bootstrap.min.css'
+        ),
+        'integrity': (
+            'sha384-+0n0xVW2eSR5OomGNYDnhzAbDsOXxcvSN1TPprVMTNDbiYZCxYbOOl7'
+            '+AMvyTG2x'
+        ),
+    },
+]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -80,3 +165,103 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+# Буферизованная запись комментариев, см. news/ingest.py.
+COMMENT_INGESTION = {
+    'BUFFERED': False,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 0.2,
+    'MAX_QUEUE': 10000,
+}
+
+# Ограничение частоты отправки форм, см. news/ratelimit.py.
+RATE_LIMIT = {
+    'ENABLED': True,
+    'BACKEND': 'local',
+    'RATE': 10,
+    'PERIOD': 60,
+    'DEDUP_WINDOW': 10,
+    'MAX_KEYS': 10000,
+}
+
+# Лента главной страницы, см. news/feed.py.
+NEWS_FEED = {
+    'FRESH': 60,
+    'BACKGROUND': True,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2,
+}
+
+# Самые обсуждаемые новости, см. news/trending.py. WINDOW, HALF_LIFE и
+# RETENTION — в часах, REFRESH, COMPACT_INTERVAL и LOCK_TIMEOUT — в секундах.
+TRENDING = {
+    'COUNT': 10,
+    'WINDOW': 48,
+    'HALF_LIFE': 6,
+    'RETENTION': 72,
+    'REFRESH': 60,
+    'BACKGROUND': True,
+    'COMPACT_INTERVAL': 600,
+    'LOCK_TIMEOUT': 10,
+}
+
+# Поиск почти одинаковых комментариев, см. news/duplicates.py. WINDOW — в
+# часах, PRUNE_INTERVAL — в секундах, MIN_LENGTH — в символах.
+NEAR_DUPLICATES = {
+    'ENABLED': True,
+    'THRESHOLD': 0.8,
+    'WINDOW': 48,
+    'MIN_LENGTH': 40,
+    'CACHE_SIZE': 10000,
+    'PRUNE_INTERVAL': 600,
+}
+
+# Архив старых новостей, см. news/archive.py.
+# DATES_TIMEOUT — сколько секунд кешируются годы и месяцы архива.
+NEWS_ARCHIVE = {
+    'KEEP_DAYS': 365,
+    'BATCH_SIZE': 500,
+    'PAGE_SIZE': 50,
+    'DATES_TIMEOUT': 60 * 60,
+}
+
+# Потоковый рендеринг длинных списков, см. news/streaming.py.
+STREAMING_RENDER = {
+    'ENABLED': True,
+    'CHUNK_SIZE': 100,
+}
+
+# Метрики запросов на странице /metrics/, см. yanews/metrics.py.
+# DIRECTORY — общий каталог файлов процессов (очищается при перезапуске
+# сервера), None — метрики только своего процесса.
+METRICS = {
+    'ENABLED': True,
+    'DIRECTORY': None,
+    'TOKEN': None,
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+}
+
+# Профили медленных запросов, см. yanews/slow_requests.py и команду
+# slow_requests.
+SLOW_REQUESTS = {
+    'ENABLED': True,
+    'THRESHOLD': 1.0,
+    'SAMPLE_RATE': 0.0,
+    'INTERVAL': 0.005,
+    'DIRECTORY': BASE_DIR / 'slow_requests',
+    'MAX_CAPTURES': 200,
+    'MAX_QUERIES': 500,
+}
+
+# Прогрев рабочего процесса при загрузке wsgi.py, см. yanews/startup.py.
+# URLS — пути или имена маршрутов, CALLBACKS — функции, наполняющие кеши
+# (только чтением БД: их выполняет каждый процесс при запуске), CONNECT —
+# открыть соединения с БД (выключить при gunicorn --preload),
+# STRICT — выбрасывать ошибки прогрева вместо записи в лог.
+WARMUP = {
+    'ENABLED': True,
+    'URLS': ['news:home', 'users:login'],
+    'CALLBACKS': ['news.trending.prime_trending'],
+    'CONNECT': True,
+    'STRICT': False,
+}
@@ -0,0 +1,299 @@
+"""
+Запись профилей медленных запросов.
+
+Для доли запросов SAMPLE_RATE включается cProfile. Остальные запросы
+наблюдает фоновый поток: раз в INTERVAL секунд он снимает стеки потоков,
+которые сейчас обрабатывают запросы (sys._current_frames). Если запрос
+длился дольше THRESHOLD секунд, снятые стеки сохраняются, иначе
+отбрасываются. Так профиль медленного запроса есть всегда, а быстрые
+запросы почти ничего не теряют.
+
+Каждая запись — JSON-файл в каталоге DIRECTORY: маршрут, время,
+функции с собственным и полным временем, стеки и SQL-запросы (не больше
+MAX_QUERIES). Хранятся последние MAX_CAPTURES записей, старые удаляются.
+Сводку по записям выводит команда slow_requests.
+"""
+import cProfile
+import functools
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from yanews.responses import on_close
+from yanews.startup import WARMUP_KEY
+
+FUNCTIONS = 100
+STACKS = 200
+
+
+@functools.lru_cache(maxsize=None)
+def short_path(filename):
+    """Путь к файлу относительно ближайшего каталога из sys.path."""
+    roots = sorted(
+        (
+            path for path in sys.path
+            if path and filename.startswith(path.rstrip(os.sep) + os.sep)
+        ),
+        key=len,
+    )
+    if not roots:
+        return filename
+    return os.path.relpath(filename, roots[-1])
+
+
+@functools.lru_cache(maxsize=None)
+def label(filename, line, name):
+    return f'{short_path(filename)}:{line}({name})'
+
+
+def top_functions(rows):
+    """Функции из первых FUNCTIONS по своему или по полному времени."""
+    rows = list(rows)
+    kept = set()
+    for index in (1, 2):
+        rows.sort(key=lambda row: row[index], reverse=True)
+        kept.update(row[0] for row in rows[:FUNCTIONS])
+    return [row for row in rows if row[0] in kept]
+
+
+class Capture:
+    """Данные одного запроса: SQL и снятые стеки."""
+
+    def __init__(self, max_queries):
+        self.max_queries = max_queries
+        self.queries = []
+        self.query_count = 0
+        self.query_time = 0.0
+        self.stacks = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.query_count += 1
+            self.query_time += elapsed
+            if len(self.queries) < self.max_queries:
+                self.queries.append((sql, elapsed))
+
+    def add_stack(self, frame):
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        self.stacks[tuple(reversed(codes))] += 1
+
+    def stack_functions(self, interval):
+        """Функции по снятым стекам: (метка, своё время, полное время)."""
+        own = Counter()
+        total = Counter()
+        for codes, count in self.stacks.items():
+            own[codes[-1]] += count
+            for code in set(codes):
+                total[code] += count
+        return top_functions(
+            (code_label(code), own[code] * interval, count * interval)
+            for code, count in total.items()
+        )
+
+    def collapsed_stacks(self):
+        """Стеки в формате flamegraph: «f1;f2;f3» -> число снимков."""
+        return {
+            ';'.join(code_label(code) for code in codes): count
+            for codes, count in self.stacks.most_common(STACKS)
+        }
+
+
+def code_label(code):
+    return label(code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def profile_functions(profiler):
+    """Функции по данным cProfile: (метка, своё время, полное время)."""
+    return top_functions(
+        (label(*function), own, total)
+        for function, (_, _, own, total, _) in pstats.Stats(
+            profiler
+        ).stats.items()
+    )
+
+
+class StackSampler:
+    """Фоновый поток, который снимает стеки потоков с запросами."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._busy = threading.Event()
+        self._thread = None
+
+    def register(self, capture):
+        with self._lock:
+            self._active[threading.get_ident()] = capture
+            self._busy.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='stack-sampler', daemon=True
+                )
+                self._thread.start()
+
+    def unregister(self):
+        # Пока держится блокировка, поток не добавит стек в запись.
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            if not self._active:
+                self._busy.clear()
+
+    def sample(self):
+        with self._lock:
+            if not self._active:
+                return
+            frames = sys._current_frames()
+            for ident, capture in self._active.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    capture.add_stack(frame)
+
+    def _run(self):
+        while True:
+            self._busy.wait()
+            time.sleep(self.interval)
+            self.sample()
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler(interval):
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None or _sampler.interval != interval:
+            _sampler = StackSampler(interval)
+        return _sampler
+
+
+def save_capture(directory, data, max_captures):
+    """Сохраняет запись и удаляет самые старые сверх max_captures."""
+    os.makedirs(directory, exist_ok=True)
+    name = f'{time.time():.6f}-{os.getpid()}-{uuid.uuid4().hex[:8]}.json'
+    path = os.path.join(directory, name)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(temporary, path)
+    names = sorted(
+        entry for entry in os.listdir(directory) if entry.endswith('.json')
+    )
+    for old in names[:-max_captures]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except FileNotFoundError:
+            pass
+    return path
+
+
+def load_captures(directory):
+    """Все сохранённые записи, у каждой в поле file имя её файла."""
+    if not os.path.isdir(directory):
+        return []
+    captures = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            continue
+        data['file'] = name
+        captures.append(data)
+    return captures
+
+
+class SlowRequestMiddleware:
+    """
+    Сохраняет профили медленных и случайно выбранных запросов.
+
+    Потоковый ответ замеряется, пока он не отдан полностью. Включается
+    настройкой SLOW_REQUESTS['ENABLED']. Запросы прогрева
+    пропускаются: поток выборки стеков не должен запускаться до fork.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_REQUESTS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.META.get(WARMUP_KEY):
+            return self.get_response(request)
+        options = settings.SLOW_REQUESTS
+        capture = Capture(options['MAX_QUERIES'])
+        profiler = None
+        if random.random() < options['SAMPLE_RATE']:
+            profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(capture.record_query)
+                )
+            if profiler is None:
+                sampler = get_sampler(options['INTERVAL'])
+                sampler.register(capture)
+                stack.callback(sampler.unregister)
+            else:
+                profiler.enable()
+                stack.callback(profiler.disable)
+            response = self.get_response(request)
+            # Потоковый ответ читает БД и рендерится после возврата.
+            recording = stack.pop_all()
+
+        def finish():
+            recording.close()
+            duration = time.perf_counter() - started
+            if profiler is not None or duration >= options['THRESHOLD']:
+                self.save(request, response, duration, capture, profiler)
+
+        return on_close(response, finish)
+
+    def save(self, request, response, duration, capture, profiler):
+        options = settings.SLOW_REQUESTS
+        match = request.resolver_match
+        data = {
+            'view': match.view_name if match else 'unmatched',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'started': time.time() - duration,
+            'duration': duration,
+            'reason': 'sampled' if profiler else 'slow',
+            'query_count': capture.query_count,
+            'query_time': capture.query_time,
+            'queries': capture.queries,
+        }
+        if profiler is not None:
+            data['profiler'] = 'cprofile'
+            data['functions'] = profile_functions(profiler)
+        else:
+            data['profiler'] = 'stack'
+            data['interval'] = options['INTERVAL']
+            data['functions'] = capture.stack_functions(options['INTERVAL'])
+            data['stacks'] = capture.collapsed_stacks()
+        save_capture(
+            str(options['DIRECTORY']), data, options['MAX_CAPTURES']
+        )
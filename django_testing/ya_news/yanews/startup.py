@@ -0,0 +1,235 @@
+"""
+Запуск рабочего процесса: прогрев и время импорта модулей.
+
+Новый процесс платит за построение маршрутов, компиляцию шаблонов,
+загрузку переводов, открытие соединений с БД и пустые кеши на первых
+запросах, и после каждого выката они попадают в хвост задержек. warm_up
+вызывается из wsgi.py сразу после создания приложения и делает эту работу
+заранее:
+
+- строит маршруты и компилирует их регулярные выражения;
+- компилирует в кеш загрузчика все шаблоны из TEMPLATES['DIRS'];
+- загружает переводы LANGUAGE_CODE и часовой пояс TIME_ZONE (pytz при
+  первом обращении проверяет файлы всех известных ему поясов);
+- вызывает CALLBACKS — функции, которые наполняют кеши;
+- выполняет GET-запросы к URLS через само приложение: прогреваются
+  middleware, представления и формы. Метрики и запись медленных запросов
+  такие запросы пропускают: прогрев не попадает в статистику, а поток
+  выборки стеков и его блокировки не создаются до fork;
+- при CONNECT открывает соединения со всеми БД. Соединение переживает
+  первый запрос, только если у БД задан CONN_MAX_AGE.
+
+Сервер, который загружает приложение до fork (gunicorn --preload), не
+должен открывать соединения в родителе: они стали бы общими для всех
+процессов. Тогда CONNECT выключают, а connect() вызывают в post_fork.
+Ошибки прогрева и ответы URLS со статусом 400 и выше пишутся в лог и не
+мешают запуску. При STRICT (в тестах) они выбрасываются.
+
+import_times разбирает вывод ``python -X importtime`` для команды
+importtime.
+"""
+import io
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone, translation
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Ключ environ, которым помечены запросы прогрева.
+WARMUP_KEY = 'warmup.request'
+
+_IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def compile_urls(resolver=None):
+    """Строит маршруты и компилирует их выражения, возвращает их число."""
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            count += compile_urls(pattern)
+        else:
+            count += 1
+    return count
+
+
+def compile_templates():
+    """Компилирует шаблоны проекта в кеш загрузчика, возвращает их число."""
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.template_dirs:
+            for path in sorted(Path(directory).rglob('*.html')):
+                engine.get_template(path.relative_to(directory).as_posix())
+                count += 1
+    return count
+
+
+def load_locale():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('')
+    timezone.get_default_timezone()
+    return 1
+
+
+def run_callbacks():
+    for path in settings.WARMUP['CALLBACKS']:
+        import_string(path)()
+    return len(settings.WARMUP['CALLBACKS'])
+
+
+class WarmUpError(Exception):
+    pass
+
+
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*' and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+def get(application, url, **extra):
+    """
+    Выполняет GET-запрос через WSGI-приложение, возвращает статус.
+
+    extra — дополнительные ключи environ, например HTTP_COOKIE.
+    """
+    path = url if url.startswith('/') else reverse(url)
+    host = _host()
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        WARMUP_KEY: True,
+        **extra,
+    }
+    statuses = []
+    response = application(
+        environ, lambda status, headers, *args: statuses.append(status)
+    )
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return int(statuses[0].split()[0])
+
+
+def request_urls(application):
+    for url in settings.WARMUP['URLS']:
+        status = get(application, url)
+        if status >= 400:
+            raise WarmUpError(f'{url} ответил {status}')
+    return len(settings.WARMUP['URLS'])
+
+
+def connect():
+    """Открывает соединения со всеми БД в текущем потоке."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def warm_up(application):
+    """
+    Прогревает процесс, если WARMUP['ENABLED'].
+
+    Возвращает словарь {шаг: (обработано, секунд)}.
+    """
+    options = settings.WARMUP
+    if not options['ENABLED']:
+        return {}
+    steps = [
+        ('urls', compile_urls),
+        ('templates', compile_templates),
+        ('locale', load_locale),
+        ('callbacks', run_callbacks),
+        ('requests', lambda: request_urls(application)),
+    ]
+    timings = {}
+    for name, func in steps:
+        started = time.perf_counter()
+        try:
+            timings[name] = (func(), time.perf_counter() - started)
+        except Exception:
+            if options['STRICT']:
+                raise
+            logger.exception('Прогрев: ошибка на шаге %s', name)
+    # Соединения, открытые запросами, не должны достаться процессам
+    # после fork.
+    connections.close_all()
+    if options['CONNECT']:
+        started = time.perf_counter()
+        try:
+            timings['connections'] = (connect(), time.perf_counter() - started)
+        except Exception:
+            if options['STRICT']:
+                raise
+            logger.exception('Прогрев: ошибка на шаге connections')
+    logger.info('Прогрев: %s', ', '.join(
+        f'{name} {count} за {seconds * 1000:.1f} мс'
+        for name, (count, seconds) in timings.items()
+    ))
+    return timings
+
+
+def parse_import_times(lines):
+    """
+    Разбирает строки ``-X importtime``.
+
+    Возвращает список (модуль, своё время, полное время, глубина), время в
+    секундах. Глубина 0 у модулей, импортированных не из других модулей.
+    """
+    rows = []
+    for line in lines:
+        match = _IMPORT_TIME.match(line)
+        if match:
+            own, total, indent, name = match.groups()
+            rows.append((
+                name, int(own) / 1e6, int(total) / 1e6, len(indent) // 2,
+            ))
+    return rows
+
+
+def import_times(code):
+    """Время импорта модулей при выполнении code в новом процессе."""
+    environ = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE,
+    }
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True,
+        check=True,
+    )
+    return parse_import_times(result.stderr.splitlines())
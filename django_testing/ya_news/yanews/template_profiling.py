@@ -0,0 +1,138 @@
+"""
+Профилирование рендеринга шаблонов.
+
+Считает для каждого шаблона (включая родительские и подключаемые через
+``{% include %}``) число рендеров, полное время и собственное время без
+вложенных шаблонов.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_registry = {}
+_original_render = None
+
+
+class RenderStats:
+    """Статистика рендеринга шаблонов в рамках одного запроса."""
+
+    def __init__(self):
+        self.templates = {}
+        self._stack = []
+
+    def enter(self):
+        self._stack.append(0.0)
+
+    def leave(self, name, elapsed):
+        children = self._stack.pop()
+        if self._stack:
+            self._stack[-1] += elapsed
+        entry = self.templates.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += elapsed - children
+
+    @property
+    def total(self):
+        """Полное время рендеринга шаблонов верхнего уровня."""
+        return sum(own for _, _, own in self.templates.values())
+
+    def rows(self):
+        """Строки (шаблон, рендеров, всего, собственное) по убыванию."""
+        return sorted(
+            ((name, *entry) for name, entry in self.templates.items()),
+            key=lambda row: row[3],
+            reverse=True,
+        )
+
+
+def _profiled_render(self, context):
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        return _original_render(self, context)
+    stats.enter()
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        name = self.origin.template_name or self.name or '<unknown>'
+        stats.leave(name, time.perf_counter() - started)
+
+
+def install():
+    """Подменяет Template._render профилирующей обёрткой."""
+    global _original_render
+    if Template._render is not _profiled_render:
+        _original_render = Template._render
+        Template._render = _profiled_render
+
+
+def _merge(stats):
+    with _registry_lock:
+        for name, (count, total, own) in stats.templates.items():
+            entry = _registry.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += count
+            entry[1] += total
+            entry[2] += own
+
+
+def get_template_stats():
+    """Накопленная статистика процесса: {шаблон: (рендеров, всего, своё)}."""
+    with _registry_lock:
+        return {name: tuple(entry) for name, entry in _registry.items()}
+
+
+def reset_template_stats():
+    with _registry_lock:
+        _registry.clear()
+
+
+@contextmanager
+def profile_templates():
+    """Собирает статистику рендеринга шаблонов внутри блока with."""
+    install()
+    previous = getattr(_local, 'stats', None)
+    _local.stats = stats = RenderStats()
+    try:
+        yield stats
+    finally:
+        _local.stats = previous
+        _merge(stats)
+
+
+class TemplateProfilingMiddleware:
+    """
+    Записывает время рендеринга шаблонов для каждого запроса.
+
+    Включается настройкой TEMPLATE_PROFILING.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TEMPLATE_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        with profile_templates() as stats:
+            response = self.get_response(request)
+        if stats.templates:
+            logger.debug(
+                '%s %s: %s',
+                request.method,
+                request.path,
+                ', '.join(
+                    f'{name} x{count} {own * 1000:.2f}ms'
+                    for name, count, _, own in stats.rows()
+                ),
+            )
+        return response
@@ -0,0 +1,49 @@
+"""Настройки для запуска тестов YaNews."""
+from .settings import *  # noqa: F401, F403
+
+
+class DisableMigrations:
+    """Таблицы создаются напрямую по моделям, без прогона миграций."""
+
+    def __contains__(self, app_label):
+        return True
+
+    def __getitem__(self, app_label):
+        return None
+
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+MIGRATION_MODULES = DisableMigrations()
+
+CACHES = {
+    **CACHES,  # noqa: F405
+    'auth': {'BACKEND': 'yanews.metrics.LocMemCache', 'LOCATION': 'auth'},
+    'api': {'BACKEND': 'yanews.metrics.LocMemCache', 'LOCATION': 'api'},
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+TEMPLATE_PROFILING = False
+
+# Тесты не запускают collectstatic: без манифеста и собранных файлов.
+STATIC_ROOT = None
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.StaticFilesStorage'
+)
+
+RATE_LIMIT = {**RATE_LIMIT, 'ENABLED': False}  # noqa: F405
+NEWS_FEED = {**NEWS_FEED, 'FRESH': 0, 'BACKGROUND': False}  # noqa: F405
+TRENDING = {**TRENDING, 'REFRESH': 0, 'BACKGROUND': False}  # noqa: F405
+NEAR_DUPLICATES = {**NEAR_DUPLICATES, 'ENABLED': False}  # noqa: F405
+STREAMING_RENDER = {**STREAMING_RENDER, 'ENABLED': False}  # noqa: F405
+METRICS = {**METRICS, 'ENABLED': False}  # noqa: F405
+SLOW_REQUESTS = {**SLOW_REQUESTS, 'ENABLED': False}  # noqa: F405
+WARMUP = {**WARMUP, 'ENABLED': False, 'STRICT': True}  # noqa: F405
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
 
 application = get_wsgi_application()
+
+# Прогрев процесса до первых запросов, см. yanews/startup.py.
+from yanews.startup import warm_up  # noqa: E402
+
+warm_up(application)
@@ -0,0 +1,76 @@
+"""
+Сжатое хранение текстов заметок.
+
+Заметки разной длины (от десятков байт до десятков килобайт) собираются
+из слов, как обычный текст. Замеряется объём столбца text в БД против
+текста в UTF-8, скорость сжатия и распаковки и цена чтения списка
+заметок с текстом и без него (defer).
+"""
+import random
+import time
+
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from notes import fields  # noqa: E402
+from notes.models import Note  # noqa: E402
+
+NOTES = 2000
+WORDS = (
+    'заметка список покупок встреча завтра код ревью задача срок '
+    'молоко хлеб проект отчёт письмо позвонить купить прочитать idea '
+    'todo fix release deploy и в на не что это как'
+).split()
+
+
+def make_text(rng):
+    length = int(rng.lognormvariate(6, 1.5))
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def megabytes_per_second(func, values, size):
+    started = time.perf_counter()
+    for value in values:
+        func(value)
+    return size / (time.perf_counter() - started) / 2 ** 20
+
+
+def main():
+    rng = random.Random(1)
+    texts = [make_text(rng) for _ in range(NOTES)]
+    author = get_user_model().objects.create(username='bench')
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text=text, slug=f'note-{index}',
+             author=author)
+        for index, text in enumerate(texts)
+    )
+    raw = sum(len(text.encode()) for text in texts)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT SUM(LENGTH(text)) FROM notes_note')
+        stored, = cursor.fetchone()
+    packed = [fields.compress(text) for text in texts]
+    compressed = sum(value[:1] == fields.ZLIB for value in packed)
+    queryset = Note.objects.filter(author=author)
+    report(f'Сжатие текстов: {NOTES} заметок', [
+        ('текст в UTF-8', f'{raw / 2 ** 20:8.2f} МБ'),
+        ('столбец text в БД',
+         f'{stored / 2 ** 20:8.2f} МБ ({stored / raw:.0%}), '
+         f'сжато {compressed} из {NOTES}'),
+        ('сжатие',
+         f'{megabytes_per_second(fields.compress, texts, raw):8.1f} МБ/с'),
+        ('распаковка',
+         f'{megabytes_per_second(fields.decompress, packed, raw):8.1f} МБ/с'),
+        ('список с текстом',
+         f'{measure(lambda: list(queryset.all()), 5):8.1f} оп/с'),
+        ('список без текста',
+         f'{measure(lambda: list(queryset.defer("text")), 5):8.1f} оп/с'),
+    ])
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
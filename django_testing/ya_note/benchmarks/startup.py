@@ -0,0 +1,120 @@
+"""
+Задержка первых запросов нового рабочего процесса.
+
+Каждый раунд запускает новый процесс Python, который загружает wsgi.py с
+прогревом или без него и выполняет по два GET-запроса к каждому адресу от
+имени автора заметок. Замеряются загрузка приложения, первый и второй
+запрос. База — временный файл SQLite с миграциями и данными, общий для
+всех процессов.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUNDS = 5
+
+
+def configure(path, warm):
+    """Настройки процесса замера, до загрузки Django."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = path
+    settings.STATIC_ROOT = None
+    settings.STATICFILES_STORAGE = (
+        'django.contrib.staticfiles.storage.StaticFilesStorage'
+    )
+    settings.SLOW_REQUESTS = {**settings.SLOW_REQUESTS, 'ENABLED': False}
+    settings.WARMUP = {**settings.WARMUP, 'ENABLED': warm}
+
+
+def child(path, warm, cookie, urls):
+    """Загружает приложение и печатает JSON с временем в секундах."""
+    configure(path, warm)
+    started = time.perf_counter()
+    from yanote.wsgi import application
+    result = {'boot': time.perf_counter() - started, 'urls': {}}
+    from yanote.startup import get
+    for url in urls:
+        times = []
+        for _ in range(2):
+            started = time.perf_counter()
+            status = get(application, url, HTTP_COOKIE=cookie)
+            times.append(time.perf_counter() - started)
+        assert status == 200, (url, status)
+        result['urls'][url] = times
+    print(json.dumps(result))
+
+
+def prepare(path):
+    """Создаёт базу и возвращает cookie сессии автора и адреса замера."""
+    configure(path, False)
+    from benchmarks import setup
+    setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+
+    from notes.tests import factories
+    call_command('migrate', verbosity=0)
+    author = factories.make_user()
+    factories.bulk_notes(author, 30)
+    client = Client()
+    client.force_login(author)
+    cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+    return f'{cookie.key}={cookie.value}', [
+        reverse('notes:home'),
+        reverse('notes:list'),
+        reverse('notes:detail', args=('note-0',)),
+        reverse('notes:add'),
+    ]
+
+
+def run(path, warm, cookie, urls):
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child', path,
+         str(int(warm)), cookie, *urls],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(path, rounds):
+    from benchmarks import report
+    cookie, urls = prepare(path)
+    for warm in (False, True):
+        runs = [run(path, warm, cookie, urls) for _ in range(rounds)]
+        rows = [(
+            'загрузка wsgi.py',
+            f'{statistics.median(r["boot"] for r in runs) * 1000:8.1f} мс',
+        )]
+        for url in urls:
+            first, second = (
+                statistics.median(r['urls'][url][index] for r in runs)
+                for index in (0, 1)
+            )
+            rows.append((
+                url,
+                f'первый {first * 1000:8.1f} мс, '
+                f'второй {second * 1000:8.1f} мс',
+            ))
+        report(
+            f'Новый процесс {"с прогревом" if warm else "без прогрева"}, '
+            f'медиана {rounds} запусков',
+            rows,
+        )
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], sys.argv[3] == '1', sys.argv[4], sys.argv[5:])
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            main(
+                os.path.join(directory, 'db.sqlite3'),
+                int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS,
+            )
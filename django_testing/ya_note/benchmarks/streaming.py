@@ -0,0 +1,80 @@
+"""
+Список из тысяч заметок: обычный и потоковый ответ.
+
+Для каждого режима замеряются время до первого HTML (первой части
+ответа, которая распаковывается в непустой текст), полное время ответа
+(со сжатием gzip) и пик памяти Python на запрос.
+"""
+import time
+import tracemalloc
+import zlib
+
+from benchmarks import report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from notes.models import Note  # noqa: E402
+
+NOTES = 5000
+ROUNDS = 3
+
+
+def fetch(client, url):
+    """Время до первого HTML и полное время ответа."""
+    started = time.perf_counter()
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    chunks = (
+        response.streaming_content if response.streaming
+        else [response.content]
+    )
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first = None
+    for chunk in chunks:
+        if first is None and decompressor.decompress(chunk):
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+def peak_memory(client, url):
+    tracemalloc.start()
+    try:
+        fetch(client, url)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    author = get_user_model().objects.create(username='bench')
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+             author=author)
+        for index in range(NOTES)
+    )
+    client = Client()
+    client.force_login(author)
+    url = reverse('notes:list')
+    rows = []
+    for name, enabled in (('обычный', False), ('потоковый', True)):
+        with override_settings(
+            STREAMING_RENDER={'ENABLED': enabled, 'CHUNK_SIZE': 100}
+        ):
+            fetch(client, url)
+            first, total = min(fetch(client, url) for _ in range(ROUNDS))
+            memory = peak_memory(client, url)
+        rows.append((
+            name,
+            f'первый HTML {first * 1000:7.1f} мс, '
+            f'весь ответ {total * 1000:7.1f} мс, '
+            f'пик памяти {memory / 2 ** 20:6.1f} МБ',
+        ))
+    report(f'Список из {NOTES} заметок, gzip', rows)
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
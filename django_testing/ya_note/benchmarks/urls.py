@@ -0,0 +1,46 @@
+"""
+Построение адресов в длинном списке заметок: {% url %} и {% fast_url %}.
+
+Рендерится цикл из notes/list.html отдельно от остальной страницы.
+"""
+from benchmarks import measure, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.template import Context, Template  # noqa: E402
+
+from notes.models import Note  # noqa: E402
+
+NOTES = 1000
+REPEAT = 20
+LOOP = (
+    '{% load fast_urls %}{% for note in notes %}'
+    '<li>{{ note.id }}: <a href="{% TAG \'notes:detail\' note.slug %}">'
+    '{{ note.title }}</a></li>'
+    '{% endfor %}'
+)
+
+
+def main():
+    author = get_user_model().objects.create(username='bench')
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+             author=author)
+        for index in range(NOTES)
+    )
+    context = Context({'notes': list(Note.objects.all())})
+    rows = []
+    results = set()
+    for tag in ('url', 'fast_url'):
+        template = Template(LOOP.replace('TAG', tag))
+        results.add(template.render(context))
+        speed = measure(lambda: template.render(context), REPEAT)
+        rows.append((tag, f'{speed * NOTES:10.0f} адресов/с'))
+    assert len(results) == 1
+    report(f'Ссылки на {NOTES} заметок', rows)
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
@@ -1,5 +1,112 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
 
 from .models import Note
 
-admin.site.register(Note)
+User = get_user_model()
+
+
+def estimate_row_count(model):
+    """Быстрая оценка числа строк в таблице модели без COUNT(*)."""
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+    return model._base_manager.aggregate(last=Max('pk'))['last'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, который не считает точное число строк в больших таблицах.
+
+    Строки считаются точно, пока их не больше exact_count_limit. Дальше
+    для списка без фильтров и поиска используется оценка по всей таблице.
+    Отфильтрованный список всегда считается точно: оценка таблицы для него
+    дала бы пустые последние страницы.
+    """
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        if self.object_list.query.where:
+            return self.object_list.count()
+        bounded = self.object_list[:self.exact_count_limit + 1].count()
+        if bounded <= self.exact_count_limit:
+            return bounded
+        return max(bounded, estimate_row_count(self.object_list.model))
+
+
+class NoteActionForm(ActionForm):
+    author_id = forms.IntegerField(
+        label='ID нового автора', required=False
+    )
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'author')
+    list_select_related = ('author',)
+    raw_id_fields = ('author',)
+    search_fields = ('slug', 'title')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = NoteActionForm
+    actions = ('reassign_author', 'delete_notes')
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск, который использует индексы по slug и title.
+
+        Находит заметки с точно таким адресом или с заголовком,
+        начинающимся с введённой строки (с учётом регистра).
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(
+            Q(slug=term)
+            | Q(title__gte=term, title__lt=term + '\U0010ffff')
+        ), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(
+        description='Передать выбранные заметки автору с указанным ID',
+        permissions=('change',),
+    )
+    def reassign_author(self, request, queryset):
+        try:
+            author = User.objects.get(pk=request.POST.get('author_id'))
+        except (User.DoesNotExist, ValueError):
+            self.message_user(
+                request, 'Укажите ID существующего пользователя.',
+                messages.ERROR,
+            )
+            return
+        updated = queryset.reassign(author)
+        self.message_user(
+            request, f'Заметок передано автору {author}: {updated}.'
+        )
+
+    @admin.action(
+        description='Удалить выбранные заметки',
+        permissions=('delete',),
+    )
+    def delete_notes(self, request, queryset):
+        deleted, _ = queryset.delete()
+        self.message_user(request, f'Удалено заметок: {deleted}.')
@@ -0,0 +1,289 @@
+"""
+JSON API для синхронизации заметок.
+
+Пакетный эндпоинт принимает список операций create/update/delete и
+выполняет их фиксированным числом запросов к БД, независимо от размера
+пакета. Эндпоинт синхронизации отдаёт только заметки и отметки об
+удалении, изменённые после курсора клиента.
+"""
+import heapq
+import json
+import re
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views import generic
+
+from .forms import WARNING, NoteBatchForm
+from .models import Note, NoteTombstone
+
+OPERATIONS = ('create', 'update', 'delete')
+NOTE_FIELDS = ('title', 'text', 'slug')
+
+SYNC_PAGE_SIZE = 100
+MAX_SYNC_PAGE_SIZE = 500
+CURSOR_RE = re.compile(r'^(\d{1,19})\.([01])\.(\d{1,19})$')
+CHANGED, DELETED = 0, 1
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiLoginRequiredMixin(LoginRequiredMixin):
+    """Вместо редиректа на страницу входа отвечает 401 в JSON."""
+
+    def handle_no_permission(self):
+        return JsonResponse({'error': 'Требуется авторизация.'}, status=401)
+
+
+def parse_json(request):
+    try:
+        return json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError('Тело запроса должно быть JSON.')
+
+
+class NoteBatchApi(ApiLoginRequiredMixin, generic.View):
+    """
+    Пакетное создание, изменение и удаление заметок.
+
+    Формат запроса::
+
+        {"operations": [
+            {"op": "create", "title": "...", "text": "...", "slug": "..."},
+            {"op": "update", "slug": "...", "fields": {"title": "..."}},
+            {"op": "delete", "slug": "..."}
+        ]}
+
+    Ответ содержит результат для каждой операции в том же порядке.
+    Ошибочные операции пропускаются, остальные применяются в одной
+    транзакции.
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            operations = self.get_operations(parse_json(request))
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        results = [{'index': index} for index in range(len(operations))]
+        owned = self.get_owned_notes(operations)
+        creates, updates, deletes = [], [], []
+        targets = set()
+        for operation, result in zip(operations, results):
+            note, errors = self.prepare(operation, owned, targets)
+            if errors:
+                result.update(status='error', errors=errors)
+                continue
+            {'create': creates, 'update': updates, 'delete': deletes}[
+                operation['op']
+            ].append((note, result))
+        self.check_slugs(creates + updates, deletes)
+        creates = [item for item in creates if 'errors' not in item[1]]
+        updates = [item for item in updates if 'errors' not in item[1]]
+        try:
+            self.apply(creates, updates, deletes)
+        except IntegrityError:
+            return JsonResponse(
+                {'error': 'Конфликт с параллельным изменением, повторите.'},
+                status=409,
+            )
+        return JsonResponse({'results': results})
+
+    def get_operations(self, payload):
+        operations = (
+            payload.get('operations') if isinstance(payload, dict) else None
+        )
+        if not isinstance(operations, list):
+            raise ApiError('Ожидается объект с полем operations.')
+        if len(operations) > settings.NOTES_BATCH_MAX_OPERATIONS:
+            raise ApiError(
+                'Слишком много операций, максимум '
+                f'{settings.NOTES_BATCH_MAX_OPERATIONS}.'
+            )
+        for operation in operations:
+            if not isinstance(operation, dict):
+                raise ApiError('Каждая операция должна быть объектом.')
+        return operations
+
+    def get_owned_notes(self, operations):
+        """Заметки пользователя, которые меняются или удаляются в пакете."""
+        slugs = {
+            operation['slug'] for operation in operations
+            if operation.get('op') in ('update', 'delete')
+            and isinstance(operation.get('slug'), str)
+        }
+        return {
+            note.slug: note for note in Note.objects.filter(
+                author=self.request.user, slug__in=slugs
+            )
+        }
+
+    def prepare(self, operation, owned, targets):
+        """Проверяет операцию и возвращает заметку для записи и ошибки."""
+        op = operation.get('op')
+        if op not in OPERATIONS:
+            return None, {
+                'op': [f'Допустимые операции: {", ".join(OPERATIONS)}.']
+            }
+        if not isinstance(operation.get('slug', ''), str):
+            return None, {'slug': ['Ожидается строка.']}
+        if op == 'create':
+            form = NoteBatchForm(data={
+                name: operation.get(name) for name in NOTE_FIELDS
+            })
+        else:
+            note = owned.get(operation.get('slug'))
+            if note is None:
+                return None, {'slug': ['Заметка не найдена.']}
+            if note.pk in targets:
+                return None, {
+                    'slug': ['Заметка уже изменяется в этом пакете.']
+                }
+            targets.add(note.pk)
+            if op == 'delete':
+                return note, None
+            fields = operation.get('fields')
+            if not isinstance(fields, dict):
+                return None, {
+                    'fields': ['Ожидается объект с новыми значениями.']
+                }
+            data = {name: getattr(note, name) for name in NOTE_FIELDS}
+            data.update(
+                (name, fields[name]) for name in NOTE_FIELDS if name in fields
+            )
+            form = NoteBatchForm(data=data, instance=note)
+        if not form.is_valid():
+            return None, {
+                name: list(messages) for name, messages in form.errors.items()
+            }
+        note = form.save(commit=False)
+        note.author = self.request.user
+        return note, None
+
+    def check_slugs(self, writes, deletes):
+        """
+        Проверяет уникальность slug для всего пакета одним запросом.
+
+        Slug удаляемых в этом же пакете заметок считаются свободными.
+        """
+        freed = {note.pk for note, _ in deletes}
+        taken = dict(Note.objects.filter(
+            slug__in={note.slug for note, _ in writes}
+        ).values_list('slug', 'pk'))
+        seen = set()
+        for note, result in writes:
+            owner = taken.get(note.slug)
+            conflict = note.slug in seen or (
+                owner is not None and owner != note.pk and owner not in freed
+            )
+            seen.add(note.slug)
+            if conflict:
+                result.update(
+                    status='error', errors={'slug': [note.slug + WARNING]}
+                )
+
+    @transaction.atomic
+    def apply(self, creates, updates, deletes):
+        if deletes:
+            Note.objects.filter(
+                pk__in=[note.pk for note, _ in deletes]
+            ).delete()
+        if updates:
+            Note.objects.bulk_update(
+                [note for note, _ in updates], NOTE_FIELDS
+            )
+        if creates:
+            Note.objects.bulk_create([note for note, _ in creates])
+        for status, items in (
+            ('created', creates), ('updated', updates), ('deleted', deletes)
+        ):
+            for note, result in items:
+                result.update(status=status, slug=note.slug)
+
+
+def parse_cursor(cursor):
+    """Курсор вида «номер.вид.id» — позиция последнего изменения."""
+    match = CURSOR_RE.match(cursor)
+    if match is None:
+        raise ApiError('Некорректный курсор.')
+    return tuple(int(part) for part in match.groups())
+
+
+def after(position, kind):
+    """Условие на записи одного вида, идущие после позиции курсора."""
+    change_seq, cursor_kind, pk = position
+    if kind < cursor_kind:
+        return Q(change_seq__gt=change_seq)
+    if kind > cursor_kind:
+        return Q(change_seq__gte=change_seq)
+    return Q(change_seq__gt=change_seq) | Q(change_seq=change_seq, id__gt=pk)
+
+
+class NoteSyncApi(ApiLoginRequiredMixin, generic.View):
+    """
+    Изменения заметок пользователя после курсора.
+
+    Заметки и отметки об удалении упорядочены по (номер изменения, вид,
+    id). Клиент хранит cursor из ответа и передаёт его в следующий раз;
+    пустой курсор означает полную выгрузку. Пока more истинно, стоит
+    запросить следующую страницу.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            position = self.get_position()
+            limit = self.get_limit()
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        notes = Note.objects.filter(author=request.user).values(
+            'id', 'change_seq', *NOTE_FIELDS
+        )
+        tombstones = NoteTombstone.objects.filter(
+            author=request.user
+        ).values('id', 'note_id', 'change_seq', 'slug')
+        if position is not None:
+            notes = notes.filter(after(position, CHANGED))
+            tombstones = tombstones.filter(after(position, DELETED))
+        changes = list(heapq.merge(
+            (
+                (row['change_seq'], CHANGED, row['id'], row)
+                for row in notes.order_by('change_seq', 'id')[:limit + 1]
+            ),
+            (
+                (row['change_seq'], DELETED, row['id'], row)
+                for row in tombstones.order_by('change_seq', 'id')[:limit + 1]
+            ),
+        ))
+        more = len(changes) > limit
+        changes = changes[:limit]
+        if changes:
+            position = changes[-1][:3]
+        return JsonResponse({
+            'changes': [
+                self.serialize(kind, row) for _, kind, _, row in changes
+            ],
+            'cursor': (
+                '.'.join(map(str, position)) if position is not None else ''
+            ),
+            'more': more,
+        })
+
+    def get_position(self):
+        cursor = self.request.GET.get('cursor', '')
+        return parse_cursor(cursor) if cursor else None
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', SYNC_PAGE_SIZE))
+        except ValueError:
+            raise ApiError('limit должен быть числом.')
+        return min(max(limit, 1), MAX_SYNC_PAGE_SIZE)
+
+    def serialize(self, kind, row):
+        if kind == DELETED:
+            return {'id': row['note_id'], 'slug': row['slug'], 'deleted': True}
+        return {'id': row['id'], **{name: row[name] for name in NOTE_FIELDS}}
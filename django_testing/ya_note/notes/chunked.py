@@ -0,0 +1,154 @@
+"""
+Обход больших таблиц пачками по первичному ключу.
+
+Строки читаются keyset-запросами ``WHERE pk > последний ORDER BY pk
+LIMIT chunk_size`` и только нужными столбцами (values_list), поэтому
+память не зависит от размера таблицы. Прогресс сохраняется в файл
+контрольной точки, и прерванная задача продолжается с того же места.
+
+Пачки можно раздать процессам. Тогда родитель вычисляет только границы
+диапазонов pk, а строки каждый процесс читает сам. Процессы запускаются
+методом spawn и не наследуют соединения с БД родителя.
+"""
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections
+
+CHUNK_SIZE = 1000
+
+
+def add_arguments(parser):
+    """Общие параметры команд, которые обходят таблицы пачками."""
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help='Число процессов; 0 — по числу ядер.',
+    )
+    parser.add_argument(
+        '--checkpoint',
+        help='Файл контрольной точки для продолжения после перезапуска.',
+    )
+
+
+def iter_chunks(queryset, fields, chunk_size=CHUNK_SIZE, after=0):
+    """Пачки кортежей (pk, *fields) по возрастанию pk."""
+    queryset = queryset.order_by('pk').values_list('pk', *fields)
+    while True:
+        chunk = list(queryset.filter(pk__gt=after)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1][0]
+
+
+def iter_ranges(queryset, chunk_size=CHUNK_SIZE, after=0):
+    """
+    Диапазоны pk (after, last] по chunk_size строк.
+
+    Для каждой границы читается один pk из индекса, сами строки не
+    загружаются.
+    """
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        boundary = list(
+            queryset.filter(pk__gt=after)[chunk_size - 1:chunk_size]
+        )
+        if not boundary:
+            last = queryset.filter(pk__gt=after).last()
+            if last is not None:
+                yield after, last
+            return
+        yield after, boundary[0]
+        after = boundary[0]
+
+
+class Checkpoint:
+    """
+    Последний pk, до которого задача обработала все строки.
+
+    В state задача может хранить накопленный результат (например,
+    счётчики): он сохраняется вместе с pk и должен сериализоваться
+    в JSON.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.after = 0
+        self.state = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                data = json.load(file)
+            self.after, self.state = data['after'], data['state']
+
+    def save(self, after):
+        self.after = after
+        if self.path is None:
+            return
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'after': after, 'state': self.state}, file)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _init_worker():
+    django.setup()
+
+
+def _call(handle_range, after, last):
+    try:
+        return after, last, handle_range(after, last)
+    finally:
+        connections.close_all()
+
+
+def run_ranges(handle_range, queryset, chunk_size=CHUNK_SIZE, workers=1,
+               checkpoint=None):
+    """
+    Вызывает handle_range(after, last) для каждого диапазона pk.
+
+    Отдаёт кортежи (after, last, результат) по возрастанию pk. Точка
+    сохраняется, когда вызывающий код забрал результат и вернул
+    управление, поэтому checkpoint.state, обновлённый им, соответствует
+    сохранённому pk. После успешного завершения точка удаляется. Для
+    нескольких процессов handle_range должна быть функцией модуля.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    ranges = iter_ranges(queryset, chunk_size, checkpoint.after)
+    if workers == 1:
+        for after, last in ranges:
+            yield after, last, handle_range(after, last)
+            checkpoint.save(last)
+        checkpoint.clear()
+        return
+    workers = workers or os.cpu_count()
+    pending = deque()
+    exhausted = False
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+    ) as pool:
+        while pending or not exhausted:
+            # В работе не больше двух диапазонов на процесс.
+            while not exhausted and len(pending) < workers * 2:
+                bounds = next(ranges, None)
+                if bounds is None:
+                    exhausted = True
+                else:
+                    pending.append(
+                        pool.submit(_call, handle_range, *bounds)
+                    )
+            if pending:
+                after, last, result = pending.popleft().result()
+                yield after, last, result
+                checkpoint.save(last)
+    checkpoint.clear()
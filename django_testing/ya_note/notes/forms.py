@@ -27,3 +27,21 @@ class NoteForm(forms.ModelForm):
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+
+class NoteBatchForm(NoteForm):
+    """
+    Форма одной операции пакетного API.
+
+    Уникальность slug проверяется сразу для всего пакета одним
+    запросом, поэтому сама форма к БД не обращается.
+    """
+
+    def clean_slug(self):
+        slug = self.cleaned_data.get('slug')
+        if not slug:
+            slug = slugify(self.cleaned_data.get('title', ''))[:100]
+        return slug
+
+    def validate_unique(self):
+        pass
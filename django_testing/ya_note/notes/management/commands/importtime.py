@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from yanote.startup import import_times
+
+# Что делает рабочий процесс до первого запроса, кроме прогрева.
+CODE = (
+    'from django.core.wsgi import get_wsgi_application\n'
+    'get_wsgi_application()\n'
+    'import {module}\n'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает приложение в новом процессе с python -X importtime и '
+        'выводит самые медленные при импорте модули и пакеты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='self',
+            help='Сортировка: своё время модуля или вместе с вложенными.',
+        )
+        parser.add_argument(
+            '--module',
+            help='Модуль, импортируемый после загрузки приложения; по '
+                 'умолчанию ROOT_URLCONF.',
+        )
+
+    def handle(self, *args, **options):
+        module = options['module'] or settings.ROOT_URLCONF
+        rows = import_times(CODE.format(module=module))
+        total = sum(own for _, own, _, _ in rows)
+        self.stdout.write(
+            f'Импортировано {len(rows)} модулей за {total * 1000:.1f} мс'
+        )
+        column = 1 if options['sort'] == 'self' else 2
+        rows.sort(key=lambda row: row[column], reverse=True)
+        self.stdout.write(f'\n{"своё, мс":>10}{"всего, мс":>11}  модуль')
+        for name, own, cumulative, _ in rows[:options['limit']]:
+            self.stdout.write(
+                f'{own * 1000:>10.1f}{cumulative * 1000:>11.1f}  {name}'
+            )
+        self.by_package(rows, total, options['limit'])
+
+    def by_package(self, rows, total, limit):
+        packages = defaultdict(lambda: [0, 0.0])
+        for name, own, _, _ in rows:
+            package = packages[name.split('.')[0]]
+            package[0] += 1
+            package[1] += own
+        self.stdout.write(
+            f'\n{"модулей":>10}{"своё, мс":>11}{"доля":>7}  пакет'
+        )
+        for name, (count, own) in sorted(
+            packages.items(), key=lambda item: item[1][1], reverse=True,
+        )[:limit]:
+            self.stdout.write(
+                f'{count:>10}{own * 1000:>11.1f}{own / total:>7.0%}  {name}'
+            )
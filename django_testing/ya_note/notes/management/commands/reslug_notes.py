@@ -0,0 +1,114 @@
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.core.validators import slug_re
+from django.db import IntegrityError, transaction
+
+from pytils.translit import slugify
+
+from notes import chunked
+from notes.models import Note
+
+MAX_SLUG_LENGTH = Note._meta.get_field('slug').max_length
+
+
+def with_suffix(slug, pk):
+    suffix = f'-{pk}'
+    return slug[:MAX_SLUG_LENGTH - len(suffix)] + suffix
+
+
+def save_slugs(notes, wanted):
+    try:
+        with transaction.atomic():
+            Note.objects.bulk_update(notes, ['slug'])
+    except IntegrityError:
+        # Slug заняли параллельно: id заметки делает адрес уникальным.
+        for note in notes:
+            note.slug = with_suffix(wanted[note.pk], note.pk)
+        with transaction.atomic():
+            Note.objects.bulk_update(notes, ['slug'])
+
+
+def reslug_range(after, last, from_titles=False, dry_run=False):
+    """
+    Заполняет пустые и недопустимые slug заметок диапазона из заголовков.
+
+    При from_titles пересчитываются все slug, которые не совпадают с
+    заголовком, в том числе заданные авторами. Если slug уже занят, к нему
+    добавляется id заметки. Возвращает список (id, старый slug, новый
+    slug); при dry_run изменения не записываются.
+    """
+    rows = Note.objects.filter(pk__gt=after, pk__lte=last).values_list(
+        'pk', 'title', 'slug'
+    )
+    old = {}
+    wanted = {}
+    for pk, title, slug in rows:
+        if not from_titles and slug_re.match(slug):
+            continue
+        new_slug = slugify(title)[:MAX_SLUG_LENGTH] or f'note-{pk}'
+        if new_slug != slug:
+            old[pk] = slug
+            wanted[pk] = new_slug
+    if not wanted:
+        return []
+    taken = set(
+        Note.objects.filter(slug__in=wanted.values())
+        .exclude(pk__in=wanted)
+        .values_list('slug', flat=True)
+    )
+    notes = []
+    for pk, slug in wanted.items():
+        if slug in taken:
+            slug = with_suffix(slug, pk)
+        taken.add(slug)
+        notes.append(Note(pk=pk, slug=slug))
+    if not dry_run:
+        save_slugs(notes, wanted)
+    return [(note.pk, old[note.pk], note.slug) for note in notes]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет пустые и недопустимые адреса заметок из заголовков, '
+        'обходя таблицу пачками.'
+    )
+
+    def add_arguments(self, parser):
+        chunked.add_arguments(parser)
+        parser.add_argument(
+            '--from-titles', action='store_true',
+            help='Пересчитать из заголовков все адреса, включая заданные '
+                 'авторами.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, какие адреса изменятся.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        # Пробный запуск ничего не меняет, и продолжать его незачем.
+        checkpoint = chunked.Checkpoint(
+            None if dry_run else options['checkpoint']
+        )
+        changed = checkpoint.state.get('changed', 0)
+        handle_range = partial(
+            reslug_range, from_titles=options['from_titles'],
+            dry_run=dry_run,
+        )
+        for _, last, changes in chunked.run_ranges(
+            handle_range, Note.objects.all(), options['chunk_size'],
+            options['workers'], checkpoint,
+        ):
+            changed += len(changes)
+            checkpoint.state['changed'] = changed
+            if dry_run:
+                for pk, old, new in changes:
+                    self.stdout.write(f'{pk}: {old!r} -> {new!r}')
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Обработано до pk {last}.')
+        if dry_run:
+            self.stdout.write(f'Будет изменено адресов: {changed}.')
+        else:
+            self.stdout.write(f'Изменено адресов: {changed}.')
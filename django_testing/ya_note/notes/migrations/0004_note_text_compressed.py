@@ -0,0 +1,69 @@
+from django.db import migrations, models
+
+import notes.fields
+
+# Код переноса скопирован сюда, чтобы миграция не менялась вместе с
+# notes.fields.
+BATCH_SIZE = 500
+
+
+def copy_column(model, source, target):
+    """Переписывает текст из поля source в поле target пачками."""
+    last_pk = 0
+    while True:
+        chunk = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', source
+            )[:BATCH_SIZE]
+        )
+        if not chunk:
+            return
+        model.objects.bulk_update(
+            [model(pk=pk, **{target: text}) for pk, text in chunk],
+            [target],
+        )
+        last_pk = chunk[-1][0]
+
+
+def pack_texts(apps, schema_editor):
+    copy_column(apps.get_model('notes', 'Note'), 'text', 'packed_text')
+
+
+def unpack_texts(apps, schema_editor):
+    copy_column(apps.get_model('notes', 'Note'), 'packed_text', 'text')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='packed_text',
+            field=notes.fields.CompressedTextField(null=True),
+        ),
+        # При откате столбец text добавляется пустым и заполняется.
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=models.TextField(null=True),
+        ),
+        migrations.RunPython(pack_texts, unpack_texts),
+        migrations.RemoveField(
+            model_name='note',
+            name='text',
+        ),
+        migrations.RenameField(
+            model_name='note',
+            old_name='packed_text',
+            new_name='text',
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+        ),
+    ]
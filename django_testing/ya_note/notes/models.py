@@ -1,17 +1,111 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 
 from pytils.translit import slugify
 
+from .fields import CompressedTextField
+
+
+class ChangeSequence(models.Model):
+    """
+    Счётчик изменений заметок: единственная строка с последним номером.
+
+    Строка блокируется до конца транзакции, поэтому номера становятся
+    видны в порядке возрастания и клиент синхронизации не пропустит
+    изменение, зафиксированное позже выданного ему курсора.
+    """
+    value = models.BigIntegerField(default=0)
+
+
+def next_change_seq():
+    """Выдаёт следующий номер изменения. Вызывать внутри транзакции."""
+    sequence = ChangeSequence.objects.filter(pk=1)
+    if not sequence.update(value=F('value') + 1):
+        ChangeSequence.objects.get_or_create(pk=1)
+        sequence.update(value=F('value') + 1)
+    return sequence.values_list('value', flat=True).get()
+
+
+class NoteTombstone(models.Model):
+    """Отметка об удалении заметки для синхронизации клиентов."""
+    note_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=100, db_index=False)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    change_seq = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['author', 'change_seq'],
+                name='tombstone_author_seq_idx',
+            ),
+        ]
+
+
+def record_tombstones(rows):
+    """Создаёт отметки об удалении для строк (id, slug, author_id)."""
+    change_seq = next_change_seq()
+    NoteTombstone.objects.bulk_create(
+        NoteTombstone(
+            note_id=pk, slug=slug, author_id=author_id,
+            change_seq=change_seq,
+        )
+        for pk, slug, author_id in rows
+    )
+
+
+class NoteQuerySet(models.QuerySet):
+    """
+    Массовые операции, которые сдвигают номер изменения заметок.
+
+    Все заметки, изменённые одной операцией, получают общий номер.
+    """
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            kwargs.setdefault('change_seq', next_change_seq())
+            return super().update(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            change_seq = next_change_seq()
+            for obj in objs:
+                obj.change_seq = change_seq
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def delete(self):
+        with transaction.atomic(using=self.db, savepoint=False):
+            record_tombstones(self.values_list('pk', 'slug', 'author_id'))
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def reassign(self, author):
+        """Передаёт заметки автору, у прежних авторов они удаляются."""
+        with transaction.atomic(using=self.db, savepoint=False):
+            record_tombstones(
+                self.exclude(author=author).values_list(
+                    'pk', 'slug', 'author_id'
+                )
+            )
+            return self.update(author=author)
+
 
 class Note(models.Model):
     title = models.CharField(
         'Заголовок',
         max_length=100,
         default='Название заметки',
-        help_text='Дайте короткое название заметке'
+        help_text='Дайте короткое название заметке',
+        db_index=True,
     )
-    text = models.TextField(
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -27,6 +121,17 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['author', 'change_seq'],
+                name='note_author_seq_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -35,4 +140,28 @@ class Note(models.Model):
         if not self.slug:
             max_slug_length = self._meta.get_field('slug').max_length
             self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'change_seq'}
+        with transaction.atomic(savepoint=False):
+            if not self._state.adding and (
+                update_fields is None or 'author' in update_fields
+            ):
+                self.record_author_change()
+            self.change_seq = next_change_seq()
+            super().save(*args, **kwargs)
+
+    def record_author_change(self):
+        """У прежнего автора заметка удаляется, как при reassign()."""
+        stored = list(
+            Note.objects.filter(pk=self.pk).exclude(
+                author_id=self.author_id
+            ).values_list('pk', 'slug', 'author_id')
+        )
+        if stored:
+            record_tombstones(stored)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            record_tombstones([(self.pk, self.slug, self.author_id)])
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,78 @@
+"""
+Потоковый рендеринг страниц с длинными списками.
+
+Страница рендерится своим обычным шаблоном, но на месте строк списка
+стоит метка (переменная stream_rows). StreamingHttpResponse сразу
+отдаёт часть страницы до метки, затем строки списка и остаток страницы.
+Строки читаются через QuerySet.iterator(), поэтому результаты запроса
+не кешируются, и рендерятся по одной шаблоном строки. В памяти
+держится не больше CHUNK_SIZE строк. Готовый HTML отдаётся пачками по
+CHUNK_SIZE строк: каждая пачка сжимается и уходит клиенту отдельно, см.
+yanote/compression.py.
+
+Заголовки уходят до чтения строк. Если БД ответит ошибкой посреди
+списка, клиент получит обрезанную страницу, а не страницу 500.
+"""
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.template import loader
+from django.template.context import make_context
+from django.utils.safestring import mark_safe
+
+MARKER = mark_safe('<!-- stream-rows -->')
+
+
+class StreamingListMixin:
+    """
+    Потоковая отдача строк stream_rows(), см. настройку STREAMING_RENDER.
+
+    Каждая строка рендерится шаблоном stream_row_template, в его
+    контексте она называется stream_row_name. Если строк нет, выводится
+    stream_empty_template.
+    """
+    stream_row_template = None
+    stream_row_name = 'object'
+    stream_empty_template = None
+
+    def streaming_enabled(self):
+        return settings.STREAMING_RENDER['ENABLED']
+
+    def stream_rows(self):
+        raise NotImplementedError
+
+    def render_to_response(self, context, **response_kwargs):
+        if not self.streaming_enabled():
+            return super().render_to_response(context, **response_kwargs)
+        context['stream_rows'] = MARKER
+        page = loader.render_to_string(
+            self.get_template_names(), context, self.request
+        )
+        head, tail = page.split(MARKER)
+        return StreamingHttpResponse(
+            self.stream(head, tail, context), **response_kwargs
+        )
+
+    def stream(self, head, tail, context):
+        yield head
+        chunk_size = settings.STREAMING_RENDER['CHUNK_SIZE']
+        template = loader.get_template(self.stream_row_template).template
+        context = make_context(context, self.request)
+        rows = []
+        empty = True
+        # Шаблон привязан к контексту один раз: контекстные процессоры
+        # не вызываются заново для каждой строки.
+        with context.bind_template(template):
+            for row in self.stream_rows().iterator(chunk_size):
+                empty = False
+                with context.push({self.stream_row_name: row}):
+                    rows.append(template.render(context))
+                if len(rows) >= chunk_size:
+                    yield ''.join(rows)
+                    rows = []
+        if rows:
+            yield ''.join(rows)
+        elif empty and self.stream_empty_template:
+            yield loader.render_to_string(
+                self.stream_empty_template, request=self.request
+            )
+        yield tail
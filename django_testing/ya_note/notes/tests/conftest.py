@@ -0,0 +1,24 @@
+SETUP_REPORT_SIZE = 10
+
+_setup_durations = []
+
+
+def pytest_runtest_logreport(report):
+    if report.when == 'setup' and report.passed:
+        _setup_durations.append((report.duration, report.nodeid))
+
+
+def pytest_terminal_summary(terminalreporter):
+    total = sum(duration for duration, _ in _setup_durations)
+    if not total:
+        return
+    terminalreporter.section('подготовка данных')
+    terminalreporter.write_line(
+        f'всего {total:.2f}s на {len(_setup_durations)} тестов'
+    )
+    for duration, nodeid in sorted(_setup_durations, reverse=True)[
+        :SETUP_REPORT_SIZE
+    ]:
+        terminalreporter.write_line(
+            f'{duration:6.3f}s {duration / total:6.1%}  {nodeid}'
+        )
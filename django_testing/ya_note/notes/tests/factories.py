@@ -0,0 +1,37 @@
+"""Фабрики тестовых данных для YaNote."""
+from itertools import count
+
+from django.contrib.auth import get_user_model
+
+from notes.models import Note
+
+User = get_user_model()
+
+_sequence = count(1)
+
+
+def make_user(username=None, **kwargs):
+    return User.objects.create(
+        username=username or f'user{next(_sequence)}', **kwargs
+    )
+
+
+def make_note(author, **kwargs):
+    number = next(_sequence)
+    kwargs.setdefault('title', f'Заметка {number}')
+    kwargs.setdefault('text', f'Текст заметки {number}')
+    kwargs.setdefault('slug', f'note-{number}')
+    return Note.objects.create(author=author, **kwargs)
+
+
+def bulk_notes(author, amount, prefix='note'):
+    """Создаёт amount заметок автора одним запросом."""
+    return Note.objects.bulk_create(
+        Note(
+            title=f'Заметка {index}',
+            text='Текст',
+            slug=f'{prefix}-{index}',
+            author=author,
+        )
+        for index in range(amount)
+    )
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.admin import EstimatedCountPaginator
+from notes.models import Note, NoteTombstone
+from notes.tests import factories
+
+User = get_user_model()
+
+
+class TestNoteAdmin(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='admin')
+        cls.author = factories.make_user('Автор')
+        cls.new_author = factories.make_user('Новый автор')
+        cls.notes = factories.bulk_notes(cls.author, 5)
+        cls.url = reverse('admin:notes_note_changelist')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def post_action(self, action, **data):
+        return self.client.post(self.url, {
+            'action': action,
+            ACTION_CHECKBOX_NAME: list(
+                Note.objects.values_list('pk', flat=True)[:3]
+            ),
+            **data,
+        })
+
+    def test_changelist_selects_author(self):
+        """Авторы заметок загружаются тем же запросом, что и заметки."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context['cl'].queryset.query.select_related,
+            {'author': {}},
+        )
+
+    def test_search_by_slug_and_title_prefix(self):
+        """Поиск находит заметку по адресу и по началу заголовка."""
+        for term in ('note-1', 'Заметка 1'):
+            with self.subTest(term=term):
+                response = self.client.get(self.url, {'q': term})
+                self.assertEqual(
+                    list(response.context['cl'].result_list),
+                    [Note.objects.get(slug='note-1')],
+                )
+
+    def test_reassign_author(self):
+        """Действие передаёт выбранные заметки другому автору."""
+        self.post_action('reassign_author', author_id=self.new_author.pk)
+        self.assertEqual(
+            Note.objects.filter(author=self.new_author).count(), 3
+        )
+
+    def test_reassign_to_missing_author_changes_nothing(self):
+        self.post_action('reassign_author', author_id='')
+        self.assertEqual(Note.objects.filter(author=self.author).count(), 5)
+
+    def test_delete_notes(self):
+        self.post_action('delete_notes')
+        self.assertEqual(Note.objects.count(), 2)
+
+    def test_author_change_in_form_records_tombstone(self):
+        """Прежний автор узнаёт при синхронизации, что заметки у него нет."""
+        note = Note.objects.get(slug='note-0')
+        self.client.post(
+            reverse('admin:notes_note_change', args=(note.pk,)),
+            {
+                'title': note.title, 'text': note.text, 'slug': note.slug,
+                'author': self.new_author.pk,
+            },
+        )
+        note.refresh_from_db()
+        self.assertEqual(note.author, self.new_author)
+        tombstone, = NoteTombstone.objects.all()
+        self.assertEqual(
+            (tombstone.note_id, tombstone.slug, tombstone.author_id),
+            (note.pk, note.slug, self.author.pk),
+        )
+
+    def test_save_without_author_change_records_nothing(self):
+        note = Note.objects.get(slug='note-0')
+        note.title = 'Новый заголовок'
+        note.save()
+        self.assertFalse(NoteTombstone.objects.exists())
+
+
+class TestEstimatedCountPaginator(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        factories.bulk_notes(factories.make_user(), 5)
+
+    def test_small_result_is_counted_exactly(self):
+        paginator = EstimatedCountPaginator(Note.objects.order_by('pk'), 2)
+        self.assertEqual(paginator.count, 5)
+
+    def test_large_result_is_estimated(self):
+        paginator = EstimatedCountPaginator(Note.objects.order_by('pk'), 2)
+        paginator.exact_count_limit = 3
+        self.assertGreaterEqual(paginator.count, 4)
+
+    def test_filtered_result_is_counted_exactly(self):
+        """Фильтр или поиск в админке не подменяют число строк оценкой."""
+        notes = Note.objects.exclude(slug='note-0').order_by('pk')
+        paginator = EstimatedCountPaginator(notes, 2)
+        paginator.exact_count_limit = 3
+        self.assertEqual(paginator.count, 4)
@@ -0,0 +1,218 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.forms import WARNING
+from notes.models import Note
+from notes.tests.factories import bulk_notes, make_note, make_user
+
+
+class TestNoteBatchApi(TestCase):
+    URL = reverse('notes:api_batch')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+        cls.reader = make_user('Читатель')
+        cls.note = make_note(cls.author, slug='note', title='Заголовок')
+        cls.foreign = make_note(cls.reader, slug='foreign')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def post(self, operations):
+        return self.client.post(
+            self.URL, json.dumps({'operations': operations}),
+            content_type='application/json',
+        )
+
+    def test_anonymous_gets_401(self):
+        self.client.logout()
+        response = self.post([])
+        self.assertEqual(response.status_code, 401)
+
+    def test_bad_payload(self):
+        for body in ('не json', '[]', '{"operations": [1]}'):
+            with self.subTest(body=body):
+                response = self.client.post(
+                    self.URL, body, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 400)
+
+    @override_settings(NOTES_BATCH_MAX_OPERATIONS=2)
+    def test_too_many_operations(self):
+        response = self.post([{'op': 'delete', 'slug': 'note'}] * 3)
+        self.assertEqual(response.status_code, 400)
+
+    def test_mixed_batch(self):
+        """Создание, изменение и удаление применяются одним пакетом."""
+        other = make_note(self.author, slug='other')
+        response = self.post([
+            {'op': 'create', 'title': 'Новая', 'text': 'Текст'},
+            {'op': 'update', 'slug': 'note', 'fields': {'text': 'Новый'}},
+            {'op': 'delete', 'slug': 'other'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        statuses = [item['status'] for item in response.json()['results']]
+        self.assertEqual(statuses, ['created', 'updated', 'deleted'])
+        self.assertTrue(Note.objects.filter(slug='novaya').exists())
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.text, 'Новый')
+        self.assertEqual(self.note.title, 'Заголовок')
+        self.assertFalse(Note.objects.filter(pk=other.pk).exists())
+
+    def test_constant_number_of_queries(self):
+        """Число запросов не зависит от размера пакета."""
+        bulk_notes(self.author, 20)
+        operations = [
+            {'op': 'update', 'slug': f'note-{index}', 'fields': {'text': 'x'}}
+            for index in range(10)
+        ] + [
+            {'op': 'delete', 'slug': f'note-{index}'}
+            for index in range(10, 20)
+        ] + [
+            {'op': 'create', 'title': f'Пакет {index}', 'text': 'Текст',
+             'slug': f'batch-{index}'}
+            for index in range(10)
+        ]
+        # Один из запросов читает сессию.
+        with self.assertNumQueries(17):
+            response = self.post(operations)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Note.objects.filter(slug__startswith='batch-').count(), 10
+        )
+
+    def test_foreign_and_missing_notes(self):
+        response = self.post([
+            {'op': 'update', 'slug': 'foreign', 'fields': {'text': 'x'}},
+            {'op': 'delete', 'slug': 'missing'},
+        ])
+        for result in response.json()['results']:
+            self.assertEqual(result['status'], 'error')
+        self.assertTrue(Note.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_slug_must_be_string(self):
+        operations = [
+            {'op': op, 'slug': slug, 'title': 'А', 'text': 'Текст',
+             'fields': {'text': 'x'}}
+            for op in ('create', 'update', 'delete')
+            for slug in (['note'], {'a': 1}, 1)
+        ]
+        response = self.post(operations)
+        self.assertEqual(response.status_code, 200)
+        for result in response.json()['results']:
+            self.assertEqual(
+                result['errors'], {'slug': ['Ожидается строка.']}
+            )
+        self.assertTrue(Note.objects.filter(pk=self.note.pk).exists())
+
+    def test_slug_conflicts(self):
+        """Занятый и повторяющийся в пакете slug отклоняются."""
+        response = self.post([
+            {'op': 'create', 'title': 'А', 'text': 'Текст', 'slug': 'foreign'},
+            {'op': 'create', 'title': 'Б', 'text': 'Текст', 'slug': 'twin'},
+            {'op': 'create', 'title': 'В', 'text': 'Текст', 'slug': 'twin'},
+        ])
+        results = response.json()['results']
+        self.assertEqual(
+            results[0]['errors'], {'slug': ['foreign' + WARNING]}
+        )
+        self.assertEqual(results[1]['status'], 'created')
+        self.assertEqual(results[2]['status'], 'error')
+        self.assertEqual(Note.objects.filter(slug='twin').count(), 1)
+
+    def test_slug_freed_by_delete(self):
+        response = self.post([
+            {'op': 'delete', 'slug': 'note'},
+            {'op': 'create', 'title': 'А', 'text': 'Текст', 'slug': 'note'},
+        ])
+        statuses = [item['status'] for item in response.json()['results']]
+        self.assertEqual(statuses, ['deleted', 'created'])
+
+    def test_same_note_twice(self):
+        response = self.post([
+            {'op': 'update', 'slug': 'note', 'fields': {'text': 'x'}},
+            {'op': 'delete', 'slug': 'note'},
+        ])
+        results = response.json()['results']
+        self.assertEqual(results[0]['status'], 'updated')
+        self.assertEqual(results[1]['status'], 'error')
+        self.assertTrue(Note.objects.filter(pk=self.note.pk).exists())
+
+
+class TestNoteSyncApi(TestCase):
+    URL = reverse('notes:api_sync')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+        cls.reader = make_user('Читатель')
+        cls.notes = [make_note(cls.author) for _ in range(3)]
+        make_note(cls.reader)
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def sync(self, cursor='', **params):
+        response = self.client.get(self.URL, {'cursor': cursor, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_sync(self):
+        data = self.sync()
+        self.assertEqual(
+            [item['id'] for item in data['changes']],
+            [note.pk for note in self.notes],
+        )
+        self.assertFalse(data['more'])
+
+    def test_only_changes_after_cursor(self):
+        """После курсора приходят изменённые и удалённые заметки."""
+        cursor = self.sync()['cursor']
+        changed, deleted = self.notes[0], self.notes[1]
+        deleted_pk = deleted.pk
+        changed.text = 'Новый текст'
+        changed.save()
+        deleted.delete()
+        data = self.sync(cursor)
+        self.assertEqual(data['changes'], [
+            {'id': changed.pk, 'title': changed.title,
+             'text': 'Новый текст', 'slug': changed.slug},
+            {'id': deleted_pk, 'slug': deleted.slug, 'deleted': True},
+        ])
+        self.assertEqual(self.sync(data['cursor'])['changes'], [])
+
+    def test_paging(self):
+        Note.objects.filter(pk__in=[self.notes[0].pk]).delete()
+        cursor, seen = '', []
+        while True:
+            data = self.sync(cursor, limit=1)
+            seen.extend(data['changes'])
+            cursor = data['cursor']
+            if not data['more']:
+                break
+        self.assertEqual(len(seen), 3)
+        self.assertTrue(seen[-1]['deleted'])
+
+    def test_reassign_leaves_tombstone(self):
+        cursor = self.sync()['cursor']
+        Note.objects.filter(pk=self.notes[2].pk).reassign(self.reader)
+        self.assertEqual(self.sync(cursor)['changes'], [
+            {'id': self.notes[2].pk, 'slug': self.notes[2].slug,
+             'deleted': True},
+        ])
+
+    def test_sync_query_count(self):
+        """Заметки и отметки об удалении читаются двумя запросами."""
+        cursor = self.sync()['cursor']
+        # Плюс чтение сессии.
+        with self.assertNumQueries(3):
+            self.sync(cursor)
+
+    def test_bad_cursor(self):
+        for cursor in ('abc', '1.2.3', '1.0'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.URL, {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
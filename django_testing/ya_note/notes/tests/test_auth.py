@@ -0,0 +1,72 @@
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.auth import CachedModelBackend, user_cache, user_cache_key
+
+User = get_user_model()
+
+
+class TestCachedModelBackend(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='Автор', password='password'
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = directory.name
+        # Общий для процессов кеш в файлах, как в settings.py.
+        override = self.settings(CACHES={**settings.CACHES, 'auth': {
+            'BACKEND': 'yanote.metrics.FileBasedCache',
+            'LOCATION': self.location,
+        }})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.backend = CachedModelBackend()
+        self.key = user_cache_key(self.user.pk)
+
+    def test_cached_user_is_not_refetched(self):
+        """Повторное получение пользователя не обращается к auth_user."""
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_password_change_invalidates_cache(self):
+        """Смена пароля сбрасывает кеш пользователя."""
+        self.backend.get_user(self.user.pk)
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertIsNone(user_cache().get(self.key))
+
+    def test_invalidation_is_seen_by_other_processes(self):
+        """Кеш другого процесса видит ту же запись и её сброс."""
+        other = FileBasedCache(self.location, {})
+        self.backend.get_user(self.user.pk)
+        self.assertEqual(other.get(self.key), self.user)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(other.get(self.key))
+
+    def test_password_change_logs_out_other_sessions(self):
+        url = reverse('notes:list')
+        self.client.login(username='Автор', password='password')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_logout_invalidates_cache(self):
+        """Выход сбрасывает кеш пользователя."""
+        self.client.login(username='Автор', password='password')
+        self.client.get(reverse('notes:list'))
+        self.assertIsNotNone(user_cache().get(self.key))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(user_cache().get(self.key))
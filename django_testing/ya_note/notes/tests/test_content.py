@@ -7,6 +7,7 @@ from django.urls import reverse
 
 from notes.models import Note
 from notes.forms import NoteForm
+from notes.tests import factories
 
 User = get_user_model()
 
@@ -103,25 +104,12 @@ class TestNoteListContext(TestCase):
     def setUpTestData(cls):
         cls.author = User.objects.create(username='Автор')
         cls.another_author = User.objects.create(username='Другой автор')
-        cls.notes_by_author = [
-            Note(
-                title=f'Запись {i}',
-                text='Текст',
-                slug=f'slug_{i}',
-                author=cls.author
-            )
-            for i in range(settings.NOTES_PER_PAGE + 1)
-        ]
-        cls.notes_by_other = [
-            Note(
-                title=f'Чужая запись {i}',
-                text='Текст',
-                slug=f'slug_other_{i}',
-                author=cls.another_author
-            )
-            for i in range(settings.NOTES_PER_PAGE + 1)
-        ]
-        Note.objects.bulk_create(cls.notes_by_author + cls.notes_by_other)
+        cls.notes_by_author = factories.bulk_notes(
+            cls.author, settings.NOTES_PER_PAGE + 1
+        )
+        cls.notes_by_other = factories.bulk_notes(
+            cls.another_author, settings.NOTES_PER_PAGE + 1, prefix='other'
+        )
 
     def test_note_appears_in_object_list(self):
         self.client.force_login(self.author)
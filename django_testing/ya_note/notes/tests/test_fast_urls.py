@@ -0,0 +1,43 @@
+from django.template import Context, Template
+from django.test import SimpleTestCase
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+
+from notes.templatetags.fast_urls import fast_reverse
+
+
+class TestFastReverse(SimpleTestCase):
+
+    def test_same_as_reverse(self):
+        cases = (
+            ('notes:home', ()),
+            ('notes:list', ()),
+            ('notes:detail', ('note-1',)),
+            ('notes:edit', ('zametka_2',)),
+            ('notes:delete', ('x',)),
+        )
+        for name, args in cases:
+            with self.subTest(name=name):
+                self.assertEqual(
+                    fast_reverse(name, *args), reverse(name, args=args)
+                )
+
+    def test_script_prefix(self):
+        set_script_prefix('/notes app/')
+        self.addCleanup(set_script_prefix, '/')
+        self.assertEqual(
+            fast_reverse('notes:detail', 'slug'), '/notes%20app/note/slug/'
+        )
+
+    def test_bad_slug_is_rejected(self):
+        for slug in ('два слова', 'a/b', ''):
+            with self.subTest(slug=slug):
+                with self.assertRaises(NoReverseMatch):
+                    fast_reverse('notes:detail', slug)
+
+    def test_template_tag(self):
+        template = Template(
+            '{% load fast_urls %}{% fast_url "notes:detail" slug %}'
+        )
+        self.assertEqual(
+            template.render(Context({'slug': 'abc'})), '/note/abc/'
+        )
@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from notes import fields
+from notes.forms import NoteForm
+from notes.models import Note
+from notes.tests.factories import make_note, make_user
+
+LONG_TEXT = 'Длинная заметка, которую пользователь вставил целиком. ' * 200
+
+
+def stored(note):
+    """Значение столбца text как оно лежит в БД."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT text FROM notes_note WHERE id = %s', [note.pk]
+        )
+        return bytes(cursor.fetchone()[0])
+
+
+class TestCompressedText(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+
+    def test_long_text_is_compressed(self):
+        note = make_note(self.author, text=LONG_TEXT)
+        value = stored(note)
+        self.assertEqual(value[:1], fields.ZLIB)
+        self.assertLess(len(value), len(LONG_TEXT.encode()) // 10)
+        self.assertEqual(Note.objects.get(pk=note.pk).text, LONG_TEXT)
+
+    def test_short_text_is_stored_raw(self):
+        note = make_note(self.author, text='Коротко')
+        self.assertEqual(stored(note), fields.RAW + 'Коротко'.encode())
+        self.assertEqual(
+            Note.objects.values_list('text', flat=True).get(), 'Коротко'
+        )
+
+    def test_form_and_bulk_update_keep_text(self):
+        form = NoteForm(data={'title': 'Заметка', 'text': LONG_TEXT})
+        self.assertTrue(form.is_valid(), form.errors)
+        note = form.save(commit=False)
+        note.author = self.author
+        note.save()
+        note.text = 'Новый текст'
+        Note.objects.bulk_update([note], ['text'])
+        self.assertEqual(Note.objects.get(pk=note.pk).text, 'Новый текст')
+
+    def test_list_does_not_load_text(self):
+        make_note(self.author, text=LONG_TEXT)
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('notes:list'))
+        note, = response.context['object_list']
+        self.assertEqual(note.get_deferred_fields(), {'text'})
@@ -4,6 +4,7 @@ from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.models import Note
+from notes.tests import factories
 
 User = get_user_model()
 
@@ -51,11 +52,11 @@ class TestUniqueSlug(TestCase):
         cls.auth_client.force_login(cls.user)
         cls.create_url = reverse('note:create')
         cls.slug = 'non_unique_slug'
-        cls.note = Note.objects.create(
+        cls.note = factories.make_note(
+            cls.user,
             title='Новая заметка',
             text='Текст новой заметки',
             slug=cls.slug,
-            author=cls.user
         )
         cls.form_data = {
             'title': 'Не новая заметка',
@@ -0,0 +1,59 @@
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.tests.factories import bulk_notes, make_user
+from yanote.metrics import get_registry
+
+
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = self.settings(METRICS={
+            **settings.METRICS,
+            'ENABLED': True,
+            'DIRECTORY': directory.name,
+            'TOKEN': 'secret',
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_requests_are_recorded(self):
+        self.client.force_login(make_user('Автор'))
+        self.client.get(reverse('notes:list'))
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count'
+            '{view="notes:list",method="GET",status="200"} 1',
+            text,
+        )
+        self.assertIn('db_queries_total{view="notes:list"}', text)
+
+    @override_settings(STREAMING_RENDER={'ENABLED': True, 'CHUNK_SIZE': 2})
+    def test_streamed_response_is_observed_when_sent(self):
+        """Запросы к БД потокового ответа входят в его метрики."""
+        author = make_user('Автор')
+        bulk_notes(author, 5)
+        self.client.force_login(author)
+        key = ('db_queries_total', (('view', 'notes:list'),), None)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('notes:list'))
+            self.assertNotIn(key, get_registry().collect())
+            b''.join(response.streaming_content)
+        self.assertEqual(get_registry().collect()[key], len(context))
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_endpoint_is_protected(self):
+        self.client.force_login(make_user('Читатель'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
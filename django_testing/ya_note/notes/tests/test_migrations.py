@@ -0,0 +1,53 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase, override_settings
+
+from notes import fields
+
+TEXT = 'Подробная заметка со списком дел на неделю. ' * 50
+
+
+@override_settings(MIGRATION_MODULES={})
+class TestMigrations(TransactionTestCase):
+    """
+    Миграции данных.
+
+    Тестовая БД создаётся без миграций, поэтому все они сначала
+    отмечаются применёнными. После теста БД возвращается к последним
+    миграциям.
+    """
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        for key in executor.loader.graph.nodes:
+            executor.recorder.record_applied(*key)
+        self.addCleanup(self.migrate_to_latest)
+
+    def migrate_to_latest(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        executor.recorder.flush()
+
+    def migrate(self, name):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('notes', name)])
+        return executor.loader.project_state(('notes', name)).apps
+
+    def test_note_text_compression_round_trip(self):
+        apps = self.migrate('0003_note_sync')
+        author = apps.get_model('auth', 'User').objects.create(
+            username='Автор'
+        )
+        note = apps.get_model('notes', 'Note').objects.create(
+            title='Заметка', text=TEXT, slug='note', author=author
+        )
+        self.migrate('0004_note_text_compressed')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT text FROM notes_note')
+            stored, = cursor.fetchone()
+        self.assertEqual(bytes(stored)[:1], fields.ZLIB)
+        apps = self.migrate('0003_note_sync')
+        self.assertEqual(
+            apps.get_model('notes', 'Note').objects.get(pk=note.pk).text,
+            TEXT,
+        )
@@ -0,0 +1,121 @@
+"""
+Проверки с настройками из settings.py.
+
+test_settings.py ради скорости выключает миграции, ограничение частоты,
+потоковый рендеринг, метрики, запись медленных запросов и прогрев.
+Здесь они включены со значениями из settings.py, а миграции применяются
+к пустой БД.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tests.factories import make_note, make_user
+from yanote import settings as production
+from yanote import startup
+
+FEATURES = ('RATE_LIMIT', 'STREAMING_RENDER', 'METRICS')
+MIGRATE = '''
+import sys
+
+import django
+from django.conf import settings
+
+settings.DATABASES['default']['NAME'] = sys.argv[1]
+django.setup()
+from django.core.management import call_command
+
+call_command('migrate', verbosity=0)
+call_command('makemigrations', check=True, dry_run=True, verbosity=0)
+'''
+
+
+class TestMigrations(SimpleTestCase):
+
+    def test_migrate_from_scratch(self):
+        """Миграции применяются к пустой БД и совпадают с моделями."""
+        with tempfile.TemporaryDirectory() as directory:
+            result = subprocess.run(
+                [sys.executable, '-c', MIGRATE, str(Path(directory) / 'db')],
+                cwd=settings.BASE_DIR, capture_output=True, text=True,
+                env={
+                    **os.environ, 'DJANGO_SETTINGS_MODULE': 'yanote.settings',
+                },
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+class TestProductionSettings(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+        cls.note = make_note(cls.author)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = self.settings(
+            **{name: getattr(production, name) for name in FEATURES},
+            WARMUP={**production.WARMUP, 'STRICT': True},
+            SLOW_REQUESTS={
+                **production.SLOW_REQUESTS, 'DIRECTORY': directory.name,
+            },
+            CACHES={**production.CACHES, 'auth': {
+                **production.CACHES['auth'],
+                'LOCATION': Path(directory.name) / 'auth',
+            }},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def test_pages(self):
+        for url in (
+            reverse('notes:home'),
+            reverse('notes:add'),
+            reverse('notes:detail', args=(self.note.slug,)),
+            reverse('notes:edit', args=(self.note.slug,)),
+            reverse('users:login'),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(reverse('notes:list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+
+    def test_rate_limit(self):
+        statuses = [
+            self.client.post(
+                reverse('notes:add'),
+                {'title': f'Заметка {number}', 'text': 'Текст'},
+            ).status_code
+            for number in range(settings.RATE_LIMIT['RATE'] + 1)
+        ]
+        self.assertEqual(statuses[-1], 429)
+        self.assertEqual(Note.objects.count(), settings.RATE_LIMIT['RATE'] + 1)
+
+    def test_metrics(self):
+        response = self.client.get(reverse('notes:list'))
+        b''.join(response.streaming_content)
+        self.author.is_staff = True
+        self.author.save()
+        response = self.client.get(reverse('metrics'))
+        self.assertContains(response, 'view="notes:list"')
+
+    def test_warm_up(self):
+        timings = startup.warm_up(WSGIHandler())
+        self.assertEqual(list(timings), [
+            'urls', 'templates', 'locale', 'callbacks', 'requests',
+            'connections',
+        ])
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from notes.ratelimit import TokenBuckets
+from notes.tests.factories import make_user
+from yanote.test_settings import RATE_LIMIT
+
+
+class TestTokenBuckets(TestCase):
+
+    def test_refill(self):
+        buckets = TokenBuckets(rate=1, period=10, max_keys=10)
+        self.assertEqual(buckets.consume('user', now=0), 0)
+        self.assertAlmostEqual(buckets.consume('user', now=4), 6)
+        self.assertEqual(buckets.consume('user', now=10), 0)
+
+
+class TestNoteCreateRateLimit(TestCase):
+    URL = reverse('notes:add')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+
+    def setUp(self):
+        limited = self.settings(
+            RATE_LIMIT={**RATE_LIMIT, 'ENABLED': True, 'RATE': 2}
+        )
+        limited.enable()
+        self.addCleanup(limited.disable)
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def test_rejected_request_does_not_touch_db(self):
+        for number in range(2):
+            self.client.post(
+                self.URL, {'title': f'Заметка {number}', 'text': 'Текст'}
+            )
+        # Читается только сессия.
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                self.URL, {'title': 'Лишняя', 'text': 'Текст'}
+            )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(Note.objects.count(), 2)
+
+    def test_duplicate_note_is_ignored(self):
+        form_data = {'title': 'Заметка', 'text': 'Текст'}
+        for _ in range(2):
+            response = self.client.post(self.URL, form_data)
+            self.assertRedirects(response, reverse('notes:success'))
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_invalid_form_can_be_resubmitted(self):
+        """Отклонённая формой отправка не считается повтором."""
+        form_data = {'title': 'Заметка', 'text': ''}
+        for _ in range(2):
+            response = self.client.post(self.URL, form_data)
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,60 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from notes.models import Note
+from notes.tests.factories import make_note, make_user
+
+
+class TestReslugNotes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+        cls.renamed = make_note(
+            cls.author, title='Новый заголовок', slug='moi-adres'
+        )
+        cls.clash = make_note(cls.author, title='Занято', slug='plokho!')
+        cls.owner = make_note(cls.author, title='Другое', slug='zanyato')
+        cls.kept = make_note(cls.author, title='Тема', slug='tema')
+        cls.empty = make_note(cls.author, title='Пустой адрес')
+        Note.objects.filter(pk=cls.empty.pk).update(slug='')
+
+    def reslug(self, **options):
+        out = StringIO()
+        call_command('reslug_notes', chunk_size=2, stdout=out, **options)
+        return out.getvalue()
+
+    def slugs(self):
+        return dict(Note.objects.values_list('pk', 'slug'))
+
+    def test_only_empty_and_invalid_slugs_are_filled(self):
+        self.assertIn('Изменено адресов: 2.', self.reslug())
+        slugs = self.slugs()
+        self.assertEqual(slugs[self.empty.pk], 'pustoj-adres')
+        self.assertEqual(slugs[self.renamed.pk], 'moi-adres')
+        self.assertEqual(slugs[self.owner.pk], 'zanyato')
+
+    def test_taken_slug_gets_id_suffix(self):
+        self.reslug()
+        self.clash.refresh_from_db()
+        self.assertEqual(self.clash.slug, f'zanyato-{self.clash.pk}')
+
+    def test_from_titles_rewrites_every_slug(self):
+        self.assertIn('Изменено адресов: 4.', self.reslug(from_titles=True))
+        slugs = self.slugs()
+        self.assertEqual(slugs[self.renamed.pk], 'novyij-zagolovok')
+        self.assertEqual(slugs[self.kept.pk], 'tema')
+        self.assertEqual(slugs[self.owner.pk], 'drugoe')
+
+    def test_dry_run_reports_changes(self):
+        before = self.slugs()
+        output = self.reslug(dry_run=True)
+        self.assertEqual(self.slugs(), before)
+        self.assertIn(f"{self.empty.pk}: '' -> 'pustoj-adres'", output)
+        self.assertIn(
+            f"{self.clash.pk}: 'plokho!' -> 'zanyato-{self.clash.pk}'",
+            output,
+        )
+        self.assertIn('Будет изменено адресов: 2.', output)
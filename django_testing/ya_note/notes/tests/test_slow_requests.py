@@ -0,0 +1,65 @@
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.tests.factories import bulk_notes, make_user
+from yanote.slow_requests import load_captures
+
+
+class TestSlowRequests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+        bulk_notes(cls.author, 3)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        override = self.settings(SLOW_REQUESTS={
+            **settings.SLOW_REQUESTS,
+            'ENABLED': True,
+            'THRESHOLD': 0,
+            'DIRECTORY': self.directory,
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.force_login(self.author)
+
+    def test_slow_request_is_captured(self):
+        self.client.get(reverse('notes:list'))
+        capture, = load_captures(self.directory)
+        self.assertEqual(capture['view'], 'notes:list')
+        self.assertTrue(
+            any('notes_note' in sql for sql, _ in capture['queries'])
+        )
+
+    @override_settings(STREAMING_RENDER={'ENABLED': True, 'CHUNK_SIZE': 2})
+    def test_streamed_response_is_captured_until_sent(self):
+        """Запросы и рендеринг потокового ответа входят в запись."""
+        response = self.client.get(reverse('notes:list'))
+        self.assertEqual(load_captures(self.directory), [])
+        b''.join(response.streaming_content)
+        capture, = load_captures(self.directory)
+        self.assertTrue(
+            any('notes_note' in sql for sql, _ in capture['queries'])
+        )
+        self.assertEqual(connection.execute_wrappers, [])
+
+    @override_settings(STREAMING_RENDER={'ENABLED': True, 'CHUNK_SIZE': 2})
+    def test_unread_streamed_response_is_captured_on_close(self):
+        self.client.get(reverse('notes:list')).close()
+        self.assertEqual(len(load_captures(self.directory)), 1)
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_command_lists_captures(self):
+        self.client.get(reverse('notes:list'))
+        out = StringIO()
+        call_command('slow_requests', stdout=out)
+        self.assertIn('notes:list', out.getvalue())
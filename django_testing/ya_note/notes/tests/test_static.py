@@ -0,0 +1,76 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.checks import check_vendor_assets
+from notes.management.commands.vendor_assets import integrity
+
+ASSET = 'vendor/bootstrap/5.0.1/bootstrap.min.css'
+CSS = b'.container { margin: 0 auto; }\n'
+MANIFEST_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+
+class TestStaticAssets(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        source = self.root / 'cdn.css'
+        source.write_bytes(CSS)
+        override = self.settings(
+            STATICFILES_DIRS=[
+                self.root / 'assets', *settings.STATICFILES_DIRS,
+            ],
+            VENDOR_ASSETS=[{
+                'path': ASSET,
+                'url': source.as_uri(),
+                'integrity': integrity(CSS, 'sha384'),
+            }],
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_pages_link_only_local_copies(self):
+        content = self.client.get(reverse('notes:home')).content.decode()
+        self.assertIn(f'href="/static/{ASSET}"', content)
+        self.assertNotIn('cdn.jsdelivr.net', content)
+
+    def test_unknown_asset_is_reported(self):
+        template = Template(
+            "{% load vendor %}{% vendor_stylesheet 'x.css' %}"
+        )
+        with self.assertRaisesMessage(ImproperlyConfigured, 'x.css'):
+            template.render(Context())
+
+    def test_deploy_check_requires_vendored_copies(self):
+        error, = check_vendor_assets(None)
+        self.assertEqual(error.id, 'vendor.E001')
+        call_command('vendor_assets', verbosity=0)
+        self.assertEqual(check_vendor_assets(None), [])
+        (self.root / 'assets' / ASSET).write_bytes(b'body {}')
+        error, = check_vendor_assets(None)
+        self.assertEqual(error.id, 'vendor.E002')
+
+    def test_pages_use_fingerprinted_local_copies(self):
+        """Главная страница с хранилищем с манифестом, как в settings.py."""
+        call_command('vendor_assets', verbosity=0)
+        with override_settings(
+            STATIC_ROOT=self.root / 'static',
+            STATICFILES_STORAGE=MANIFEST_STORAGE,
+        ):
+            call_command(
+                'collectstatic', interactive=False, verbosity=0,
+                ignore_patterns=['admin'],
+            )
+            response = self.client.get(reverse('notes:home'))
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn('/static/vendor/bootstrap/5.0.1/bootstrap.', content)
+        self.assertNotIn(ASSET, content)
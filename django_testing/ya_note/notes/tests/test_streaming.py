@@ -0,0 +1,56 @@
+import gzip
+import zlib
+
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.tests.factories import bulk_notes, make_note, make_user
+
+
+@override_settings(STREAMING_RENDER={'ENABLED': True, 'CHUNK_SIZE': 2})
+class TestStreamingList(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user('Автор')
+        bulk_notes(cls.author, 5)
+        make_note(make_user('Другой'), slug='chuzhaya')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_notes_are_streamed_in_chunks(self):
+        response = self.client.get(reverse('notes:list'))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        # Начало страницы, три пачки строк и конец.
+        self.assertEqual(len(chunks), 5)
+        content = ''.join(chunks)
+        for index in range(5):
+            self.assertIn(
+                reverse('notes:detail', args=(f'note-{index}',)), content
+            )
+        self.assertNotIn('chuzhaya', content)
+
+    def test_streamed_list_is_compressed(self):
+        response = self.client.get(
+            reverse('notes:list'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn('Заметка 4', content.decode())
+
+    def test_compressed_chunks_are_not_held_back(self):
+        """Каждая сжатая часть распаковывается сразу, без остальных."""
+        response = self.client.get(
+            reverse('notes:list'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = iter(response.streaming_content)
+        self.assertIn(
+            'Список заметок', decompressor.decompress(next(chunks)).decode()
+        )
+        self.assertIn(
+            'Заметка', decompressor.decompress(next(chunks)).decode()
+        )
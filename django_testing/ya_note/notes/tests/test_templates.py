@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from yanote.template_profiling import profile_templates
+
+User = get_user_model()
+
+
+class TestTemplateProfiling(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.create(
+            title='Заголовок', text='Текст', slug='slug', author=cls.author
+        )
+
+    def test_templates_use_cached_loader(self):
+        """Шаблоны кешируются независимо от DEBUG."""
+        loaders = settings.TEMPLATES[0]['OPTIONS']['loaders']
+        self.assertEqual(
+            loaders[0][0], 'django.template.loaders.cached.Loader'
+        )
+
+    def test_list_page_profile(self):
+        """Профилировщик учитывает родительские и подключаемые шаблоны."""
+        self.client.force_login(self.author)
+        with profile_templates() as stats:
+            self.client.get(reverse('notes:list'))
+        for name in ('notes/list.html', 'base.html', 'includes/header.html'):
+            with self.subTest(name=name):
+                self.assertEqual(stats.templates[name][0], 1)
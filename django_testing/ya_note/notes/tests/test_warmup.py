@@ -0,0 +1,103 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from yanote import startup
+from yanote.metrics import get_registry
+
+IMPORT_TIME = [
+    'import time: self [us] | cumulative | imported package',
+    'import time:       120 |        120 |     notes.models',
+    'import time:       300 |        420 |   notes.views',
+    'import time:        80 |        500 | yanote.urls',
+]
+WARMUP = {
+    'ENABLED': True,
+    'URLS': ['notes:home', '/auth/login/'],
+    'CALLBACKS': [],
+    'CONNECT': False,
+    'STRICT': True,
+}
+
+
+class TestWarmUp(TestCase):
+
+    def test_disabled_warm_up_does_nothing(self):
+        self.assertEqual(startup.warm_up(WSGIHandler()), {})
+
+    @override_settings(WARMUP=WARMUP)
+    def test_warm_up_runs_every_step(self):
+        timings = startup.warm_up(WSGIHandler())
+        self.assertEqual(
+            list(timings),
+            ['urls', 'templates', 'locale', 'callbacks', 'requests'],
+        )
+        self.assertEqual(timings['requests'][0], 2)
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('notes/list.html', loader.get_template_cache)
+
+    def test_get_returns_status(self):
+        application = WSGIHandler()
+        self.assertEqual(startup.get(application, 'notes:home'), 200)
+        self.assertEqual(startup.get(application, '/missing/'), 404)
+
+    @override_settings(WARMUP={
+        **WARMUP, 'URLS': ['/missing/'], 'CALLBACKS': ['notes.missing'],
+        'STRICT': False,
+    })
+    def test_warm_up_survives_errors(self):
+        """Ошибка шага пишется в лог, остальные шаги выполняются."""
+        with self.assertLogs('yanote.startup', 'ERROR'):
+            timings = startup.warm_up(WSGIHandler())
+        self.assertNotIn('callbacks', timings)
+        self.assertNotIn('requests', timings)
+        self.assertIn('templates', timings)
+
+    @override_settings(WARMUP={**WARMUP, 'URLS': ['notes:home', '/missing/']})
+    def test_strict_warm_up_fails_on_error_status(self):
+        with self.assertRaisesMessage(
+            startup.WarmUpError, '/missing/ ответил 404'
+        ):
+            startup.warm_up(WSGIHandler())
+
+    @override_settings(WARMUP=WARMUP)
+    def test_warm_up_requests_skip_metrics_and_slow_requests(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        slow_requests = Path(directory.name) / 'slow_requests'
+        with self.settings(
+            METRICS={
+                **settings.METRICS, 'ENABLED': True,
+                'DIRECTORY': directory.name,
+            },
+            SLOW_REQUESTS={
+                **settings.SLOW_REQUESTS, 'ENABLED': True, 'THRESHOLD': 0,
+                'SAMPLE_RATE': 1.0, 'DIRECTORY': slow_requests,
+            },
+        ):
+            startup.warm_up(WSGIHandler())
+            names = {name for name, _, _ in get_registry().collect()}
+        self.assertNotIn('http_request_duration_seconds', names)
+        self.assertFalse(slow_requests.exists())
+
+
+class TestImportTime(SimpleTestCase):
+
+    def test_parse_import_times(self):
+        self.assertEqual(startup.parse_import_times(IMPORT_TIME), [
+            ('notes.models', 0.00012, 0.00012, 2),
+            ('notes.views', 0.0003, 0.00042, 1),
+            ('yanote.urls', 0.00008, 0.0005, 0),
+        ])
+
+    def test_importtime_command(self):
+        out = StringIO()
+        call_command('importtime', '--limit', '5', stdout=out)
+        self.assertIn('Импортировано', out.getvalue())
+        self.assertIn('django', out.getvalue())
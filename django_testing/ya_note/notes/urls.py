@@ -1,6 +1,6 @@
 from django.urls import path
 
-from notes import views
+from notes import api, views
 
 app_name = 'notes'
 
@@ -12,4 +12,6 @@ urlpatterns = [
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('api/notes/batch/', api.NoteBatchApi.as_view(), name='api_batch'),
+    path('api/notes/sync/', api.NoteSyncApi.as_view(), name='api_sync'),
 ]
@@ -4,6 +4,8 @@ from django.views import generic
 
 from .forms import NoteForm
 from .models import Note
+from .ratelimit import RateLimitMixin
+from .streaming import StreamingListMixin
 
 
 class Home(generic.TemplateView):
@@ -26,10 +28,11 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
+class NoteCreate(RateLimitMixin, NoteBase, generic.CreateView):
     """Добавление заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
+    duplicate_url = reverse_lazy('notes:success')
 
     def form_valid(self, form):
         new_note = form.save(commit=False)
@@ -49,9 +52,18 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
-class NotesList(NoteBase, generic.ListView):
+class NotesList(StreamingListMixin, NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
+    stream_row_template = 'includes/note.html'
+    stream_row_name = 'note'
+
+    def get_queryset(self):
+        """Текст в списке не выводится: его не читаем и не распаковываем."""
+        return super().get_queryset().defer('text')
+
+    def stream_rows(self):
+        return self.object_list
 
 
 class NoteDetail(NoteBase, generic.DetailView):
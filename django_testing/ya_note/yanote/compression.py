@@ -0,0 +1,41 @@
+"""
+Сжатие gzip, при котором потоковые ответы уходят клиенту по частям.
+
+GZipMiddleware Django сжимает потоковый ответ через compress_sequence:
+первой частью уходит только заголовок gzip, а zlib копит страницу, пока
+не наберёт свой буфер (порядка 150 КБ HTML). Начало страницы тогда
+приходит клиенту вместе с остальным, и потоковый рендеринг теряет смысл.
+Здесь после каждой части ответа компрессор сбрасывается (Z_SYNC_FLUSH),
+и клиент может сразу её распаковать. Обычные ответы сжимаются так же,
+как в Django.
+"""
+import zlib
+from gzip import GzipFile
+
+from django.middleware import gzip
+from django.utils.text import StreamingBuffer
+
+
+def compress_sequence(sequence):
+    """Сжимает части ответа, сбрасывая компрессор после каждой."""
+    buffer = StreamingBuffer()
+    with GzipFile(mode='wb', compresslevel=6, fileobj=buffer, mtime=0) as file:
+        for item in sequence:
+            file.write(item)
+            file.flush(zlib.Z_SYNC_FLUSH)
+            data = buffer.read()
+            if data:
+                yield data
+    yield buffer.read()
+
+
+class GZipMiddleware(gzip.GZipMiddleware):
+
+    def process_response(self, request, response):
+        if not response.streaming or response.has_header('Content-Encoding'):
+            return super().process_response(request, response)
+        content = response.streaming_content
+        response = super().process_response(request, response)
+        if response.get('Content-Encoding') == 'gzip':
+            response.streaming_content = compress_sequence(content)
+        return response
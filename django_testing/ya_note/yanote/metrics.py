@@ -0,0 +1,455 @@
+"""
+Метрики запросов: время ответа, запросы к БД, рендеринг и кеш.
+
+Значения хранятся в отображённом в память файле (mmap), свой файл
+у каждого процесса в каталоге METRICS['DIRECTORY']. Процесс пишет только
+в свой файл, поэтому блокировка нужна лишь между его потоками и почти
+всегда свободна. Страница /metrics/ складывает файлы всех процессов
+и отдаёт сумму в текстовом формате Prometheus. Файлы завершившихся
+процессов остаются в каталоге, иначе суммы счётчиков уменьшались бы;
+каталог очищают при перезапуске сервера. Без DIRECTORY значения
+хранятся в анонимной памяти и видны только своему процессу.
+
+Собираются:
+
+* http_request_duration_seconds — гистограмма времени ответа по имени
+  маршрута, методу и статусу;
+* db_queries_total и db_query_duration_seconds_total — число и время
+  запросов к БД по маршрутам;
+* template_render_duration_seconds_total — время рендеринга
+  TemplateResponse по маршрутам;
+* cache_requests_total — попадания и промахи кеша, если в CACHES
+  указан бэкенд из этого модуля; cache_hit_ratio вычисляется при
+  выводе.
+
+Страница доступна сотрудникам (is_staff) и по заголовку
+``Authorization: Bearer <METRICS['TOKEN']>``.
+"""
+import bisect
+import hmac
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache.backends import filebased, locmem
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from yanote.responses import on_close
+from yanote.startup import WARMUP_KEY
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FAMILIES = {
+    'http_request_duration_seconds': (
+        'histogram', 'Время ответа по маршрутам.'
+    ),
+    'db_queries_total': ('counter', 'Число запросов к БД.'),
+    'db_query_duration_seconds_total': (
+        'counter', 'Время запросов к БД.'
+    ),
+    'template_render_duration_seconds_total': (
+        'counter', 'Время рендеринга шаблонов.'
+    ),
+    'cache_requests_total': ('counter', 'Обращения к кешу.'),
+    'cache_hit_ratio': ('gauge', 'Доля попаданий в кеш.'),
+}
+
+_USED = struct.Struct('Q')
+_LENGTH = struct.Struct('I')
+_VALUE = struct.Struct('d')
+
+
+class MmapValues:
+    """
+    Числа по ключам в отображённой в память области.
+
+    Формат: 8 байт занятого размера, затем записи — 4 байта длины ключа,
+    ключ (JSON в UTF-8) с выравниванием до 8 байт и 8 байт значения.
+    Новая запись сначала заполняется, а потом учитывается в занятом
+    размере, поэтому читатель из другого процесса не увидит её
+    недописанной.
+    """
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path=None):
+        self._file = None
+        self._positions = {}
+        if path is None:
+            self._capacity = self.INITIAL_SIZE
+            self._map = mmap.mmap(-1, self._capacity)
+            self._set_used(_USED.size)
+            return
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.INITIAL_SIZE:
+            self._file.truncate(self.INITIAL_SIZE)
+        self._capacity = max(size, self.INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._set_used(max(_USED.unpack_from(self._map, 0)[0], _USED.size))
+        for key, position in parse(self._map):
+            self._positions[tuple_key(key)] = position
+
+    def _set_used(self, used):
+        self._used = used
+        _USED.pack_into(self._map, 0, used)
+
+    def _grow(self, required):
+        capacity = self._capacity
+        while capacity < required:
+            capacity *= 2
+        if self._file is None:
+            grown = mmap.mmap(-1, capacity)
+            grown[:self._used] = self._map[:self._used]
+        else:
+            self._map.close()
+            self._file.truncate(capacity)
+            grown = mmap.mmap(self._file.fileno(), capacity)
+        self._map = grown
+        self._capacity = capacity
+
+    def _append(self, key):
+        encoded = json.dumps(key, ensure_ascii=False).encode()
+        padded = (_LENGTH.size + len(encoded) + 7) // 8 * 8
+        start = self._used
+        end = start + padded + _VALUE.size
+        if end > self._capacity:
+            self._grow(end)
+        _LENGTH.pack_into(self._map, start, len(encoded))
+        offset = start + _LENGTH.size
+        self._map[offset:offset + len(encoded)] = encoded
+        position = start + padded
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._set_used(end)
+        self._positions[key] = position
+        return position
+
+    def add(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value, = _VALUE.unpack_from(self._map, position)
+        _VALUE.pack_into(self._map, position, value + amount)
+
+    def items(self):
+        for key, position in parse(self._map):
+            yield tuple_key(key), _VALUE.unpack_from(self._map, position)[0]
+
+
+def parse(buffer):
+    """Пары (ключ из JSON, смещение значения) из области MmapValues."""
+    used, = _USED.unpack_from(buffer, 0)
+    start = _USED.size
+    while start < used:
+        length, = _LENGTH.unpack_from(buffer, start)
+        offset = start + _LENGTH.size
+        position = start + (_LENGTH.size + length + 7) // 8 * 8
+        yield json.loads(bytes(buffer[offset:offset + length])), position
+        start = position + _VALUE.size
+
+
+def tuple_key(key):
+    name, labels, bucket = key
+    return name, tuple(tuple(label) for label in labels), bucket
+
+
+def read_file(path):
+    with open(path, 'rb') as file:
+        buffer = file.read()
+    if len(buffer) < _USED.size:
+        return
+    for key, position in parse(buffer):
+        yield tuple_key(key), _VALUE.unpack_from(buffer, position)[0]
+
+
+class Registry:
+    """Метрики процесса."""
+
+    def __init__(self, directory=None, buckets=()):
+        self.directory = directory
+        self.bounds = tuple(float(bound) for bound in buckets)
+        self.bucket_names = tuple(str(bound) for bound in self.bounds) + (
+            '+Inf',
+        )
+        self._lock = threading.Lock()
+        self._values = None
+
+    def _open(self):
+        if self.directory is None:
+            return MmapValues()
+        os.makedirs(self.directory, exist_ok=True)
+        return MmapValues(
+            os.path.join(self.directory, f'metrics-{os.getpid()}.db')
+        )
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            if self._values is None:
+                self._values = self._open()
+            self._values.add((name, labels, None), amount)
+
+    def observe(self, name, labels, value):
+        bucket = self.bucket_names[bisect.bisect_left(self.bounds, value)]
+        with self._lock:
+            if self._values is None:
+                self._values = self._open()
+            self._values.add((name, labels, bucket), 1)
+            self._values.add((name, labels, 'sum'), value)
+
+    def collect(self):
+        """Суммы значений всех процессов."""
+        totals = defaultdict(float)
+        if self.directory is None:
+            with self._lock:
+                items = list(self._values.items()) if self._values else []
+        elif os.path.isdir(self.directory):
+            items = [
+                item
+                for name in sorted(os.listdir(self.directory))
+                if name.startswith('metrics-')
+                for item in read_file(os.path.join(self.directory, name))
+            ]
+        else:
+            items = []
+        for key, value in items:
+            totals[key] += value
+        return totals
+
+
+_registry = None
+_registry_options = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Метрики процесса; пересоздаются при смене настроек."""
+    global _registry, _registry_options
+    options = settings.METRICS
+    if options is _registry_options:
+        return _registry
+    with _registry_lock:
+        if options is not _registry_options:
+            _registry = Registry(options['DIRECTORY'], options['BUCKETS'])
+            _registry_options = options
+        return _registry
+
+
+def _forget_registry():
+    # После fork процесс пишет в свой файл, а не в файл родителя.
+    global _registry, _registry_options
+    _registry = _registry_options = None
+
+
+os.register_at_fork(after_in_child=_forget_registry)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, value.replace('\\', r'\\').replace('"', r'\"').replace(
+            '\n', r'\n'
+        ))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def format_value(value):
+    return repr(int(value)) if value == int(value) else repr(value)
+
+
+def render(totals):
+    """Значения в текстовом формате Prometheus."""
+    series = defaultdict(dict)
+    for (name, labels, bucket), value in totals.items():
+        series[name][labels, bucket] = value
+    hits = defaultdict(float)
+    for (labels, _), value in series['cache_requests_total'].items():
+        hits[dict(labels)['result']] += value
+    if hits['hit'] + hits['miss']:
+        series['cache_hit_ratio'][(), None] = hits['hit'] / (
+            hits['hit'] + hits['miss']
+        )
+    lines = []
+    for name, (kind, help_text) in FAMILIES.items():
+        if not series[name]:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            lines.extend(render_histogram(name, series[name]))
+            continue
+        for (labels, _), value in sorted(series[name].items()):
+            lines.append(
+                f'{name}{format_labels(labels)} {format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def render_histogram(name, values):
+    buckets = defaultdict(dict)
+    for (labels, bucket), value in values.items():
+        buckets[labels][bucket] = value
+    for labels in sorted(buckets):
+        counts = buckets[labels]
+        total = 0
+        for bucket in sorted(
+            (bucket for bucket in counts if bucket != 'sum'), key=float
+        ):
+            total += counts[bucket]
+            le_labels = format_labels(labels + (('le', bucket),))
+            yield f'{name}_bucket{le_labels} {format_value(total)}'
+        if '+Inf' not in counts:
+            le_labels = format_labels(labels + (('le', '+Inf'),))
+            yield f'{name}_bucket{le_labels} {format_value(total)}'
+        yield (
+            f'{name}_sum{format_labels(labels)} '
+            f'{format_value(counts.get("sum", 0))}'
+        )
+        yield f'{name}_count{format_labels(labels)} {format_value(total)}'
+
+
+class QueryTimer:
+    """Обёртка выполнения запросов к БД: число и суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Записывает метрики каждого запроса.
+
+    Ставится первым в MIDDLEWARE, чтобы время ответа включало остальные
+    middleware. Потоковый ответ замеряется, пока он не отдан полностью.
+    Включается настройкой METRICS['ENABLED']. Запросы прогрева не
+    записываются.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.META.get(WARMUP_KEY):
+            return self.get_response(request)
+        started = time.perf_counter()
+        timer = QueryTimer()
+        request._metrics_render = 0.0
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+            # Потоковый ответ читает БД и рендерится после возврата.
+            timing = stack.pop_all()
+
+        def finish():
+            timing.close()
+            self.observe(request, response, started, timer)
+
+        return on_close(response, finish)
+
+    def observe(self, request, response, started, timer):
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        view = (('view', match.view_name if match else 'unmatched'),)
+        registry = get_registry()
+        registry.observe(
+            'http_request_duration_seconds',
+            view + (
+                ('method', request.method),
+                ('status', str(response.status_code)),
+            ),
+            elapsed,
+        )
+        if timer.count:
+            registry.inc('db_queries_total', view, timer.count)
+            registry.inc(
+                'db_query_duration_seconds_total', view, timer.duration
+            )
+        if request._metrics_render:
+            registry.inc(
+                'template_render_duration_seconds_total',
+                view,
+                request._metrics_render,
+            )
+
+    def process_template_response(self, request, response):
+        if request.META.get(WARMUP_KEY):
+            return response
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+_MISSING = object()
+
+
+def record_cache(hits, misses):
+    if not settings.METRICS['ENABLED']:
+        return
+    registry = get_registry()
+    if hits:
+        registry.inc('cache_requests_total', (('result', 'hit'),), hits)
+    if misses:
+        registry.inc('cache_requests_total', (('result', 'miss'),), misses)
+
+
+class MetricsCacheMixin:
+    """
+    Считает попадания и промахи get().
+
+    get_many() и get_or_set() базового класса тоже вызывают get().
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            record_cache(0, 1)
+            return default
+        record_cache(1, 0)
+        return value
+
+
+class LocMemCache(MetricsCacheMixin, locmem.LocMemCache):
+    """Кеш в памяти процесса с учётом попаданий."""
+
+
+class FileBasedCache(MetricsCacheMixin, filebased.FileBasedCache):
+    """Общий для процессов кеш в файлах с учётом попаданий."""
+
+
+def metrics_view(request):
+    token = settings.METRICS['TOKEN']
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    allowed = request.user.is_staff or (
+        bool(token) and hmac.compare_digest(
+            authorization.encode(), f'Bearer {token}'.encode()
+        )
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(get_registry().collect()), content_type=CONTENT_TYPE
+    )
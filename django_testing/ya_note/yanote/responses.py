@@ -0,0 +1,48 @@
+"""
+Завершение замеров после отправки потокового ответа.
+
+Потоковый ответ (StreamingHttpResponse) рендерится, пока сервер читает
+streaming_content, то есть уже после выхода из middleware: запросы к БД
+и рендеринг строк идут позже. Middleware, которые замеряют запрос,
+заканчивают замер через on_close().
+"""
+
+
+class ClosingIterator:
+    """Части ответа; callback вызывается один раз — в конце или в close()."""
+
+    def __init__(self, content, callback):
+        self.content = iter(content)
+        self.callback = callback
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        callback, self.callback = self.callback, None
+        if callback is not None:
+            callback()
+
+
+def on_close(response, callback):
+    """
+    Вызывает callback, когда ответ отдан полностью.
+
+    Обычный ответ уже готов, и callback вызывается сразу. Для потокового
+    ответа — когда streaming_content исчерпан, рендеринг упал или сервер
+    закрыл ответ (в том числе не начав его читать).
+    """
+    if response.streaming:
+        response.streaming_content = ClosingIterator(
+            response.streaming_content, callback
+        )
+    else:
+        callback()
+    return response